@@ -1,10 +1,5 @@
 """Define the action vocabulary for the release agent."""
-ALLOWED_ACTIONS = {
-    "evaluate_risk",
-    "check_clash",
-    "reschedule",
-    "approve_release",
-    "abort_release",
-    "reflect",
-    "finish",
-}
+from vocabulary import Action
+
+# Actions the agent may choose; GO and HOLD are pipeline-only.
+ALLOWED_ACTIONS = frozenset(Action) - {Action.GO, Action.HOLD}
@@ -1,19 +1,22 @@
 """LLM-backed decision agent for advancing release state."""
 import json
-import os
-
-from google import genai
 
 from actions import ALLOWED_ACTIONS
+from llm_client import shared_client
+from llm_resilience import LLMUnavailable, record_fallback, resilient_generate
+from memory_retrieval import build_memory_hint
+from vocabulary import Action, Stage
 
-client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
-
+MEMORY_HINT_TOP_K = 5
+MEMORY_HINT_TOKEN_BUDGET = 200
+# Stop the release where the stage allows it; earlier stages have one action.
+FALLBACK_ACTIONS = (Action.ABORT_RELEASE,)
 
 ACTIONS_BY_STAGE = {
-    "START": ["evaluate_risk"],
-    "RISK_EVAL": ["check_clash"],
-    "SCHEDULING": ["approve_release", "abort_release", "reflect"],
-    "REFLECT": ["approve_release", "abort_release"],
+    Stage.START: [Action.EVALUATE_RISK],
+    Stage.RISK_EVAL: [Action.CHECK_CLASH],
+    Stage.SCHEDULING: [Action.APPROVE_RELEASE, Action.ABORT_RELEASE, Action.REFLECT],
+    Stage.REFLECT: [Action.APPROVE_RELEASE, Action.ABORT_RELEASE],
 }
 
 
@@ -34,29 +37,49 @@ The JSON MUST contain:
 """
 
 
-def decide_next_action(state, memory):
-    """Choose the next release action using LLM guidance and memory hints."""
-    print("LLM CALLED")
+def _json_object(text: str) -> bool:
+    """Return True when the response is a JSON object."""
+    try:
+        return isinstance(json.loads(text), dict)
+    except (ValueError, TypeError):
+        return False
 
-    allowed_actions = ACTIONS_BY_STAGE.get(state.stage, ["abort_release"])
 
-    past = memory.episodes()
+def fallback_action(allowed_actions: list) -> str:
+    """Return the most conservative allowed action for when the LLM is unavailable."""
+    for action in FALLBACK_ACTIONS:
+        if action in allowed_actions:
+            return action
+    return allowed_actions[0]
 
-    memory_hint = ""
-    if past:
-        memory_hint = "\nHistorical context (advisory only):\n"
-        for p in past:
-            memory_hint += f"{p}\n"
 
-    print("MEMORY HINT:", memory_hint)
+def decide_next_action(
+    state, memory, top_k: int = MEMORY_HINT_TOP_K, token_budget: int = MEMORY_HINT_TOKEN_BUDGET
+):
+    """Choose the next release action using LLM guidance and memory hints.
 
-    def extract_text(response):
-        """Extract text parts from a Gemini response payload."""
-        parts = response.candidates[0].content.parts
-        text_parts = [p.text for p in parts if hasattr(p, "text")]
-        return "".join(text_parts)
+    The memory hint holds at most ``top_k`` of the most similar past episodes
+    and stays within ``token_budget`` estimated prompt tokens.
+    """
+    print("LLM CALLED")
+
+    allowed_actions = ACTIONS_BY_STAGE.get(state.stage, [Action.ABORT_RELEASE])
+
+    query = {
+        "feature_risk": state.feature_risk,
+        "service_criticality": state.service_criticality,
+        "day_of_week": state.day_of_week,
+    }
+    memory_hint, report = build_memory_hint(memory.episode_index(), query, top_k, token_budget)
 
-    if state.stage == "REFLECT":
+    print("MEMORY HINT:", memory_hint)
+    print(
+        f"MEMORY HINT TOKENS: {report.prompt_tokens} "
+        f"({report.episodes_used}/{report.episodes_considered} episodes, "
+        f"saved {report.tokens_saved} vs full history)"
+    )
+
+    if state.stage is Stage.REFLECT:
         state.decision = "approve_release"  # this is because when we move from approve_release to reflect, we lose the decision.
         reflection_prompt = f"""
     You previously chose the action: {state.decision}
@@ -75,16 +98,23 @@ def decide_next_action(state, memory):
     {{ "confirm": true | false , "reason": "<short explanation for humans>" }}
     """
 
-        response = client.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=[
-                {"role": "system", "parts": [{"text": SYSTEM_PROMPT}]},
-                {"role": "user", "parts": [{"text": reflection_prompt}]},
-            ],
-            config={"temperature": 0.0, "response_mime_type": "application/json"},
-        )
-
-        raw = extract_text(response)
+        try:
+            response = resilient_generate(
+                shared_client(),
+                "agent_reflection",
+                "gemini-3-flash-preview",
+                [
+                    {"role": "system", "parts": [{"text": SYSTEM_PROMPT}]},
+                    {"role": "user", "parts": [{"text": reflection_prompt}]},
+                ],
+                {"temperature": 0.0, "response_mime_type": "application/json"},
+                accept=_json_object,
+            )
+        except LLMUnavailable as exc:
+            record_fallback("agent_reflection", exc)
+            return Action.ABORT_RELEASE
+
+        raw = response.text
         confirm = json.loads(raw).get("confirm", False)
         reason = json.loads(raw).get("reason", False)
 
@@ -95,7 +125,7 @@ def decide_next_action(state, memory):
             return state.decision
         else:
             print("REFLECTION OVERRIDE: aborting for safety")
-            return "abort_release"
+            return Action.ABORT_RELEASE
 
     prompt = f"""
 Current release state:
@@ -118,17 +148,24 @@ Respond with JSON only:
 {{ "action": "<one of the allowed actions>" }}
 """
 
-    response = client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents=[
-            {"role": "system", "parts": [{"text": SYSTEM_PROMPT}]},
-            {"role": "user", "parts": [{"text": prompt}]},
-        ],
-        config={"temperature": 0.0, "response_mime_type": "application/json"},
-    )
+    try:
+        response = resilient_generate(
+            shared_client(),
+            "agent",
+            "gemini-3-flash-preview",
+            [
+                {"role": "system", "parts": [{"text": SYSTEM_PROMPT}]},
+                {"role": "user", "parts": [{"text": prompt}]},
+            ],
+            {"temperature": 0.0, "response_mime_type": "application/json"},
+            accept=_json_object,
+        )
+    except LLMUnavailable as exc:
+        record_fallback("agent", exc)
+        return fallback_action(allowed_actions)
 
     # print("LLM RESPONSE:", response)
-    raw_text = extract_text(response)
+    raw_text = response.text
 
     try:
         parsed = json.loads(raw_text)
@@ -139,9 +176,9 @@ Respond with JSON only:
         print(f"EXPLANATION: {reason}")
 
         # Reflection trigger: approval in prod
-        if state.env == "prod" and action == "approve_release":
+        if state.env == "prod" and action == Action.APPROVE_RELEASE:
             print("TRIGGERING REFLECTION STEP")
-            return "reflect"
+            return Action.REFLECT
 
     except Exception as e:
         raise ValueError(f"Invalid JSON from Gemini: {raw_text}") from e
@@ -0,0 +1,252 @@
+"""Run many release scenarios concurrently: batch files and the bulk API."""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+SCENARIO_FIELDS = (
+    "feature_risk",
+    "service_criticality",
+    "day_of_week",
+    "hour_of_day",
+    "clash_outcomes",
+    "conflicting_services",
+)
+
+
+class QueueFull(Exception):
+    """Raised when the bulk work queue cannot admit a request's items."""
+
+
+class RateLimiter:
+    """Thread-safe token bucket that blocks callers above ``rate`` per second."""
+
+    def __init__(self, rate: float, burst: int = None):
+        """Allow ``rate`` acquisitions per second with bursts of ``burst``."""
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedClient:
+    """``LLMClient`` wrapper whose calls are throttled by a rate limiter.
+
+    The resilience layer calls ``throttle`` before each attempt, so the wait
+    for a token does not count against the call deadline.
+    """
+
+    def __init__(self, client, limiter: RateLimiter):
+        """Wrap ``client`` so every generation call is rate limited."""
+        self._client = client
+        self._limiter = limiter
+
+    def throttle(self) -> None:
+        """Block until the next call may be made."""
+        self._limiter.acquire()
+
+    async def athrottle(self) -> None:
+        """Wait off the event loop until the next call may be made."""
+        await asyncio.to_thread(self._limiter.acquire)
+
+    def generate(self, model: str, contents, config: dict = None):
+        """Forward the call."""
+        return self._client.generate(model, contents, config)
+
+    async def agenerate(self, model: str, contents, config: dict = None):
+        """Forward the call."""
+        return await self._client.agenerate(model, contents, config)
+
+
+def validate_scenario(scenario: dict) -> None:
+    """Raise ValueError unless ``scenario`` has every field the pipeline reads."""
+    if not isinstance(scenario, dict):
+        raise ValueError("scenario must be an object")
+    missing = [field for field in SCENARIO_FIELDS if field not in scenario]
+    if missing:
+        raise ValueError(f"scenario is missing {', '.join(missing)}")
+    if not scenario["clash_outcomes"] or not scenario["conflicting_services"]:
+        raise ValueError("clash_outcomes and conflicting_services must not be empty")
+
+
+def scenario_key(scenario: dict) -> str:
+    """Return the coalescing key: release identity and pipeline inputs, ignoring ``id``.
+
+    Each run records one episode for its release, so only the same release
+    submitted twice may share a run.
+    """
+    inputs = {field: scenario[field] for field in SCENARIO_FIELDS}
+    inputs["release_id"] = scenario.get("release_id")
+    inputs["application"] = scenario.get("application")
+    inputs["env"] = scenario.get("env", "prod")
+    return json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+
+
+class BulkRunner:
+    """Bounded worker pool that coalesces identical in-flight scenarios.
+
+    ``submit_many`` maps each scenario to a future. A scenario whose inputs
+    match one already queued or running shares that execution (singleflight)
+    instead of paying for its own LLM calls; so does a repeat of an earlier
+    scenario in the same request. At most ``max_pending`` distinct
+    executions may be queued or running; a request that would exceed it is
+    rejected as a whole with ``QueueFull`` so callers can back off.
+    """
+
+    def __init__(self, runner, max_workers: int = 8, max_pending: int = 64):
+        """Run ``runner(scenario)`` on ``max_workers`` threads."""
+        self._runner = runner
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bulk")
+        self.max_pending = max_pending
+        # Re-entrant: a future that is already done runs its callback immediately.
+        self._lock = threading.RLock()
+        self._inflight = {}  # scenario key -> Future
+        self.counters = {"executions": 0, "coalesced": 0, "rejected": 0}
+
+    def pending(self) -> int:
+        """Return the number of distinct executions queued or running."""
+        with self._lock:
+            return len(self._inflight)
+
+    def submit_many(self, scenarios: list) -> list:
+        """Return one (future, coalesced) pair per scenario, or raise ``QueueFull``."""
+        keys = [scenario_key(scenario) for scenario in scenarios]
+        with self._lock:
+            new_keys = {key for key in keys if key not in self._inflight}
+            if len(self._inflight) + len(new_keys) > self.max_pending:
+                self.counters["rejected"] += 1
+                raise QueueFull(
+                    f"{len(self._inflight)} runs pending; cannot admit {len(new_keys)} more"
+                )
+
+            # Duplicates within the request share one future even if it
+            # finishes (and leaves _inflight) before they are reached.
+            futures, submitted = {}, []
+            for key, scenario in zip(keys, scenarios):
+                future = futures.get(key) or self._inflight.get(key)
+                coalesced = future is not None
+                if coalesced:
+                    self.counters["coalesced"] += 1
+                else:
+                    future = self._pool.submit(self._runner, scenario)
+                    self._inflight[key] = future
+                    future.add_done_callback(lambda _, key=key: self._finish(key))
+                    self.counters["executions"] += 1
+                futures[key] = future
+                submitted.append((future, coalesced))
+        return submitted
+
+    def _finish(self, key: str) -> None:
+        """Forget a completed execution so later requests run it afresh."""
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def run_many(self, scenarios: list, timeout: float = None) -> list:
+        """Run ``scenarios`` and return one result record per item, in order."""
+        records = []
+        for index, (scenario, (future, coalesced)) in enumerate(
+            zip(scenarios, self.submit_many(scenarios))
+        ):
+            record = {"index": index, "id": scenario.get("id", index), "coalesced": coalesced}
+            try:
+                result = future.result(timeout=timeout)
+                record["decision"] = result["decision"]
+                record["result"] = result
+            except Exception as exc:
+                record["error"] = f"{type(exc).__name__}: {exc}"
+            records.append(record)
+        return records
+
+
+def load_scenarios(path) -> list:
+    """Read scenarios from a JSON array or a JSONL file of scenario dicts."""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def run_batch(
+    scenarios: list,
+    runner,
+    output_path,
+    max_in_flight: int = 8,
+) -> dict:
+    """Run ``runner(scenario)`` for every scenario with bounded concurrency.
+
+    Each result is appended to ``output_path`` as one JSON line as soon as it
+    finishes (completion order, not input order). Returns a summary with
+    throughput, latency percentiles and how many runs errored or degraded.
+    """
+    write_lock = threading.Lock()
+    latencies = []
+    errors = 0
+    degraded = 0
+
+    def timed(index: int, scenario: dict) -> dict:
+        started = time.perf_counter()
+        record = {"index": index, "id": scenario.get("id", index)}
+        try:
+            result = runner(scenario)
+            record["decision"] = result["decision"]
+            record["result"] = result
+        except Exception as exc:
+            record["error"] = f"{type(exc).__name__}: {exc}"
+        record["latency_ms"] = round((time.perf_counter() - started) * 1e3, 2)
+        return record
+
+    started = time.perf_counter()
+    with Path(output_path).open("w", encoding="utf-8") as output:
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            futures = [
+                pool.submit(timed, index, scenario)
+                for index, scenario in enumerate(scenarios)
+            ]
+            for future in as_completed(futures):
+                record = future.result()
+                with write_lock:
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+                latencies.append(record["latency_ms"])
+                if "error" in record:
+                    errors += 1
+                elif record["result"].get("degraded"):
+                    degraded += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        "scenarios": len(scenarios),
+        "errors": errors,
+        "degraded": degraded,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(scenarios) / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p95_ms": percentile(latencies, 95),
+    }
@@ -0,0 +1,93 @@
+"""Compare sync and async pipeline latency against the offline stub backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_async_pipeline --delay 0.2 --runs 5
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_cache import get_cache
+from llm_client import StubClient
+from memory import EpisodicMemory
+from memory_store import JsonlStore
+from pipeline import drain_background_tasks, run_release_agent, run_release_agent_async
+from scenarios import SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY
+
+SEED_HEURISTICS = [
+    {
+        "when": {"day_of_week": "FRI"},
+        "recommendation": "NO_GO",
+        "confidence": 0.8,
+        "supporting_episodes": 4,
+    },
+    {
+        "when": {"feature_risk": "LOW", "day_of_week": "TUE"},
+        "recommendation": "GO",
+        "confidence": 0.8,
+        "supporting_episodes": 4,
+    },
+]
+
+
+def fresh_memory(workdir: Path, name: str) -> EpisodicMemory:
+    """Return an isolated memory seeded with heuristics that enable speculation."""
+    memory = EpisodicMemory(JsonlStore(workdir / f"{name}.json"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for heuristic in SEED_HEURISTICS:
+            memory.add_heuristic(heuristic)
+    return memory
+
+
+def main() -> None:
+    """Time both pipelines over the same scenarios."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    get_cache().enabled = False
+    client = StubClient(latency=args.delay)
+    scenarios = [SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY] * args.runs
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        sync_memory = fresh_memory(workdir, "sync")
+        async_memory = fresh_memory(workdir, "async")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            for scenario in scenarios:
+                run_release_agent(scenario, verbose=False, memory=sync_memory, client=client)
+            sync_s = time.perf_counter() - started
+
+            async def run_all() -> float:
+                began = time.perf_counter()
+                for scenario in scenarios:
+                    await run_release_agent_async(
+                        scenario, verbose=False, memory=async_memory, client=client
+                    )
+                elapsed = time.perf_counter() - began
+                await drain_background_tasks()
+                return elapsed
+
+            async_s = asyncio.run(run_all())
+
+    runs = len(scenarios)
+    print(f"stub delay per call: {args.delay * 1e3:.0f} ms, runs: {runs}")
+    print(f"sync  mean latency:  {sync_s / runs * 1e3:.0f} ms")
+    print(f"async mean latency:  {async_s / runs * 1e3:.0f} ms")
+    print(f"speedup:             {sync_s / async_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
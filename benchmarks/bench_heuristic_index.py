@@ -0,0 +1,88 @@
+"""Compare the linear heuristic scan with HeuristicIndex at scale.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_heuristic_index --sizes 10000 100000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from heuristic_engine import HeuristicIndex, applicable_heuristics
+
+ATTRIBUTES = {
+    "feature_risk": ["LOW", "MEDIUM", "HIGH"],
+    "service_criticality": ["LOW", "MEDIUM", "HIGH"],
+    "day_of_week": ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"],
+    "env": ["dev", "staging", "prod"],
+    "clash_detected": [[False], [True, False], [True]],
+}
+
+
+def random_heuristic(rng: random.Random) -> dict:
+    """Return a heuristic conditioned on a random subset of attributes."""
+    keys = rng.sample(sorted(ATTRIBUTES), rng.randint(1, 3))
+    return {
+        "when": {key: rng.choice(ATTRIBUTES[key]) for key in keys},
+        "recommendation": rng.choice(["GO", "NO_GO", "DELAY"]),
+        "confidence": round(rng.random(), 2),
+        "supporting_episodes": rng.randint(1, 50),
+    }
+
+
+def random_context(rng: random.Random) -> dict:
+    """Return a release context covering every attribute."""
+    return {key: rng.choice(values) for key, values in ATTRIBUTES.items()}
+
+
+def per_call_us(fn, contexts) -> float:
+    """Return the mean microseconds per call of ``fn`` over ``contexts``."""
+    started = time.perf_counter()
+    for context in contexts:
+        fn(context)
+    return (time.perf_counter() - started) / len(contexts) * 1e6
+
+
+def main() -> None:
+    """Benchmark both matchers and check that their results agree."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(
+        f"{'heuristics':>10} {'matches':>8} {'build ms':>9} "
+        f"{'linear us':>10} {'index us':>9} {'speedup':>8}"
+    )
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        heuristics = [random_heuristic(rng) for _ in range(size)]
+        contexts = [random_context(rng) for _ in range(args.queries)]
+
+        started = time.perf_counter()
+        index = HeuristicIndex(heuristics)
+        build_ms = (time.perf_counter() - started) * 1e3
+
+        matches = 0
+        for context in contexts:
+            expected = applicable_heuristics(heuristics, context)
+            if index.applicable(context) != expected:
+                raise SystemExit(f"FAILED: results differ for {context}")
+            matches += len(expected)
+
+        linear = per_call_us(lambda c: applicable_heuristics(heuristics, c), contexts)
+        indexed = per_call_us(index.applicable, contexts)
+        print(
+            f"{size:>10} {matches / len(contexts):>8.0f} {build_ms:>9.1f} "
+            f"{linear:>10.1f} {indexed:>9.1f} {linear / indexed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Time the offline heuristic miner on synthetic episode histories.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_heuristic_miner --sizes 100000 1000000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from heuristic_miner import mine_heuristics
+
+RISKS = ["LOW", "MEDIUM", "HIGH"]
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+
+
+def synthetic_episodes(count: int, seed: int = 0) -> list:
+    """Return episodes whose decisions follow a noisy weekend/high-risk rule."""
+    rng = random.Random(seed)
+    episodes = []
+    for _ in range(count):
+        context = {
+            "feature_risk": rng.choice(RISKS),
+            "service_criticality": rng.choice(RISKS),
+            "day_of_week": rng.choice(DAYS),
+        }
+        risky = context["feature_risk"] == "HIGH" or context["day_of_week"] in DAYS[4:]
+        go = rng.random() < (0.1 if risky else 0.9)
+        episodes.append(
+            {
+                "context": context,
+                "decision": "GO" if go else "ABORT",
+                "outcome": "SUCCESS" if go else "ABORTED",
+            }
+        )
+    return episodes
+
+
+def timed(episodes: list, use_numpy: bool) -> tuple:
+    """Return (seconds, heuristics) for one mining pass."""
+    started = time.perf_counter()
+    heuristics = mine_heuristics(episodes, use_numpy=use_numpy)
+    return time.perf_counter() - started, heuristics
+
+
+def main() -> None:
+    """Mine each history size with NumPy and pure Python and compare."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--skip-python", action="store_true")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        episodes = synthetic_episodes(size)
+        numpy_s, mined = timed(episodes, use_numpy=True)
+        line = f"{size:>9} episodes  numpy {numpy_s:6.2f} s  heuristics {len(mined)}"
+        if not args.skip_python:
+            python_s, fallback = timed(episodes, use_numpy=False)
+            line += f"  python {python_s:6.2f} s  identical {mined == fallback}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Exercise the LLM retry, deadline and circuit-breaker layer against fault-injecting stubs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_llm_resilience --runs 40 --workers 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_cache import get_cache
+from llm_client import LLM_TIMEOUT_ENV, StubClient
+from llm_resilience import BREAKER_RESET_ENV, reset_shared_breaker
+from memory import EpisodicMemory
+from memory_store import JsonlStore
+from metrics import LLM_CALLS
+from pipeline import run_release_agent
+from scenarios import SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY
+
+# name -> (StubClient arguments, per-call timeout in seconds)
+PROFILES = {
+    "healthy": ({"latency": 0.01}, 1.0),
+    "flaky": ({"latency": 0.01, "failure_rate": 0.2, "invalid_rate": 0.1}, 1.0),
+    "slow": ({"latency": 0.01, "jitter": 0.6}, 0.3),
+    "down": ({"failure_rate": 1.0}, 1.0),
+    "hung": ({"latency": 5.0}, 0.2),
+}
+OUTCOMES = (
+    "success",
+    "retry",
+    "timeout",
+    "transient",
+    "invalid",
+    "circuit_open",
+    "exhausted",
+    "fallback",
+)
+
+
+def run_profile(name: str, runs: int, workers: int, workdir: Path) -> dict:
+    """Run ``runs`` scenarios on ``workers`` threads against one stub profile."""
+    stub_args, timeout = PROFILES[name]
+    os.environ[LLM_TIMEOUT_ENV] = str(timeout)
+    reset_shared_breaker()
+    client = StubClient(seed=0, **stub_args)
+    memory = EpisodicMemory(JsonlStore(workdir / f"{name}.json"))
+    scenarios = [SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY] * (runs // 2)
+    before = {outcome: LLM_CALLS.total(outcome=outcome) for outcome in OUTCOMES}
+
+    def one(scenario: dict) -> tuple:
+        started = time.perf_counter()
+        result = run_release_agent(scenario, verbose=False, memory=memory, client=client)
+        return time.perf_counter() - started, result["decision"]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(one, scenarios))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds for seconds, _ in results)
+    decisions = {}
+    for _, decision in results:
+        decisions[decision] = decisions.get(decision, 0) + 1
+    return {
+        "runs_per_s": len(results) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3,
+        "max_ms": latencies[-1] * 1e3,
+        "decisions": decisions,
+        "outcomes": {
+            outcome: int(LLM_CALLS.total(outcome=outcome) - before[outcome])
+            for outcome in OUTCOMES
+        },
+    }
+
+
+def main() -> None:
+    """Report throughput, latency, decisions and call outcomes per fault profile."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=PROFILES)
+    args = parser.parse_args()
+
+    get_cache().enabled = False
+    os.environ[BREAKER_RESET_ENV] = "60"
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.profiles:
+            report = run_profile(name, args.runs, args.workers, Path(workdir))
+            outcomes = " ".join(f"{k}={v}" for k, v in report["outcomes"].items() if v)
+            print(
+                f"{name:<8} {report['runs_per_s']:7.1f} runs/s  p50 {report['p50_ms']:7.1f} ms"
+                f"  max {report['max_ms']:7.1f} ms  decisions {report['decisions']}"
+            )
+            print(f"{'':<8} {outcomes}")
+
+
+if __name__ == "__main__":
+    main()
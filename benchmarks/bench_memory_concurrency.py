@@ -0,0 +1,106 @@
+"""Stress concurrent EpisodicMemory writers and check that no write is lost.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory_concurrency --backend sqlite --processes 4 --threads 8
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from memory import EpisodicMemory
+from memory_store import JsonlStore, SqliteStore
+
+
+def make_store(backend: str, workdir: Path, compact_bytes: int):
+    """Build a store rooted in the benchmark's scratch directory."""
+    if backend == "jsonl":
+        return JsonlStore(workdir / "memory.json", compact_bytes=compact_bytes)
+    return SqliteStore(workdir / "memory.db")
+
+
+def worker_process(backend, workdir, compact_bytes, proc_id, threads, writes):
+    """Write ``threads * writes`` uniquely tagged episodes from one process."""
+    memory = EpisodicMemory(make_store(backend, Path(workdir), compact_bytes))
+
+    def run(thread_id):
+        for i in range(writes):
+            tag = f"{proc_id}-{thread_id}-{i}"
+            memory.write(context={"tag": tag}, decision="GO", outcome="SUCCESS")
+            if i % 10 == 0:
+                memory.store.append(
+                    "heuristic",
+                    {
+                        "when": {"tag": tag},
+                        "recommendation": "GO",
+                        "confidence": 0.5,
+                        "supporting_episodes": 1,
+                    },
+                )
+            memory.episodes()  # interleave reads with other writers
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+
+def main() -> None:
+    """Run the stress test and report throughput plus lost writes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default="sqlite")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--compact-bytes", type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        make_store(args.backend, Path(workdir), args.compact_bytes)  # create schema once
+
+        started = time.perf_counter()
+        procs = [
+            multiprocessing.Process(
+                target=worker_process,
+                args=(args.backend, workdir, args.compact_bytes, p, args.threads, args.writes),
+            )
+            for p in range(args.processes)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - started
+
+        memory = EpisodicMemory(make_store(args.backend, Path(workdir), args.compact_bytes))
+        tags = [e["context"]["tag"] for e in memory.episodes()]
+        heuristics = len(memory.heuristics())
+
+    expected = args.processes * args.threads * args.writes
+    expected_heuristics = args.processes * args.threads * -(-args.writes // 10)
+    lost = expected - len(set(tags))
+    duplicated = len(tags) - len(set(tags))
+
+    print(f"backend:            {args.backend}")
+    print(f"writers:            {args.processes} processes x {args.threads} threads")
+    print(f"episodes expected:  {expected}")
+    print(f"episodes stored:    {len(tags)}")
+    print(f"heuristics stored:  {heuristics} / {expected_heuristics}")
+    print(f"lost / duplicated:  {lost} / {duplicated}")
+    print(f"throughput:         {expected / elapsed:.0f} episodes/s")
+
+    if lost or duplicated or heuristics != expected_heuristics:
+        raise SystemExit("FAILED: concurrent writes were lost or duplicated")
+    print("OK: no lost writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Check the vectorized Monte Carlo simulator against ``simulate`` and time it.
+
+Every scenario fixture is replayed through random action sequences and
+policy-driven trajectories on both ``ReleaseState`` + ``simulate`` and a
+``ReleaseBatch``; the decoded batch rows must equal the scalar states.
+Then randomized releases are simulated under a few policies.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_monte_carlo --releases 1000000
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_heuristic_miner import synthetic_episodes
+from heuristic_miner import mine_heuristics
+from monte_carlo import (
+    ACTION_CODE,
+    CLASH_TRUE,
+    IDLE,
+    RECOMMENDATION_CODE,
+    RECOMMENDATIONS,
+    Draws,
+    HeuristicTable,
+    ReleaseBatch,
+    ReleaseDistribution,
+    conservative_rules,
+    run_policy,
+    run_trajectories,
+)
+from pipeline import MAX_DECISIONS, normalize_action
+from scenarios import (
+    SCENARIO_HIGH_RISK_FRIDAY,
+    SCENARIO_LOW_RISK_FRIDAY,
+    SCENARIO_LOW_RISK_MONDAY,
+    SCENARIO_LOW_RISK_SATURDAY,
+    SCENARIO_LOW_RISK_WEEKDAY,
+)
+from simulator import simulate
+from state import ReleaseState
+from vocabulary import TERMINAL_STAGES, Action
+
+SCENARIOS = [
+    SCENARIO_HIGH_RISK_FRIDAY,
+    SCENARIO_LOW_RISK_FRIDAY,
+    SCENARIO_LOW_RISK_SATURDAY,
+    SCENARIO_LOW_RISK_MONDAY,
+    SCENARIO_LOW_RISK_WEEKDAY,
+]
+IDENTITY = {
+    "release_id": "ACCOUNT-OPENING-SERVICE-1.0.0",
+    "application": "ACCOUNT-OPENING-SERVICE",
+}
+
+
+def delay_on_clash(batch: ReleaseBatch) -> np.ndarray:
+    """Reschedule clashing releases, then apply the conservative rules."""
+    return np.where(
+        batch.clash == CLASH_TRUE, RECOMMENDATION_CODE["DELAY"], conservative_rules(batch)
+    ).astype(np.int8)
+
+
+def always_delay(batch: ReleaseBatch) -> np.ndarray:
+    """Never decide; every release runs into the decision cap."""
+    return np.full(batch.size, RECOMMENDATION_CODE["DELAY"], dtype=np.int8)
+
+
+def scenario_draws(scenarios: list) -> Draws:
+    """Stack one point draw per scenario into a single batch of draws."""
+    rng = np.random.default_rng(0)
+    draws = [ReleaseDistribution.from_scenario(s).sample(1, rng) for s in scenarios]
+    return Draws(
+        **{
+            name: np.concatenate([getattr(d, name) for d in draws])
+            for name in Draws.__dataclass_fields__
+        }
+    )
+
+
+def decoded(batch: ReleaseBatch, scenarios: list) -> list:
+    """Decode batch rows using each row's scenario for ``conflicting_service``."""
+    states = batch.to_states(**IDENTITY, conflicting_service=None)
+    for state, scenario in zip(states, scenarios):
+        if state.conflicting_service is None:
+            state.conflicting_service = scenario["conflicting_services"][0]
+    return states
+
+
+def check_sequences(count: int, seed: int) -> int:
+    """Apply random action sequences both ways; return the number of rows compared."""
+    rng = random.Random(seed)
+    scenarios = [rng.choice(SCENARIOS) for _ in range(count)]
+    sequences = [rng.choices(list(Action), k=rng.randint(1, 8)) for _ in range(count)]
+
+    expected = []
+    for scenario, actions in zip(scenarios, sequences):
+        state = ReleaseState(**IDENTITY, env="prod")
+        for action in actions:
+            simulate(state, action, scenario)
+        expected.append(state)
+
+    batch = ReleaseBatch(count, trace=True)
+    draws = scenario_draws(scenarios)
+    for position in range(max(len(actions) for actions in sequences)):
+        codes = [
+            ACTION_CODE[actions[position]] if position < len(actions) else IDLE
+            for actions in sequences
+        ]
+        batch.step(np.array(codes, dtype=np.int8), draws)
+
+    assert decoded(batch, scenarios) == expected, "batch rows differ from simulate"
+    return count
+
+
+def check_trajectories(policy) -> int:
+    """Drive each fixture through the decision loop both ways under ``policy``."""
+    for scenario in SCENARIOS:
+        state = ReleaseState(**IDENTITY, env="prod")
+        simulate(state, Action.EVALUATE_RISK, scenario)
+        simulate(state, Action.CHECK_CLASH, scenario)
+        for _ in range(MAX_DECISIONS):
+            if state.stage in TERMINAL_STAGES:
+                break
+            code = policy(ReleaseBatch.from_states([state]))[0]
+            simulate(state, normalize_action(RECOMMENDATIONS[code]), scenario)
+        if state.stage not in TERMINAL_STAGES:
+            simulate(state, Action.HOLD, scenario)
+
+        batch = ReleaseBatch(1, trace=True)
+        run_trajectories(batch, scenario_draws([scenario]), policy)
+        assert decoded(batch, [scenario]) == [state], f"trajectory differs for {scenario}"
+    return len(SCENARIOS)
+
+
+def main() -> None:
+    """Verify equivalence with ``simulate``, then report throughput and outcome rates."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--releases", type=int, default=1_000_000)
+    parser.add_argument("--sequences", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    heuristics = mine_heuristics(synthetic_episodes(50_000, seed=args.seed))
+    policies = {
+        "conservative_rules": conservative_rules,
+        "mined_heuristics": HeuristicTable(heuristics),
+        "delay_on_clash": delay_on_clash,
+        "always_delay": always_delay,
+    }
+
+    compared = check_sequences(args.sequences, args.seed)
+    for policy in policies.values():
+        compared += check_trajectories(policy)
+    print(f"equivalence: {compared} single-state cases match simulate")
+
+    for name, policy in policies.items():
+        report = run_policy(policy, releases=args.releases, seed=args.seed)
+        rates = " ".join(f"{k}={v:.3f}" for k, v in report["rates"].items())
+        print(
+            f"{name:<19} {report['trajectories_per_s']:>10,} trajectories/s  {rates}"
+            f"  incidents={report['incident_rate']:.4f}  decisions={report['mean_decisions']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
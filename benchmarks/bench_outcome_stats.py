@@ -0,0 +1,88 @@
+"""Compare outcome-stats queries with scanning every episode.
+
+Builds a synthetic history spread over a year, checks that the columnar
+rebuild and the incremental counters agree with each other and with a direct
+scan, then times the rebuild, one incremental ``add`` and a filtered query
+against the scan it replaces.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_outcome_stats --sizes 100000 1000000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_heuristic_miner import synthetic_episodes
+from outcome_stats import OutcomeStats
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+QUERY = {"filters": {"feature_risk": ["HIGH"], "day_of_week": ["FRI"]}}
+
+
+def timestamped(count: int, seed: int) -> list:
+    """Return synthetic episodes with timestamps spread over 365 days."""
+    rng = random.Random(seed)
+    episodes = synthetic_episodes(count, seed=seed)
+    for episode in episodes:
+        episode["timestamp"] = (START + timedelta(seconds=rng.randrange(365 * 86400))).isoformat()
+    return episodes
+
+
+def scan(episodes: list) -> dict:
+    """Answer ``QUERY`` the old way: filter every episode in Python."""
+    decisions = {}
+    for episode in episodes:
+        context = episode["context"]
+        if context["feature_risk"] == "HIGH" and context["day_of_week"] == "FRI":
+            decisions[episode["decision"]] = decisions.get(episode["decision"], 0) + 1
+    return decisions
+
+
+def best_of(repeats: int, call) -> tuple:
+    """Return (fastest seconds, result) over ``repeats`` calls."""
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    """Check the aggregates against a scan and print timings per history size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        episodes = timestamped(size, args.seed)
+        rebuild_s, stats = best_of(3, lambda: OutcomeStats.from_episodes(episodes))
+        incremental = OutcomeStats()
+        for episode in episodes:
+            incremental.add(episode)
+        assert stats.counts() == incremental.counts(), "rebuilds disagree"
+
+        scan_s, expected = best_of(3, lambda: scan(episodes))
+        query_s, report = best_of(20, lambda: stats.query(**QUERY))
+        assert report["decisions"] == expected, "query disagrees with a full scan"
+        series_s, _ = best_of(20, lambda: stats.query(**QUERY, bucket="week"))
+        add_s, _ = best_of(1000, lambda: stats.add(episodes[0]))
+
+        print(
+            f"{size:>9,} episodes  {len(stats.counts()):>6,} counters  "
+            f"rebuild {rebuild_s:.3f}s  add {add_s * 1e6:.1f}us  scan {scan_s * 1e3:.1f}ms  "
+            f"query {query_s * 1e3:.3f}ms ({scan_s / query_s:,.0f}x)  "
+            f"weekly series {series_s * 1e3:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure memory load time and size before and after a retention pass.
+
+Writes a synthetic, fully reflected history of ``--years`` years to a
+temporary memory.json, loads it with ``EpisodicMemory`` and builds the
+outcome stats, then archives and rolls up everything older than
+``--hot-days`` and repeats the measurement.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_retention --years 1 5 --per-day 500
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_heuristic_miner import synthetic_episodes
+from memory import EpisodicMemory
+from memory_store import JsonlStore
+from retention import RetentionPolicy
+
+
+def history(years: int, per_day: int, seed: int) -> list:
+    """Return ``per_day`` episodes a day for ``years`` years ending today, oldest first."""
+    rng = random.Random(seed)
+    days = years * 365
+    episodes = synthetic_episodes(days * per_day, seed=seed)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    for i, episode in enumerate(episodes):
+        moment = today - timedelta(days=days - i // per_day, seconds=-rng.randrange(86400))
+        episode["timestamp"] = moment.isoformat()
+    return episodes
+
+
+def load(path: Path) -> EpisodicMemory:
+    """Load the memory at ``path`` and build its outcome stats."""
+    memory = EpisodicMemory(JsonlStore(path))
+    memory.outcome_stats()
+    return memory
+
+
+def measure(path: Path) -> dict:
+    """Return load time, allocated MiB and episode counts for the memory at ``path``."""
+    started = time.perf_counter()
+    load(path)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    memory = load(path)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "load_s": round(seconds, 3),
+        "resident_mb": round(allocated / 2**20, 1),
+        "hot": len(memory.episodes()),
+        "rollups": len(memory.rollups()),
+        "file_mb": round(path.stat().st_size / 2**20, 1),
+    }
+
+
+def main() -> None:
+    """Print load time and size for each history length, before and after retention."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--per-day", type=int, default=500)
+    parser.add_argument("--hot-days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for years in args.years:
+        with tempfile.TemporaryDirectory() as workdir:
+            path = Path(workdir) / "memory.json"
+            episodes = history(years, args.per_day, args.seed)
+            path.write_text(
+                json.dumps(
+                    {"episodes": episodes, "heuristics": [], "reflected_episodes": len(episodes)}
+                )
+            )
+            del episodes
+            JsonlStore(path).snapshot()  # migrate the legacy layout outside the timing
+            before = measure(path)
+
+            policy = RetentionPolicy(args.hot_days, archive_dir=Path(workdir) / "archive")
+            started = time.perf_counter()
+            pruned = JsonlStore(path).retain(policy)
+            retain_s = time.perf_counter() - started
+            archive_mb = sum(f.stat().st_size for f in policy.archive_dir.rglob("*.gz")) / 2**20
+            after = measure(path)
+
+        print(
+            f"{years} year(s): pruned {pruned:,} in {retain_s:.1f}s, "
+            f"archive {archive_mb:.1f} MiB"
+        )
+        print(f"  before {before}")
+        print(f"  after  {after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Track cold-start time of the CLI and the demo server.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --repeat 5 --output startup.json
+
+Reports ``-X importtime`` cumulative import cost for ``main`` and
+``pipeline``, the wall time of ``main.py --help``, and the server's time to
+first ``/api/scenarios`` and first ``/api/run`` response (offline stub LLM).
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_profile(module: str) -> dict:
+    """Return cumulative import time (ms) for ``module`` and its heaviest imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    total = next(cum for name, _, cum in reversed(rows) if name == module)
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:5]
+    return {
+        "cumulative_ms": round(total / 1e3, 1),
+        "modules": len(rows),
+        "imports_genai": any(name.startswith("google.genai") for name, _, _ in rows),
+        "heaviest_self_ms": {name: round(self_us / 1e3, 1) for name, self_us, _ in heaviest},
+    }
+
+
+def cli_help_ms(repeat: int) -> float:
+    """Return the median wall time of ``main.py --help``."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(ROOT / "main.py"), "--help"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+        )
+        samples.append((time.perf_counter() - started) * 1e3)
+    return round(statistics.median(samples), 1)
+
+
+def free_port() -> int:
+    """Return an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, deadline: float) -> None:
+    """Poll ``url`` until it answers 200 or the deadline passes."""
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                response.read()
+                return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.005)
+
+
+def server_startup_ms() -> dict:
+    """Time the server to its first scenarios and run responses."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "RELEASE_AGENT_LLM": "stub", "RELEASE_AGENT_LLM_CACHE": "off"}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if (ROOT / "memory.json").exists():
+            shutil.copy(ROOT / "memory.json", workdir)
+
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(ROOT / "main.py"), "--serve", "--port", str(port)],
+            cwd=workdir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(f"{base}/api/scenarios", started + 30)
+            first_scenarios = time.perf_counter() - started
+            wait_for(f"{base}/api/run?scenario=low-risk-monday", started + 60)
+            first_run = time.perf_counter() - started
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    return {
+        "first_scenarios_ms": round(first_scenarios * 1e3, 1),
+        "first_run_ms": round(first_run * 1e3, 1),
+    }
+
+
+def main() -> None:
+    """Collect startup metrics and print (and optionally save) them as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {
+        "python": sys.version.split()[0],
+        "import_main": import_profile("main"),
+        "import_pipeline": import_profile("pipeline"),
+        "cli_help_ms": cli_help_ms(args.repeat),
+        "server": server_startup_ms(),
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Compare the slotted, interned ReleaseState with the previous dataclass state.
+
+Each run replays the simulator loop the pipeline drives: build the planner
+context and evidence, then apply one transition. The legacy path is the
+pre-vocabulary implementation (plain dataclass, ``ACTION: ...`` strings,
+fresh context and evidence dicts every transition).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_state --transitions 1000000 --retain 100000
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pipeline import build_context, build_evidence, new_release_state
+from scenarios import SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY
+from simulator import simulate
+
+# One run: every simulator action the agent and pipeline use, ending in a decision.
+RUNS = [
+    (SCENARIO_LOW_RISK_WEEKDAY, ["evaluate_risk", "check_clash", "reschedule", "GO"]),
+    (SCENARIO_HIGH_RISK_FRIDAY, ["evaluate_risk", "check_clash", "reflect", "abort_release"]),
+]
+
+
+@dataclass
+class LegacyState:
+    """ReleaseState as it was before the shared vocabulary."""
+    release_id: str
+    application: str
+    env: str
+    stage: str = "START"
+    feature_risk: str = "UNKNOWN"
+    service_criticality: str = "UNKNOWN"
+    day_of_week: str = "UNKNOWN"
+    hour_of_day: int = -1
+    clash: str = "UNKNOWN"
+    conflicting_service: str = ""
+    decision: str = "UNDECIDED"
+    history: List[str] = field(default_factory=list)
+
+
+def legacy_simulate(state, action, scenario):
+    """The previous string-based simulator."""
+    state.history.append(f"ACTION: {action}")
+    if action == "evaluate_risk":
+        state.feature_risk = scenario["feature_risk"]
+        state.service_criticality = scenario["service_criticality"]
+        state.day_of_week = scenario["day_of_week"]
+        state.hour_of_day = scenario["hour_of_day"]
+        state.stage = "RISK_EVAL"
+    elif action == "check_clash":
+        state.clash = scenario["clash_outcomes"][0]
+        state.conflicting_service = scenario["conflicting_services"][0]
+        state.stage = "SCHEDULING"
+    elif action == "reschedule":
+        state.clash = False
+        state.stage = "DECISION"
+    elif action == "approve_release" or action == "GO":
+        state.decision = "GO"
+        state.stage = "DONE"
+    elif action == "abort_release":
+        state.decision = "ABORT"
+        state.stage = "ABORTED"
+    elif action == "reflect":
+        state.stage = "REFLECT"
+    return state
+
+
+def legacy_run(scenario: dict, actions: list):
+    """One run on the legacy state: fresh context and evidence every transition."""
+    state = LegacyState(
+        release_id="ACCOUNT-OPENING-SERVICE-1.0.0",
+        application="ACCOUNT-OPENING-SERVICE",
+        env="prod",
+        day_of_week=scenario["day_of_week"],
+        hour_of_day=scenario["hour_of_day"],
+        feature_risk=scenario["feature_risk"],
+        service_criticality=scenario["service_criticality"],
+    )
+    for action in actions:
+        context = {
+            "feature_risk": state.feature_risk,
+            "day_of_week": state.day_of_week,
+            "service_criticality": state.service_criticality,
+            "clash_detected": scenario["clash_outcomes"],
+            "env": state.env,
+        }
+        evidence = {
+            "clash_detected": context["clash_detected"],
+            "freeze_window": False,
+            "missing_info": [],
+        }
+        state = legacy_simulate(state, action, scenario)
+    return state
+
+
+def current_run(scenario: dict, actions: list):
+    """One run on the current state: context rebuilt only when its inputs change."""
+    state = new_release_state(scenario)
+    context_revision = None
+    for action in actions:
+        if state.revision != context_revision:
+            context_revision = state.revision
+            context = build_context(state, scenario)
+            evidence = build_evidence(context)
+        state = simulate(state, action, scenario)
+    return state
+
+
+def cpu(run, transitions: int) -> float:
+    """Return seconds to drive ``transitions`` transitions through ``run``."""
+    runs = transitions // len(RUNS[0][1])
+    gc.collect()
+    started = time.perf_counter()
+    for i in range(runs):
+        scenario, actions = RUNS[i & 1]
+        run(scenario, actions)
+    return time.perf_counter() - started
+
+
+def retained(run, count: int) -> float:
+    """Return bytes held per completed run when ``count`` runs are kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    states = [run(*RUNS[i & 1]) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del states
+    return size / count
+
+
+def main() -> None:
+    """Time both implementations and measure the memory each completed run retains."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transitions", type=int, default=1_000_000)
+    parser.add_argument("--retain", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Interleave the two paths and keep the best time of each.
+    timings = {legacy_run: [], current_run: []}
+    for _ in range(args.repeat):
+        for run, seconds in timings.items():
+            seconds.append(cpu(run, args.transitions))
+    legacy_s, current_s = min(timings[legacy_run]), min(timings[current_run])
+    legacy_b = retained(legacy_run, args.retain)
+    current_b = retained(current_run, args.retain)
+
+    print(f"transitions: {args.transitions:,}")
+    print(f"legacy   {legacy_s:6.2f} s  {legacy_s / args.transitions * 1e9:6.0f} ns/transition")
+    print(f"current  {current_s:6.2f} s  {current_s / args.transitions * 1e9:6.0f} ns/transition")
+    print(f"speedup  {legacy_s / current_s:6.2f}x")
+    print(f"retained per completed run: legacy {legacy_b:.0f} B, current {current_b:.0f} B")
+
+
+if __name__ == "__main__":
+    main()
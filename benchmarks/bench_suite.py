@@ -0,0 +1,315 @@
+"""End-to-end benchmark suite over a seeded synthetic release workload.
+
+Drives ``applicable_heuristics``, ``EpisodicMemory`` writes,
+``run_release_agent`` and the HTTP server (``POST /api/runs``) with releases
+from ``workload.py`` against the offline stub LLM, and records throughput,
+latency percentiles and RSS per benchmark in a JSON results file. With
+``--rate`` the memory, pipeline and HTTP calls arrive open-loop at a fixed
+rate and latency is measured from each call's scheduled start, so queueing
+counts; heuristic matching always runs back to back. ``--compare`` prints
+the change against an earlier results file (e.g. from another commit).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --rate 50 --output new.json --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch import percentile
+from benchmarks.bench_startup import free_port, wait_for
+from heuristic_engine import applicable_heuristics
+from heuristic_miner import mine_heuristics
+from llm_cache import get_cache
+from llm_client import StubClient
+from memory import EpisodicMemory
+from memory_store import JsonlStore, SqliteStore
+from pipeline import build_context, new_release_state, run_release_agent
+from workload import generate_workload
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCHMARKS = ("heuristic_match", "memory_write_jsonl", "memory_write_sqlite", "pipeline", "http")
+# (metric, True when higher is better) shown by --compare
+COMPARED = (
+    ("throughput_per_s", True),
+    ("p50_ms", False),
+    ("p99_ms", False),
+    ("rss_mb", False),
+)
+
+
+def rss_mb(pid: str = "self") -> dict:
+    """Return current and peak resident set size of a process, in MiB."""
+    sizes = {}
+    with open(f"/proc/{pid}/status", encoding="utf-8") as status:
+        for line in status:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                sizes[key] = round(int(value.split()[0]) / 1024, 1)
+    return {"rss_mb": sizes.get("VmRSS"), "peak_rss_mb": sizes.get("VmHWM")}
+
+
+def drive(call, items: list, rate: float = None, workers: int = 1) -> dict:
+    """Call ``call(item)`` for every item and summarize throughput and latency.
+
+    Without ``rate`` the calls run back to back on ``workers`` threads; with
+    it, call ``i`` is scheduled at ``i / rate`` seconds and its latency counts
+    from that moment.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def timed(item, scheduled: float) -> None:
+        started = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            call(item)
+        except Exception as exc:
+            with lock:
+                errors.append(f"{type(exc).__name__}: {exc}")
+        with lock:
+            latencies.append((time.perf_counter() - started) * 1e3)
+
+    started = time.perf_counter()
+    if workers == 1 and rate is None:
+        for item in items:
+            timed(item, None)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i, item in enumerate(items):
+                scheduled = None
+                if rate:
+                    scheduled = started + i / rate
+                    time.sleep(max(0.0, scheduled - time.perf_counter()))
+                pool.submit(timed, item, scheduled)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "calls": len(items),
+        "errors": len(errors),
+        "seconds": round(elapsed, 3),
+        "throughput_per_s": round(len(items) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies, default=0.0), 3),
+        **({"first_error": errors[0]} if errors else {}),
+    }
+
+
+def labelled_episodes(releases: list) -> list:
+    """Return episodes for ``releases`` decided by the conservative release rule."""
+    episodes = []
+    for release in releases:
+        risky = (
+            release["feature_risk"] == "HIGH"
+            or release["day_of_week"] in {"FRI", "SAT", "SUN"}
+            or release["clash_outcomes"][0]
+        )
+        episodes.append(
+            {
+                "context": {
+                    "feature_risk": release["feature_risk"],
+                    "service_criticality": release["service_criticality"],
+                    "day_of_week": release["day_of_week"],
+                },
+                "decision": "ABORT" if risky else "GO",
+            }
+        )
+    return episodes
+
+
+def bench_heuristic_match(releases: list, args) -> dict:
+    """Time ``applicable_heuristics`` on planner contexts of the workload."""
+    heuristics = mine_heuristics(labelled_episodes(releases), min_confidence=0.5)
+    contexts = [build_context(new_release_state(r), r) for r in releases]
+    report = drive(lambda context: applicable_heuristics(heuristics, context), contexts)
+    return {"heuristics": len(heuristics), **report}
+
+
+def bench_memory_write(store, releases: list, args) -> dict:
+    """Time ``EpisodicMemory.write`` for one episode per release."""
+    memory = EpisodicMemory(store)
+    episodes = labelled_episodes(releases[: args.writes])
+    return drive(
+        lambda e: memory.write(e["context"], e["decision"], "SUCCESS"),
+        episodes,
+        rate=args.rate,
+        workers=args.workers,
+    )
+
+
+def bench_pipeline(releases: list, args, workdir: Path) -> dict:
+    """Time ``run_release_agent`` end to end on the stub LLM."""
+    memory = EpisodicMemory(JsonlStore(workdir / "pipeline.json"))
+    client = StubClient(latency=args.stub_latency, seed=args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return drive(
+            lambda r: run_release_agent(r, verbose=False, memory=memory, client=client),
+            releases[: args.runs],
+            rate=args.rate,
+            workers=args.workers,
+        )
+
+
+def bench_http(releases: list, args, workdir: Path) -> dict:
+    """Time ``POST /api/runs`` on a server process started for the benchmark."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "RELEASE_AGENT_LLM": "stub",
+        "RELEASE_AGENT_STUB_LATENCY": str(args.stub_latency),
+        "RELEASE_AGENT_LLM_CACHE": "off",
+    }
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "main.py"), "--serve", "--port", str(port)],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(f"{base}/api/scenarios", time.perf_counter() + 30)
+        items = releases[: args.runs]
+        requests = [
+            items[i : i + args.http_batch] for i in range(0, len(items), args.http_batch)
+        ]
+
+        def post(scenarios: list) -> None:
+            request = urllib.request.Request(
+                f"{base}/api/runs",
+                data=json.dumps({"items": scenarios}).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+
+        post(items[:1])  # warm up the server's lazily imported pipeline
+        report = drive(post, requests, rate=args.rate, workers=args.workers)
+        return {"releases_per_request": args.http_batch, **report, **rss_mb(str(server.pid))}
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def git_commit() -> str:
+    """Return the current commit (suffixed ``-dirty`` with local changes), or None."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def compare(previous: dict, current: dict) -> None:
+    """Print per-benchmark metric changes between two results files."""
+    print(f"\ncompare {previous.get('commit')} -> {current.get('commit')}")
+    ignored = {"output", "compare", "only"}
+    changed = sorted(
+        key
+        for key in set(previous.get("config", {})) | set(current["config"])
+        if key not in ignored and previous.get("config", {}).get(key) != current["config"].get(key)
+    )
+    if changed:
+        print(f"  note: configs differ in {', '.join(changed)}")
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric, higher_is_better in COMPARED:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            better = change > 0 if higher_is_better else change < 0
+            verdict = "" if abs(change) < 5 else "better" if better else "worse"
+            print(f"  {name:<20} {metric:<17} {old:>10} -> {new:>10}  {change:+6.1f}%  {verdict}")
+
+
+def main() -> None:
+    """Run the selected benchmarks and write the results file."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--releases", type=int, default=20_000, help="Workload size")
+    parser.add_argument("--writes", type=int, default=2_000, help="Memory writes per backend")
+    parser.add_argument("--runs", type=int, default=200, help="Pipeline and HTTP releases")
+    parser.add_argument("--rate", type=float, help="Open-loop arrivals per second")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--http-batch", type=int, default=1, help="Releases per request")
+    parser.add_argument("--stub-latency", type=float, default=0.0)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    get_cache().enabled = False
+    releases = generate_workload(args.releases, seed=args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        # Relative paths (decision index, LLM cache, default memory) land in workdir.
+        os.chdir(workdir)
+        benchmarks = {
+            "heuristic_match": lambda: bench_heuristic_match(releases, args),
+            "memory_write_jsonl": lambda: bench_memory_write(
+                JsonlStore(workdir / "episodes.json"), releases, args
+            ),
+            "memory_write_sqlite": lambda: bench_memory_write(
+                SqliteStore(workdir / "episodes.db"), releases, args
+            ),
+            "pipeline": lambda: bench_pipeline(releases, args, workdir),
+            "http": lambda: bench_http(releases, args, workdir),
+        }
+        for name in args.only:
+            results[name] = benchmarks[name]()
+            if name != "http":
+                results[name].update(rss_mb())
+            print(f"{name:<20} {json.dumps(results[name])}")
+        os.chdir(ROOT)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "config": vars(args),
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {args.output}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measure decision-index build and query latency at scale.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_vector_index --size 100000 --queries 200
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+if __package__ in (None, ""):  # run as a script: make the repository modules importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from decision_summary import build_context_summary, build_decision_summary
+from vector_index import VectorStore
+
+RISKS = ["LOW", "MEDIUM", "HIGH"]
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+DECISIONS = ["GO", "NO_GO", "DELAY"]
+
+
+def random_context(rng: random.Random) -> dict:
+    """Return a random release context."""
+    return {
+        "feature_risk": rng.choice(RISKS),
+        "day_of_week": rng.choice(DAYS),
+        "service_criticality": rng.choice(RISKS),
+    }
+
+
+def random_summary(rng: random.Random, index: int) -> tuple:
+    """Return a (summary, metadata) pair for a synthetic past release."""
+    context = random_context(rng)
+    decision = rng.choice(DECISIONS)
+    summary = build_decision_summary(
+        context=context,
+        planner={"decision": decision, "reason": f"Synthetic release {index}."},
+        red_team={"risk_level": rng.choice(RISKS), "concerns": ["Synthetic concern."]},
+        final_decision=decision,
+        human_outcome=rng.choice(["SUCCESS", "ABORTED"]),
+    )
+    return summary, {"release_id": f"REL-{index}", "context": context, "decision": decision}
+
+
+def main() -> None:
+    """Build an index of synthetic summaries and time single and batched queries."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1000, help="Summaries per append")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as workdir:
+        store = VectorStore(workdir)
+
+        started = time.perf_counter()
+        for start in range(0, args.size, args.batch):
+            pairs = [random_summary(rng, i) for i in range(start, min(args.size, start + args.batch))]
+            store.add_many([text for text, _ in pairs], [meta for _, meta in pairs])
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reopened = VectorStore(workdir)
+        open_ms = (time.perf_counter() - started) * 1e3
+
+        queries = [build_context_summary(random_context(rng)) for _ in range(args.queries)]
+        samples = []
+        for query in queries:
+            began = time.perf_counter()
+            reopened.search(query, k=args.k)
+            samples.append((time.perf_counter() - began) * 1e3)
+
+        began = time.perf_counter()
+        reopened.search_batch(queries, k=args.k)
+        batch_ms = (time.perf_counter() - began) * 1e3
+
+        entries = len(reopened)
+
+    samples.sort()
+    print(f"entries:              {entries}")
+    print(f"build:                {build_s:.1f} s ({entries / build_s:.0f} summaries/s)")
+    print(f"reopen:               {open_ms:.1f} ms")
+    print(f"query p50:            {statistics.median(samples):.2f} ms")
+    print(f"query p95:            {samples[int(len(samples) * 0.95) - 1]:.2f} ms")
+    print(f"batched ({len(queries)} queries): {batch_ms:.1f} ms ({batch_ms / len(queries):.2f} ms/query)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,15 @@
 """Build a concise decision summary for indexing and recall."""
+def build_context_summary(context: dict) -> str:
+    """Return the release-context block, used alone as a similarity query."""
+    return f"""
+Release context:
+- Environment: prod
+- Feature risk: {context.get("feature_risk")}
+- Day of week: {context.get("day_of_week")}
+- Service criticality: {context.get("service_criticality")}
+""".strip()
+
+
 def build_decision_summary(
     context: dict,
     planner: dict,
@@ -11,11 +22,7 @@ def build_decision_summary(
     It must be concise, narrative, and stable.
     """
     return f"""
-Release context:
-- Environment: prod
-- Feature risk: {context.get("feature_risk")}
-- Day of week: {context.get("day_of_week")}
-- Service criticality: {context.get("service_criticality")}
+{build_context_summary(context)}
 
 Planner decision:
 - Decision: {planner["decision"]}
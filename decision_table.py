@@ -0,0 +1,314 @@
+"""Precompiled planner decisions over the finite release-context lattice.
+
+The planner context is categorical: feature risk x service criticality x day
+x clash x env. ``compile_table`` resolves every cell once (the heuristic fast
+path where it is decisive, otherwise the planner) and ``DecisionTable``
+serves a cell in O(1). The table records its provenance and the heuristic
+set it was compiled against; when the memory's heuristics change, only the
+cells an added, updated or removed ``when`` clause can match are invalidated,
+and those fall back to normal planning until the next compile.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from heuristic_engine import FastPathPolicy
+from planner import MODEL, PROMPT_VERSION, run_planner
+
+TABLE_FILE = Path("decision_table.json")
+TABLE_ENV = "RELEASE_AGENT_DECISION_TABLE"
+TABLE_FORMAT = 1
+
+LEVELS = ("LOW", "MEDIUM", "HIGH")
+DAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+CLASHES = (False, True)
+DEFAULT_ENVS = ("prod",)
+# Lattice axes; a ``when`` key that is not one of them (such as the
+# ``clash_detected`` list) is treated as matching every cell.
+AXES = ("feature_risk", "service_criticality", "day_of_week", "clash", "env")
+
+# One character per cell: upper case from the planner, lower case from heuristics.
+# Only terminal decisions are compiled: a DELAY reschedules and re-plans, so
+# serving it from the table would repeat it until the run hits MAX_DECISIONS.
+CELL_CODES = {
+    ("GO", "planner"): "G",
+    ("NO_GO", "planner"): "N",
+    ("GO", "heuristic"): "g",
+    ("NO_GO", "heuristic"): "n",
+}
+CELL_VALUES = {code: value for value, code in CELL_CODES.items()}
+EMPTY = "."
+
+
+def heuristic_set_version(heuristics: list) -> str:
+    """Return a short content hash identifying a heuristic set."""
+    canonical = json.dumps(heuristics, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _clause_key(heuristic: dict) -> str:
+    """Return a hashable key for a heuristic's ``when`` clause."""
+    return json.dumps(heuristic["when"], sort_keys=True)
+
+
+def changed_clauses(before: list, after: list) -> list:
+    """Return the ``when`` clauses whose heuristics differ between two sets."""
+    groups = ({}, {})
+    for group, heuristics in zip(groups, (before, after)):
+        for heuristic in heuristics:
+            group.setdefault(_clause_key(heuristic), []).append(heuristic)
+    old, new = groups
+    return [json.loads(key) for key in old.keys() | new.keys() if old.get(key) != new.get(key)]
+
+
+class DecisionTable:
+    """Decisions for every cell of the context lattice, with provenance."""
+
+    def __init__(self, envs=DEFAULT_ENVS, cells: str = None, heuristics=(), provenance=None):
+        """Create an empty table, or restore one from its saved fields."""
+        self.envs = tuple(envs)
+        self.axes = (LEVELS, LEVELS, DAYS, CLASHES, self.envs)
+        self._positions = [{value: i for i, value in enumerate(axis)} for axis in self.axes]
+        self._strides = []
+        stride = 1
+        for axis in reversed(self.axes):
+            self._strides.insert(0, stride)
+            stride *= len(axis)
+        self.size = stride
+        self.cells = list(cells) if cells is not None else [EMPTY] * self.size
+        if len(self.cells) != self.size:
+            raise ValueError(f"expected {self.size} cells, got {len(self.cells)}")
+        self.heuristics = list(heuristics)
+        self.provenance = dict(provenance or {})
+        self._synced = None  # (memory id, heuristic version) last reconciled
+        self._lock = threading.Lock()
+
+    def position(self, context: dict):
+        """Return the cell index for a planner context, or None outside the lattice."""
+        clash = context.get("clash_detected")
+        clash = any(clash) if isinstance(clash, list) else bool(clash)
+        values = (
+            context.get("feature_risk"),
+            context.get("service_criticality"),
+            context.get("day_of_week"),
+            clash,
+            context.get("env"),
+        )
+        index = 0
+        for value, positions, stride in zip(values, self._positions, self._strides):
+            offset = positions.get(value)
+            if offset is None:
+                return None
+            index += offset * stride
+        return index
+
+    def contexts(self):
+        """Yield ``(position, planner context)`` for every cell, in position order."""
+        for index in range(self.size):
+            risk, criticality, day, clash, env = (
+                axis[index // stride % len(axis)] for axis, stride in zip(self.axes, self._strides)
+            )
+            yield index, {
+                "feature_risk": risk,
+                "day_of_week": day,
+                "service_criticality": criticality,
+                "clash_detected": [clash],
+                "env": env,
+            }
+
+    def _matches(self, index: int, when: dict) -> bool:
+        """Return True when a ``when`` clause could apply to the cell at ``index``."""
+        for key, value in when.items():
+            if key in AXES:
+                axis, stride = self.axes[AXES.index(key)], self._strides[AXES.index(key)]
+                if axis[index // stride % len(axis)] != value:
+                    return False
+        return True
+
+    def invalidate(self, clauses: list) -> int:
+        """Empty every cell one of ``clauses`` could match; return how many were emptied."""
+        emptied = 0
+        for index in range(self.size):
+            if self.cells[index] != EMPTY and any(self._matches(index, w) for w in clauses):
+                self.cells[index] = EMPTY
+                emptied += 1
+        return emptied
+
+    def sync(self, memory) -> int:
+        """Invalidate the cells affected by heuristic changes since the last sync.
+
+        Cheap when nothing changed: one version check against ``memory``.
+        """
+        version = (id(memory), memory.heuristic_version())
+        if version == self._synced:
+            return 0
+        with self._lock:
+            current = list(memory.heuristics())
+            emptied = self.invalidate(changed_clauses(self.heuristics, current))
+            self.heuristics = current
+            self.provenance["heuristic_version"] = heuristic_set_version(current)
+            self._synced = version
+        if emptied:
+            print(f"DECISION TABLE: {emptied} CELLS INVALIDATED BY HEURISTIC CHANGES")
+        return emptied
+
+    def set(self, index: int, decision: str, source: str) -> None:
+        """Store a compiled decision for the cell at ``index``."""
+        self.cells[index] = CELL_CODES[(decision, source)]
+
+    def lookup(self, context: dict):
+        """Return ``(decision, compiled source)`` for a context, or None for a miss."""
+        index = self.position(context)
+        if index is None:
+            return None
+        return CELL_VALUES.get(self.cells[index])  # empty or retired (DELAY) codes miss
+
+    def plan(self, context: dict, memory, heuristics: bool = True):
+        """Return a planner-shaped decision for ``context``, or None on a miss.
+
+        With ``heuristics=False`` (fast path disabled) cells compiled from a
+        heuristic miss too, so only planner decisions are served.
+        """
+        self.sync(memory)
+        hit = self.lookup(context)
+        if hit is None or (not heuristics and hit[1] == "heuristic"):
+            return None
+        decision, compiled_from = hit
+        return {
+            "decision": decision,
+            "reason": (
+                f"Decision table: {compiled_from} decision compiled "
+                f"{self.provenance.get('compiled_at', 'earlier')}."
+            ),
+            "source": "table",
+            "compiled_from": compiled_from,
+        }
+
+    def filled(self) -> int:
+        """Return how many cells hold a decision."""
+        return sum(cell != EMPTY for cell in self.cells)
+
+    def to_dict(self) -> dict:
+        """Return the JSON-serialisable form of the table."""
+        return {
+            "format": TABLE_FORMAT,
+            "axes": dict(zip(AXES, (list(axis) for axis in self.axes))),
+            "cells": "".join(self.cells),
+            "heuristics": self.heuristics,
+            "provenance": self.provenance,
+        }
+
+    def save(self, path=TABLE_FILE) -> None:
+        """Atomically write the table to ``path``."""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=TABLE_FILE) -> "DecisionTable":
+        """Read a table written by ``save``."""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("format") != TABLE_FORMAT:
+            raise ValueError(f"Unsupported decision table format: {data.get('format')}")
+        return cls(
+            envs=data["axes"]["env"],
+            cells=data["cells"],
+            heuristics=data["heuristics"],
+            provenance=data["provenance"],
+        )
+
+
+def compile_table(
+    memory,
+    client,
+    policy: FastPathPolicy = None,
+    envs=DEFAULT_ENVS,
+    table: DecisionTable = None,
+) -> DecisionTable:
+    """Fill every empty cell of ``table`` (default: a new one) and return it.
+
+    A cell takes the fast-path decision when ``policy`` finds a decisive
+    heuristic and otherwise asks the planner. Cells whose planner call fell
+    back (LLM unavailable) or decided DELAY stay empty. An existing table compiled for another
+    planner model, prompt version or env set is rebuilt from scratch.
+    """
+    policy = policy if policy is not None else FastPathPolicy.from_env()
+    provenance = {"planner_model": MODEL, "prompt_version": PROMPT_VERSION}
+    if table is None or table.envs != tuple(envs) or any(
+        table.provenance.get(key) != value for key, value in provenance.items()
+    ):
+        table = DecisionTable(envs)
+    table.sync(memory)
+
+    started = time.perf_counter()
+    index = memory.heuristic_index()
+    compiled = failed = delayed = 0
+    for position, context in table.contexts():
+        if table.cells[position] != EMPTY:
+            continue
+        applicable = index.applicable(context)
+        plan = policy.decide(applicable)
+        if plan is None:
+            plan = run_planner(client=client, context=context, heuristics=applicable, similar=[])
+        value = (plan["decision"], plan.get("source", "planner"))
+        if value == ("DELAY", "planner"):  # re-planned at run time, never compiled
+            delayed += 1
+            continue
+        if value not in CELL_CODES:  # fallback plans and off-schema decisions
+            failed += 1
+            continue
+        table.set(position, *value)
+        compiled += 1
+
+    table.provenance.update(
+        provenance,
+        compiled_at=datetime.now(timezone.utc).isoformat(),
+        llm_backend=type(client).__name__,
+        fast_path={
+            "enabled": policy.enabled,
+            "min_confidence": policy.min_confidence,
+            "min_support": policy.min_support,
+            "tie_break": policy.tie_break,
+        },
+        compiled_cells=compiled,
+        failed_cells=failed,
+        delay_cells=delayed,
+        compile_seconds=round(time.perf_counter() - started, 3),
+    )
+    return table
+
+
+_default_table = None
+_default_key = None
+_default_lock = threading.Lock()
+
+
+def get_decision_table():
+    """Return the process-wide table from ``decision_table.json``, or None.
+
+    Reloaded when the file is replaced (e.g. by a compile in another
+    process). Set RELEASE_AGENT_DECISION_TABLE=off to disable it.
+    """
+    global _default_table, _default_key
+    if os.environ.get(TABLE_ENV, "on").lower() in {"off", "0", "false"}:
+        return None
+    try:
+        st = TABLE_FILE.stat()
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        key = None
+    with _default_lock:
+        if key != _default_key:
+            _default_key = key
+            _default_table = None
+            if key is not None:
+                try:
+                    _default_table = DecisionTable.load(TABLE_FILE)
+                except (OSError, ValueError, KeyError) as exc:
+                    print(f"DECISION TABLE IGNORED: {exc}")
+        return _default_table
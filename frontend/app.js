@@ -42,27 +42,7 @@ function highlightPipeline(index) {
   });
 }
 
-function delay(ms) {
-  return new Promise((resolve) => setTimeout(resolve, ms));
-}
-
-function startPipelineAnimation() {
-  let index = 0;
-  pipelineSteps.forEach((step) => step.classList.remove("done"));
-  highlightPipeline(index);
-  const timer = setInterval(() => {
-    index = (index + 1) % pipelineSteps.length;
-    highlightPipeline(index);
-  }, 450);
-  return () => clearInterval(timer);
-}
-
-async function finishPipelineAnimation(stopAnimation) {
-  stopAnimation();
-  for (let i = 0; i < pipelineSteps.length; i += 1) {
-    highlightPipeline(i);
-    await delay(160);
-  }
+function completePipeline() {
   pipelineSteps.forEach((step) => step.classList.add("done"));
   pipelineSteps.forEach((step) => step.classList.remove("active"));
 }
@@ -77,32 +57,115 @@ function updateDecision(decision) {
   }
 }
 
-function formatLog(data) {
-  return data.steps
-    .map((step, index) => {
-      const concerns = step.red_team.concerns.length
-        ? `<ul>${step.red_team.concerns.map((c) => `<li>${c}</li>`).join("")}</ul>`
-        : "<div class=\"muted\">No concerns flagged.</div>";
-      return `
+// Server-sent event kind -> index of the pipeline step it completes.
+const EVENT_STAGE = {
+  context: 0,
+  heuristics: 1,
+  plan: 2,
+  red_team: 3,
+  transition: 4,
+  episode: 4,
+  reflection: 4,
+};
+
+const PLAN_SOURCE_LABEL = {
+  heuristic: " (local heuristic)",
+  table: " (decision table)",
+  fallback: " (LLM unavailable)",
+};
+
+function formatStep(step, index) {
+  const plan = step.plan
+    ? `<div class="log-value">${step.plan.decision}${PLAN_SOURCE_LABEL[step.plan.source] || ""}</div>
+            <div class="log-reason">${step.plan.reason}</div>`
+    : "<div class=\"muted\">Planning...</div>";
+  let redTeam = "<div class=\"muted\">Waiting for plan...</div>";
+  if (step.red_team) {
+    const concerns = step.red_team.concerns.length
+      ? `<ul>${step.red_team.concerns.map((c) => `<li>${c}</li>`).join("")}</ul>`
+      : "<div class=\"muted\">No concerns flagged.</div>";
+    redTeam = `<div class="log-value">${step.red_team.risk_level} (${step.red_team.suggested_action})</div>
+            ${concerns}`;
+  } else if (step.plan) {
+    redTeam = "<div class=\"muted\">Reviewing...</div>";
+  }
+  return `
         <div class="log-block">
-          <div class="log-step">Step ${index + 1}: ${step.action}</div>
+          <div class="log-step">Step ${index + 1}: ${step.action || step.stage}</div>
           <div class="log-section">
             <div class="log-label">Planner decision</div>
-            <div class="log-value">${step.plan.decision}</div>
-            <div class="log-reason">${step.plan.reason}</div>
+            ${plan}
           </div>
           <div class="log-section">
             <div class="log-label">Red team</div>
-            <div class="log-value">${step.red_team.risk_level} (${step.red_team.suggested_action})</div>
-            ${concerns}
+            ${redTeam}
           </div>
         </div>
       `;
-    })
-    .concat(
-      `<div class="log-final">Final decision: <strong>${data.decision}</strong></div>`
-    )
-    .join("");
+}
+
+function formatLog(data) {
+  const blocks = data.steps.map(formatStep);
+  if (data.decision) {
+    blocks.push(`<div class="log-final">Final decision: <strong>${data.decision}</strong></div>`);
+  }
+  return blocks.join("");
+}
+
+function streamRun(scenarioId, live) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/api/run/stream?scenario=${encodeURIComponent(scenarioId)}`);
+    let finished = false;
+    const current = () => live.steps[live.steps.length - 1];
+
+    const on = (kind, handler) => {
+      source.addEventListener(kind, (event) => {
+        handler(JSON.parse(event.data));
+        if (kind in EVENT_STAGE) {
+          highlightPipeline(EVENT_STAGE[kind]);
+        }
+        logOutput.innerHTML = formatLog(live);
+      });
+    };
+
+    on("context", (payload) => live.steps.push({ stage: payload.stage, context: payload.context }));
+    on("heuristics", (payload) => {
+      current().heuristics = payload.heuristics;
+    });
+    on("plan", (payload) => {
+      current().plan = payload.plan;
+    });
+    on("red_team", (payload) => {
+      current().red_team = payload.red_team;
+    });
+    on("transition", (payload) => {
+      current().action = payload.action;
+    });
+    on("episode", (payload) => {
+      live.decision = payload.decision;
+      updateDecision(payload.decision);
+      reflectionBox.textContent = "Running reflection checks...";
+    });
+    on("reflection", (payload) => {
+      reflectionBox.textContent = payload.ran
+        ? `Reflection ran. Heuristics added: ${payload.added}, merged: ${payload.merged}`
+        : "Reflection not triggered.";
+    });
+    source.addEventListener("result", (event) => {
+      finished = true;
+      source.close();
+      resolve(JSON.parse(event.data));
+    });
+    // Fired both for server-sent "error" events and for dropped connections.
+    source.addEventListener("error", (event) => {
+      if (finished) {
+        return;
+      }
+      finished = true;
+      source.close();
+      reject(new Error(event.data ? JSON.parse(event.data).error : "Stream interrupted"));
+    });
+  });
 }
 
 async function fetchScenarios() {
@@ -145,25 +208,20 @@ async function runDemo() {
   logOutput.textContent = "Executing pipeline...";
   rawOutput.textContent = "{}";
 
-  const stopPipeline = startPipelineAnimation();
+  highlightPipeline(0);
   try {
-    const response = await fetch(`/api/run?scenario=${encodeURIComponent(scenarioId)}`);
-    if (!response.ok) {
-      const message = await response.text();
-      throw new Error(message || "Run failed");
-    }
-    const data = await response.json();
-    await finishPipelineAnimation(stopPipeline);
+    const live = { steps: [], decision: null };
+    const data = await streamRun(scenarioId, live);
+    completePipeline();
     updateDecision(data.decision);
     decisionMeta.textContent = `History entries: ${data.history.length}`;
     reflectionBox.textContent = data.reflection.ran
-      ? `Reflection ran. Heuristics added: ${data.reflection.added}`
+      ? `Reflection ran. Heuristics added: ${data.reflection.added}, merged: ${data.reflection.merged}`
       : "Reflection not triggered.";
     logOutput.innerHTML = formatLog(data);
     rawOutput.textContent = JSON.stringify(data, null, 2);
     setStatus("Complete");
   } catch (error) {
-    stopPipeline();
     resetPipeline();
     logOutput.textContent = `Error: ${error.message}`;
     rawOutput.textContent = "{}";
@@ -1,6 +1,13 @@
 """Match learned heuristics against the current release context."""
+import os
+from bisect import insort
+from dataclasses import dataclass
 
 CONFIDENCE_THRESHOLD = 0.6
+FAST_PATH_ENV = "RELEASE_AGENT_FAST_PATH"
+# Most conservative first; used to settle conflicting recommendations.
+CONSERVATIVE_ORDER = ("NO_GO", "DELAY", "GO")
+TERMINAL_RECOMMENDATIONS = {"GO", "NO_GO"}
 
 
 def heuristic_applies(heuristic: dict, context: dict) -> bool:
@@ -18,3 +25,187 @@ def applicable_heuristics(heuristics: list, context: dict) -> list:
         for h in heuristics
         if h["confidence"] >= CONFIDENCE_THRESHOLD and heuristic_applies(h, context)
     ]
+
+
+@dataclass
+class FastPathPolicy:
+    """When applicable heuristics are decisive enough to skip the LLM planner.
+
+    Only heuristics with at least ``min_confidence`` (which must be above
+    ``CONFIDENCE_THRESHOLD``) and ``min_support`` supporting episodes count.
+    If they disagree, ``tie_break="conservative"`` picks the most cautious
+    recommendation and ``"specific"`` prefers the rule with the most
+    conditions, then the highest confidence. Only terminal decisions (GO,
+    NO_GO) are served locally: a DELAY would reschedule and re-enter the
+    loop, so it is left to the planner.
+    """
+
+    min_confidence: float = 0.85
+    min_support: int = 5
+    tie_break: str = "conservative"
+    enabled: bool = True
+
+    def __post_init__(self):
+        """Reject thresholds that would let weak heuristics bypass the planner."""
+        if self.min_confidence <= CONFIDENCE_THRESHOLD:
+            raise ValueError(
+                f"min_confidence must be above CONFIDENCE_THRESHOLD ({CONFIDENCE_THRESHOLD})"
+            )
+        if self.tie_break not in {"conservative", "specific"}:
+            raise ValueError(f"Unknown tie_break: {self.tie_break}")
+
+    @classmethod
+    def from_env(cls) -> "FastPathPolicy":
+        """Build the policy from RELEASE_AGENT_FAST_PATH* environment variables."""
+        return cls(
+            min_confidence=float(os.environ.get(f"{FAST_PATH_ENV}_CONFIDENCE", "0.85")),
+            min_support=int(os.environ.get(f"{FAST_PATH_ENV}_SUPPORT", "5")),
+            tie_break=os.environ.get(f"{FAST_PATH_ENV}_TIE_BREAK", "conservative"),
+            enabled=os.environ.get(FAST_PATH_ENV, "on").lower() not in {"off", "0", "false"},
+        )
+
+    def decide(self, applicable: list):
+        """Return a planner-shaped decision resolved from heuristics, or None."""
+        if not self.enabled:
+            return None
+        strong = [
+            h
+            for h in applicable
+            if h["confidence"] >= self.min_confidence
+            and h["supporting_episodes"] >= self.min_support
+        ]
+        if not strong:
+            return None
+
+        if self.tie_break == "conservative":
+            rule = min(
+                strong,
+                key=lambda h: (
+                    CONSERVATIVE_ORDER.index(h["recommendation"]),
+                    -h["confidence"],
+                    -h["supporting_episodes"],
+                ),
+            )
+        else:
+            rule = max(
+                strong,
+                key=lambda h: (
+                    len(h["when"]),
+                    h["confidence"],
+                    -CONSERVATIVE_ORDER.index(h["recommendation"]),
+                ),
+            )
+        if rule["recommendation"] not in TERMINAL_RECOMMENDATIONS:
+            return None
+
+        conflicting = len({h["recommendation"] for h in strong}) > 1
+        return {
+            "decision": rule["recommendation"],
+            "reason": (
+                f"Heuristic fast path: {rule['when']} -> {rule['recommendation']} "
+                f"(confidence {rule['confidence']}, {rule['supporting_episodes']} episodes"
+                f"{', ' + self.tie_break + ' tie-break' if conflicting else ''})."
+            ),
+            "source": "heuristic",
+            "heuristic": rule,
+        }
+
+
+def merge_heuristic(existing: dict, candidate: dict) -> dict:
+    """Fold a candidate with the same ``when`` clause into an existing heuristic.
+
+    Confidence becomes the support-weighted agreement with the existing
+    recommendation; if the combined evidence favours the candidate's
+    recommendation instead, that recommendation takes over.
+    """
+    total = existing["supporting_episodes"] + candidate["supporting_episodes"]
+    agreement = candidate["confidence"]
+    if candidate["recommendation"] != existing["recommendation"]:
+        agreement = 1 - agreement
+    confidence = (
+        existing["confidence"] * existing["supporting_episodes"]
+        + agreement * candidate["supporting_episodes"]
+    ) / total
+
+    recommendation = existing["recommendation"]
+    if confidence < 0.5:
+        recommendation, confidence = candidate["recommendation"], 1 - confidence
+    confidence = round(confidence, 2)
+    if total < 3:
+        confidence = min(confidence, 0.6)
+
+    return {
+        **existing,
+        "recommendation": recommendation,
+        "confidence": confidence,
+        "supporting_episodes": total,
+    }
+
+
+def _freeze(value):
+    """Return a hashable stand-in for a JSON value."""
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class HeuristicIndex:
+    """Precompiled index answering ``applicable_heuristics`` without a full scan.
+
+    Heuristics are grouped by the set of attributes in their ``when`` clause.
+    Within each group, the tuple of required (attribute, value) pairs maps to a
+    posting list sorted by descending confidence. A lookup costs one dict probe
+    per distinct attribute set, independent of how many heuristics exist.
+    """
+
+    def __init__(self, heuristics=()):
+        """Build the index from an iterable of heuristic records."""
+        self._heuristics = []
+        self._groups = {}  # attribute tuple -> {value tuple -> posting list}
+        for heuristic in heuristics:
+            self.add(heuristic)
+
+    def __len__(self) -> int:
+        """Return the number of indexed heuristics."""
+        return len(self._heuristics)
+
+    def add(self, heuristic: dict) -> None:
+        """Index one more heuristic, keeping posting lists confidence-sorted."""
+        position = len(self._heuristics)
+        self._heuristics.append(heuristic)
+        insort(self._postings(heuristic["when"]), (-heuristic["confidence"], position))
+
+    def replace(self, position: int, heuristic: dict) -> None:
+        """Swap the heuristic at ``position`` for an updated version."""
+        old = self._heuristics[position]
+        self._postings(old["when"]).remove((-old["confidence"], position))
+        self._heuristics[position] = heuristic
+        insort(self._postings(heuristic["when"]), (-heuristic["confidence"], position))
+
+    def find(self, when: dict):
+        """Return the position of the most confident heuristic with exactly ``when``, or None."""
+        attributes = tuple(sorted(when))
+        values = tuple(_freeze(when[key]) for key in attributes)
+        postings = self._groups.get(attributes, {}).get(values)
+        return postings[0][1] if postings else None
+
+    def _postings(self, when: dict) -> list:
+        """Return (creating if needed) the posting list for a ``when`` clause."""
+        attributes = tuple(sorted(when))
+        values = tuple(_freeze(when[key]) for key in attributes)
+        return self._groups.setdefault(attributes, {}).setdefault(values, [])
+
+    def applicable(self, context: dict, min_confidence: float = CONFIDENCE_THRESHOLD) -> list:
+        """Return the same heuristics, in the same order, as ``applicable_heuristics``."""
+        positions = []
+        for attributes, buckets in list(self._groups.items()):
+            values = tuple(_freeze(context.get(key)) for key in attributes)
+            for neg_confidence, position in buckets.get(values, ()):
+                if -neg_confidence < min_confidence:
+                    break
+                positions.append(position)
+
+        positions.sort()
+        return [self._heuristics[p] for p in positions]
@@ -0,0 +1,195 @@
+"""Mine decision heuristics from episode history without an LLM.
+
+Episodes are categorical contexts with a final decision, so heuristics can
+be counted directly: for every subset of the context attributes, group the
+episodes by their values and emit the majority recommendation when support
+and agreement are high enough. Counting is vectorized with NumPy when it is
+installed and falls back to pure Python otherwise. Episodes may carry a
+``count`` weight, as retention's rolled-up history does.
+"""
+from collections import Counter
+from itertools import combinations
+
+from heuristic_validation import validate_heuristic
+
+ATTRIBUTES = ("feature_risk", "service_criticality", "day_of_week")
+RECOMMENDATIONS = ("GO", "NO_GO", "DELAY")
+RECOMMENDATION_FOR = {"GO": "GO", "ABORT": "NO_GO", "NO_GO": "NO_GO", "DELAY": "DELAY"}
+MIN_SUPPORT = 3
+MIN_CONFIDENCE = 0.6
+
+
+def _subsets(attributes: tuple) -> list:
+    """Return every non-empty attribute subset, most general first."""
+    return [
+        subset
+        for size in range(1, len(attributes) + 1)
+        for subset in combinations(attributes, size)
+    ]
+
+
+def _heuristic(when: dict, counts: list, min_support: int, min_confidence: float):
+    """Build a heuristic from per-recommendation counts, or None below thresholds."""
+    support = sum(counts)
+    if support < max(1, min_support):
+        return None
+    best = max(range(len(counts)), key=lambda i: (counts[i], -i))
+    confidence = counts[best] / support
+    if confidence < min_confidence:
+        return None
+    confidence = round(confidence, 2)
+    if support < 3:
+        confidence = min(confidence, 0.6)
+    return {
+        "when": when,
+        "recommendation": RECOMMENDATIONS[best],
+        "confidence": confidence,
+        "supporting_episodes": support,
+    }
+
+
+def _prune(heuristics: list) -> list:
+    """Drop heuristics that add nothing over a more general one.
+
+    A heuristic is redundant when some heuristic on a strict subset of its
+    attributes makes the same recommendation with at least its confidence.
+    """
+    by_when = {tuple(sorted(h["when"].items())): h for h in heuristics}
+    kept = []
+    for heuristic in heuristics:
+        items = tuple(sorted(heuristic["when"].items()))
+        redundant = False
+        for size in range(1, len(items)):
+            for general in combinations(items, size):
+                parent = by_when.get(general)
+                if (
+                    parent is not None
+                    and parent["recommendation"] == heuristic["recommendation"]
+                    and parent["confidence"] >= heuristic["confidence"]
+                ):
+                    redundant = True
+                    break
+            if redundant:
+                break
+        if not redundant:
+            kept.append(heuristic)
+    return kept
+
+
+def _mine_python(episodes: list, attributes: tuple, min_support: int, min_confidence: float):
+    """Count (subset values, recommendation) pairs with ``Counter``."""
+    rows = []
+    for episode in episodes:
+        recommendation = RECOMMENDATION_FOR.get(episode.get("decision"))
+        if recommendation is None:
+            continue
+        context = episode.get("context", {})
+        rows.append(
+            (tuple(context.get(a) for a in attributes), recommendation, episode.get("count", 1))
+        )
+
+    heuristics = []
+    for subset in _subsets(attributes):
+        positions = [attributes.index(a) for a in subset]
+        counts = Counter()
+        for values, recommendation, weight in rows:
+            counts[tuple(values[p] for p in positions), recommendation] += weight
+
+        groups = {}
+        for (values, recommendation), count in counts.items():
+            if None in values:
+                continue
+            group = groups.setdefault(values, [0] * len(RECOMMENDATIONS))
+            group[RECOMMENDATIONS.index(recommendation)] += count
+        for values in groups:
+            heuristic = _heuristic(
+                dict(zip(subset, values)), groups[values], min_support, min_confidence
+            )
+            if heuristic is not None:
+                heuristics.append(heuristic)
+    return heuristics
+
+
+def _mine_numpy(np, episodes: list, attributes: tuple, min_support: int, min_confidence: float):
+    """Count with one ``bincount`` per attribute subset over integer-coded columns."""
+    labels = [
+        RECOMMENDATIONS.index(RECOMMENDATION_FOR[e["decision"]])
+        if e.get("decision") in RECOMMENDATION_FOR
+        else -1
+        for e in episodes
+    ]
+    labels = np.asarray(labels, dtype=np.int64)
+    keep = labels >= 0
+    labels = labels[keep]
+    weights = np.asarray([e.get("count", 1) for e in episodes], dtype=np.int64)[keep]
+
+    vocabularies, columns = [], []
+    for attribute in attributes:
+        vocabulary = {None: 0}  # code 0 marks a missing attribute
+        codes = [
+            vocabulary.setdefault(e.get("context", {}).get(attribute), len(vocabulary))
+            for e in episodes
+        ]
+        vocabularies.append(list(vocabulary))
+        columns.append(np.asarray(codes, dtype=np.int64)[keep])
+
+    n_labels = len(RECOMMENDATIONS)
+    heuristics = []
+    for subset in _subsets(attributes):
+        positions = [attributes.index(a) for a in subset]
+        sizes = [len(vocabularies[p]) for p in positions]
+        key = np.zeros(len(labels), dtype=np.int64)
+        for p, size in zip(positions, sizes):
+            key = key * size + columns[p]
+
+        counts = np.bincount(
+            key * n_labels + labels, weights=weights, minlength=int(np.prod(sizes)) * n_labels
+        )
+        counts = counts.astype(np.int64).reshape(-1, n_labels)
+        support = counts.sum(axis=1)
+        codes = np.unravel_index(np.arange(len(counts)), sizes)
+        complete = np.all([c > 0 for c in codes], axis=0)
+        candidates = np.flatnonzero(complete & (support >= min_support))
+
+        for row in candidates.tolist():
+            when = {
+                attribute: vocabularies[p][int(code[row])]
+                for attribute, p, code in zip(subset, positions, codes)
+            }
+            heuristic = _heuristic(when, counts[row].tolist(), min_support, min_confidence)
+            if heuristic is not None:
+                heuristics.append(heuristic)
+    return heuristics
+
+
+def mine_heuristics(
+    episodes: list,
+    attributes: tuple = ATTRIBUTES,
+    min_support: int = MIN_SUPPORT,
+    min_confidence: float = MIN_CONFIDENCE,
+    use_numpy: bool = None,
+) -> list:
+    """Return validated, non-redundant heuristics mined from ``episodes``.
+
+    ``use_numpy`` defaults to True when NumPy can be imported.
+    """
+    np = None
+    if use_numpy is not False:
+        try:
+            import numpy as np
+        except ImportError:
+            if use_numpy:
+                raise
+
+    if np is not None:
+        heuristics = _mine_numpy(np, episodes, attributes, min_support, min_confidence)
+    else:
+        heuristics = _mine_python(episodes, attributes, min_support, min_confidence)
+
+    heuristics = _prune(heuristics)
+    heuristics.sort(
+        key=lambda h: (len(h["when"]), -h["supporting_episodes"], list(h["when"].items()))
+    )
+    for heuristic in heuristics:
+        validate_heuristic(heuristic)
+    return heuristics
@@ -1,5 +1,7 @@
 """Validate learned heuristics before adding them to memory."""
-ALLOWED_ACTIONS = {"GO", "NO_GO", "DELAY"}
+from vocabulary import Recommendation
+
+ALLOWED_ACTIONS = frozenset(Recommendation)
 
 
 def validate_heuristic(h: dict) -> None:
@@ -0,0 +1,325 @@
+"""Persistent, prioritized queue of release evaluations behind ``/api/jobs``.
+
+Jobs live in a local SQLite database, so queued work survives a server
+restart. Workers claim the most urgent queued job first: production before
+staging before any other env, then HIGH before MEDIUM before LOW service
+criticality, then submission order. A job whose ``release_id`` (or, without
+one, whose pipeline inputs) matches a queued or running job is not queued
+again; the caller gets the existing job instead. Running jobs hold a lease
+that their worker pool renews; a job whose lease lapses (its server died)
+goes back to the queue.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from batch import scenario_key
+from metrics import STAGE_SECONDS
+
+JOBS_DB = Path("jobs.db")
+JOB_WORKERS_ENV = "RELEASE_AGENT_JOB_WORKERS"
+DEFAULT_WORKERS = 4
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 1.0
+LEASE_SECONDS = 30.0
+FINISHED_TTL_DAYS = 7
+ENV_PRIORITY = {"prod": 0, "production": 0, "staging": 1}
+OTHER_ENV_PRIORITY = 2
+CRITICALITY_PRIORITY = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+COLUMNS = (
+    "id",
+    "release_id",
+    "priority",
+    "status",
+    "scenario",
+    "result",
+    "error",
+    "attempts",
+    "worker",
+    "heartbeat_at",
+    "created_at",
+    "started_at",
+    "finished_at",
+)
+
+
+def job_priority(scenario: dict) -> int:
+    """Return the scenario's queue priority; lower runs first."""
+    env = ENV_PRIORITY.get(str(scenario.get("env", "prod")).lower(), OTHER_ENV_PRIORITY)
+    criticality = CRITICALITY_PRIORITY.get(
+        str(scenario.get("service_criticality")).upper(), len(CRITICALITY_PRIORITY)
+    )
+    return env * 10 + criticality
+
+
+def dedupe_key(scenario: dict) -> str:
+    """Return the release_id, or the pipeline inputs for scenarios without one."""
+    return scenario.get("release_id") or scenario_key(scenario)
+
+
+def _now() -> str:
+    """Return the current UTC time as an ISO timestamp."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobQueue:
+    """SQLite-backed job table in WAL mode, one connection per thread."""
+
+    def __init__(self, path=JOBS_DB):
+        """Open (and create) the job database."""
+        self.path = Path(path)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, "
+            "dedupe_key TEXT NOT NULL, release_id TEXT, priority INTEGER NOT NULL, "
+            "status TEXT NOT NULL, scenario TEXT NOT NULL, result TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, heartbeat_at REAL, "
+            "created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT)"
+        )
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS jobs_active ON jobs (dedupe_key) "
+            "WHERE status IN ('queued', 'running')"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (priority, seq) "
+            "WHERE status = 'queued'"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, work):
+        """Run ``work(conn)`` in a write transaction and return its result."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _job(self, conn, where: str, params: tuple):
+        """Return the first job matching ``where`` as a dict, or None."""
+        row = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE {where}", params
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(COLUMNS, row))
+        job["scenario"] = json.loads(job["scenario"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, scenario: dict):
+        """Queue ``scenario``; return (job, True) when an active duplicate was reused."""
+        key = dedupe_key(scenario)
+
+        def work(conn):
+            existing = self._job(
+                conn, "dedupe_key = ? AND status IN ('queued', 'running')", (key,)
+            )
+            if existing is not None:
+                return existing, True
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, dedupe_key, release_id, priority, status, scenario, "
+                "created_at) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (
+                    job_id,
+                    key,
+                    scenario.get("release_id"),
+                    job_priority(scenario),
+                    json.dumps(scenario),
+                    _now(),
+                ),
+            )
+            return self._job(conn, "id = ?", (job_id,)), False
+
+        return self._transaction(work)
+
+    def get(self, job_id: str):
+        """Return a job with its ``queue_position`` while queued, or None."""
+        conn = self._connect()
+        job = self._job(conn, "id = ?", (job_id,))
+        if job is not None and job["status"] == "queued":
+            job["queue_position"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND (priority < ? OR "
+                "(priority = ? AND seq < (SELECT seq FROM jobs WHERE id = ?)))",
+                (job["priority"], job["priority"], job_id),
+            ).fetchone()[0]
+        return job
+
+    def counts(self) -> dict:
+        """Return the number of jobs per status."""
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(rows.fetchall())
+
+    def claim(self, worker: str):
+        """Mark the most urgent queued job as running by ``worker`` and return it."""
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+            return None  # idle polls never take the write lock
+
+        def work(conn):
+            job = self._job(conn, "status = 'queued' ORDER BY priority, seq LIMIT 1", ())
+            if job is None:
+                return None
+            job.update(
+                status="running",
+                worker=worker,
+                heartbeat_at=time.time(),
+                started_at=_now(),
+                attempts=job["attempts"] + 1,
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, heartbeat_at = ?, "
+                "started_at = ?, attempts = ? WHERE id = ?",
+                (worker, job["heartbeat_at"], job["started_at"], job["attempts"], job["id"]),
+            )
+            return job
+
+        return self._transaction(work)
+
+    def complete(self, job: dict, result: dict) -> None:
+        """Store the result of a claimed job, unless its lease was lost meanwhile."""
+        self._connect().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? "
+            "WHERE id = ? AND status = 'running' AND worker = ?",
+            (json.dumps(result), _now(), job["id"], job["worker"]),
+        )
+
+    def fail(self, job: dict, error: str) -> None:
+        """Requeue a claimed job that raised, or fail it after ``MAX_ATTEMPTS`` attempts."""
+        self._connect().execute(
+            "UPDATE jobs SET error = ?, worker = NULL, "
+            "status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END, "
+            "finished_at = CASE WHEN attempts < ? THEN NULL ELSE ? END "
+            "WHERE id = ? AND status = 'running' AND worker = ?",
+            (error, MAX_ATTEMPTS, MAX_ATTEMPTS, _now(), job["id"], job["worker"]),
+        )
+
+    def heartbeat(self, worker: str) -> None:
+        """Renew the lease on every job ``worker`` is running."""
+        self._connect().execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status = 'running'",
+            (time.time(), worker),
+        )
+
+    def recover(self, lease_seconds: float = LEASE_SECONDS) -> int:
+        """Requeue running jobs whose lease lapsed; return how many.
+
+        A job interrupted ``MAX_ATTEMPTS`` times is failed instead. Finished
+        jobs older than ``FINISHED_TTL_DAYS`` are dropped.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=FINISHED_TTL_DAYS)).isoformat()
+
+        def work(conn):
+            requeued = conn.execute(
+                "UPDATE jobs SET worker = NULL, error = 'interrupted: worker lease expired', "
+                "status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END, "
+                "finished_at = CASE WHEN attempts < ? THEN NULL ELSE ? END "
+                "WHERE status = 'running' AND heartbeat_at < ?",
+                (MAX_ATTEMPTS, MAX_ATTEMPTS, _now(), time.time() - lease_seconds),
+            ).rowcount
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (cutoff,),
+            )
+            return requeued
+
+        return self._transaction(work)
+
+
+class JobWorkers:
+    """Thread pool that drains a ``JobQueue`` through ``runner(scenario)``.
+
+    A housekeeping thread renews the pool's leases and requeues jobs whose
+    lease lapsed, including jobs this process was running before a restart.
+    """
+
+    def __init__(self, queue: JobQueue, runner, workers: int = DEFAULT_WORKERS):
+        """Drain ``queue`` on ``workers`` threads once started."""
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.queue = queue
+        self._runner = runner
+        self.workers = workers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = threading.Condition()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    @classmethod
+    def from_env(cls, queue: JobQueue, runner) -> "JobWorkers":
+        """Size the pool from RELEASE_AGENT_JOB_WORKERS."""
+        return cls(queue, runner, int(os.environ.get(JOB_WORKERS_ENV, DEFAULT_WORKERS)))
+
+    def start(self) -> None:
+        """Start the workers and the lease housekeeping thread."""
+        targets = [self._housekeeping] + [self._work] * self.workers
+        for i, target in enumerate(targets):
+            name = "job-housekeeping" if i == 0 else f"job-worker-{i}"
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self) -> None:
+        """Wake one idle worker for a newly submitted job."""
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop after the jobs currently running finish."""
+        self._stopped.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _housekeeping(self) -> None:
+        """Renew this pool's leases and requeue lapsed jobs every third of a lease."""
+        while not self._stopped.is_set():
+            self.queue.heartbeat(self.worker_id)
+            if self.queue.recover():
+                with self._wakeup:
+                    self._wakeup.notify_all()
+            self._stopped.wait(LEASE_SECONDS / 3)
+
+    def _work(self) -> None:
+        """Claim and run jobs until stopped; poll for jobs queued by other processes."""
+        while not self._stopped.is_set():
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                with self._wakeup:
+                    if not self._stopped.is_set():
+                        self._wakeup.wait(POLL_SECONDS)
+                continue
+            waited = datetime.fromisoformat(job["started_at"]) - datetime.fromisoformat(
+                job["created_at"]
+            )
+            STAGE_SECONDS.observe(waited.total_seconds(), stage="job_queue_wait")
+            started = time.perf_counter()
+            try:
+                result = self._runner(job["scenario"])
+            except Exception as exc:
+                self.queue.fail(job, f"{type(exc).__name__}: {exc}")
+                continue
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage="job_run")
+            self.queue.complete(job, result)
@@ -0,0 +1,217 @@
+"""Content-addressed cache for deterministic LLM responses."""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR = Path(".llm_cache")
+CACHE_ENV = "RELEASE_AGENT_LLM_CACHE"
+MAX_MEMORY_ENTRIES = 1024
+MAX_DISK_BYTES = 64 * 1024 * 1024
+TTL_SECONDS = 7 * 24 * 3600
+PRUNE_EVERY = 64
+
+
+def cache_key(model: str, prompt_version, **inputs) -> str:
+    """Hash the model, prompt template version and serialized inputs."""
+    payload = json.dumps(
+        {"model": model, "prompt_version": prompt_version, "inputs": inputs},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (in-process LRU + on-disk) cache of raw LLM response text.
+
+    Entries expire after ``ttl`` seconds. The memory tier holds at most
+    ``max_entries`` items; the disk tier is pruned oldest-first once it grows
+    past ``max_disk_bytes``. Set ``enabled`` to False (or the
+    RELEASE_AGENT_LLM_CACHE environment variable to ``off``) to bypass it.
+    """
+
+    def __init__(
+        self,
+        directory=CACHE_DIR,
+        max_entries: int = MAX_MEMORY_ENTRIES,
+        max_disk_bytes: int = MAX_DISK_BYTES,
+        ttl: float = TTL_SECONDS,
+        enabled: bool = None,
+    ):
+        """Configure tiers, limits and the bypass switch."""
+        self.directory = Path(directory) if directory is not None else None
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        if enabled is None:
+            enabled = os.environ.get(CACHE_ENV, "on").lower() not in {"off", "0", "false"}
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, text)
+        self._writes_since_prune = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0}
+
+    # ---------- LOOKUP ----------
+
+    def get(self, key: str):
+        """Return cached text for ``key`` or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        text = self._disk_get(key, now)
+        with self._lock:
+            if text is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._remember(key, now + self.ttl, text)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store response text in both tiers."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, text)
+        self._disk_put(key, expires_at, text)
+
+    def get_or_call(self, key: str, call, accept=None) -> str:
+        """Return cached text, or invoke ``call()`` and cache its result.
+
+        ``accept`` may reject a fresh response (e.g. one that fails schema
+        validation) so that bad output is never cached.
+        """
+        if not self.enabled:
+            with self._lock:
+                self.counters["bypassed"] += 1
+            return call()
+
+        text = self.get(key)
+        if text is not None:
+            return text
+
+        text = call()
+        if accept is None or accept(text):
+            self.put(key, text)
+        return text
+
+    async def aget_or_call(self, key: str, acall, accept=None) -> str:
+        """Async counterpart of ``get_or_call`` for coroutine-based LLM calls."""
+        if not self.enabled:
+            with self._lock:
+                self.counters["bypassed"] += 1
+            return await acall()
+
+        text = self.get(key)
+        if text is not None:
+            return text
+
+        text = await acall()
+        if accept is None or accept(text):
+            self.put(key, text)
+        return text
+
+    def stats(self) -> dict:
+        """Return hit/miss counters plus current tier sizes."""
+        with self._lock:
+            return {**self.counters, "memory_entries": len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+
+    # ---------- TIERS ----------
+
+    def _remember(self, key: str, expires_at: float, text: str) -> None:
+        """Insert into the LRU tier; caller holds the lock."""
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        """Return the on-disk location for ``key``."""
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str, now: float):
+        """Read an unexpired entry from disk, or return None."""
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry["expires_at"] <= now:
+            path.unlink(missing_ok=True)
+            return None
+        return entry["text"]
+
+    def _disk_put(self, key: str, expires_at: float, text: str) -> None:
+        """Atomically write an entry to disk and prune periodically."""
+        if self.directory is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"expires_at": expires_at, "text": text}), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < PRUNE_EVERY:
+                return
+            self._writes_since_prune = 0
+        self.prune()
+
+    def prune(self) -> None:
+        """Drop expired disk entries, then the oldest until under the size cap."""
+        if self.directory is None or not self.directory.exists():
+            return
+        now = time.time()
+        files = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if st.st_mtime + self.ttl <= now:
+                path.unlink(missing_ok=True)
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
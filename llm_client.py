@@ -0,0 +1,348 @@
+"""Pluggable LLM client interface with Gemini and offline stub backends.
+
+Pipeline modules only depend on the ``LLMClient`` protocol: ``generate`` /
+``agenerate`` take a model name, prompt contents and an optional config and
+return an ``LLMResponse`` with the response text and token usage.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+LLM_BACKEND_ENV = "RELEASE_AGENT_LLM"
+STUB_LATENCY_ENV = "RELEASE_AGENT_STUB_LATENCY"
+STUB_FAILURE_RATE_ENV = "RELEASE_AGENT_STUB_FAILURE_RATE"
+STUB_INVALID_RATE_ENV = "RELEASE_AGENT_STUB_INVALID_RATE"
+LLM_TIMEOUT_ENV = "RELEASE_AGENT_LLM_TIMEOUT"
+DEFAULT_TIMEOUT = 20.0
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when an LLM backend fails to produce a response."""
+
+
+class TransientLLMError(LLMError):
+    """Raised for failures that are worth retrying (timeouts, overload)."""
+
+
+@dataclass
+class LLMResponse:
+    """Text and token usage returned by an LLM backend."""
+    text: str
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+
+
+class LLMClient(Protocol):
+    """Interface shared by every LLM backend."""
+
+    def generate(self, model: str, contents, config: dict = None) -> LLMResponse:
+        """Run one blocking generation call."""
+
+    async def agenerate(self, model: str, contents, config: dict = None) -> LLMResponse:
+        """Run one generation call on the event loop."""
+
+
+def call_timeout() -> float:
+    """Return the per-call deadline in seconds from RELEASE_AGENT_LLM_TIMEOUT."""
+    return float(os.environ.get(LLM_TIMEOUT_ENV, DEFAULT_TIMEOUT))
+
+
+# ---------- GEMINI ----------
+
+
+def _extract_text(response) -> str:
+    """Join the text parts of the first Gemini candidate."""
+    parts = response.candidates[0].content.parts
+    return "".join(p.text for p in parts if getattr(p, "text", None))
+
+
+def _to_response(response) -> LLMResponse:
+    """Convert a Gemini SDK response into an ``LLMResponse``."""
+    usage = getattr(response, "usage_metadata", None)
+    return LLMResponse(
+        text=_extract_text(response),
+        prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+        response_tokens=getattr(usage, "candidates_token_count", None) or 0,
+    )
+
+
+class GeminiClient:
+    """Adapter from the google-genai SDK to ``LLMClient``."""
+
+    def __init__(self, api_key: str = None, timeout: float = None):
+        """Create the SDK client from ``api_key`` or GEMINI_API_KEY.
+
+        ``timeout`` (seconds, default RELEASE_AGENT_LLM_TIMEOUT) bounds each
+        HTTP request so a stalled call releases its thread.
+        """
+        from google import genai  # heavy import, deferred until a client is needed
+        from google.genai import errors
+
+        api_key = api_key or os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY is not set")
+        timeout = call_timeout() if timeout is None else timeout
+        http_options = {"timeout": int(timeout * 1000)} if timeout else None
+        self._client = genai.Client(api_key=api_key, http_options=http_options)
+        self._api_error = errors.APIError
+
+    def _translate(self, exc: Exception) -> Exception:
+        """Map retryable SDK and transport errors to ``TransientLLMError``."""
+        if isinstance(exc, self._api_error) and exc.code not in TRANSIENT_STATUS:
+            return exc
+        if isinstance(exc, (self._api_error, TimeoutError, ConnectionError)) or (
+            type(exc).__module__.startswith("httpx")
+        ):
+            return TransientLLMError(f"gemini: {exc}")
+        return exc
+
+    def generate(self, model: str, contents, config: dict = None) -> LLMResponse:
+        """Call ``models.generate_content`` and normalise the response."""
+        try:
+            response = self._client.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        except Exception as exc:
+            translated = self._translate(exc)
+            if translated is exc:
+                raise
+            raise translated from exc
+        return _to_response(response)
+
+    async def agenerate(self, model: str, contents, config: dict = None) -> LLMResponse:
+        """Call ``aio.models.generate_content`` and normalise the response."""
+        try:
+            response = await self._client.aio.models.generate_content(
+                model=model, contents=contents, config=config
+            )
+        except Exception as exc:
+            translated = self._translate(exc)
+            if translated is exc:
+                raise
+            raise translated from exc
+        return _to_response(response)
+
+
+# ---------- OFFLINE STUB ----------
+
+
+def prompt_text(contents) -> str:
+    """Flatten string or role/parts contents into one prompt string."""
+    if isinstance(contents, str):
+        return contents
+    texts = []
+    for message in contents:
+        for part in message.get("parts", []):
+            texts.append(part.get("text", ""))
+    return "\n".join(texts)
+
+
+def _json_section(prompt: str, start: str, end: str):
+    """Parse the JSON block between two prompt headings, or return None."""
+    match = re.search(re.escape(start) + r"\s*(.*?)\s*" + re.escape(end), prompt, re.S)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+
+def _field(prompt: str, name: str) -> str:
+    """Read a ``- name: value`` line from a bullet-style prompt."""
+    match = re.search(rf"- {name}: (\S+)", prompt)
+    return match.group(1) if match else ""
+
+
+def _risky(context: dict) -> bool:
+    """Conservative rule: high risk, late-week/weekend or a clash blocks release."""
+    clash = context.get("clash_detected", context.get("clash"))
+    clash = any(clash) if isinstance(clash, list) else clash in {True, "True", "TRUE"}
+    return (
+        context.get("feature_risk") == "HIGH"
+        or context.get("day_of_week") in {"FRI", "SAT", "SUN"}
+        or bool(clash)
+    )
+
+
+def _stub_planner(prompt: str) -> dict:
+    """Follow the most confident heuristic, otherwise apply the risk rule."""
+    context = _json_section(prompt, "Context:", "Applicable heuristics:") or {}
+    heuristics = _json_section(prompt, "Applicable heuristics:", "Similar past releases:") or []
+    if heuristics:
+        best = max(heuristics, key=lambda h: h["confidence"])
+        return {"decision": best["recommendation"], "reason": "Following heuristic."}
+    if _risky(context):
+        return {"decision": "NO_GO", "reason": "Risky release window."}
+    return {"decision": "GO", "reason": "Low-risk release window."}
+
+
+def _stub_red_team(prompt: str) -> dict:
+    """Flag concerns for risky contexts."""
+    context = _json_section(prompt, "Context:", "Decision proposed:") or {}
+    decision = re.search(r"Decision proposed:\s*(\S+)", prompt)
+    decision = decision.group(1) if decision else ""
+
+    concerns = []
+    if context.get("feature_risk") == "HIGH":
+        concerns.append("High-risk feature.")
+    if context.get("service_criticality") == "HIGH":
+        concerns.append("Critical service.")
+    if context.get("day_of_week") in {"FRI", "SAT", "SUN"}:
+        concerns.append("Release close to the weekend.")
+
+    risk_level = ["LOW", "MEDIUM", "HIGH", "HIGH"][len(concerns)]
+    suggested = "NO_GO" if decision == "GO" and risk_level == "HIGH" else "NONE"
+    return {"concerns": concerns, "risk_level": risk_level, "suggested_action": suggested}
+
+
+def _stub_reflection(prompt: str) -> dict:
+    """Turn aggregated episode counts into majority-decision heuristics."""
+    groups = _json_section(prompt, "Episode outcome counts:", "Rules:") or []
+    heuristics = []
+    for group in groups:
+        total = group["episodes"]
+        go = group["decisions"].get("GO", 0)
+        recommendation = "GO" if go * 2 > total else "NO_GO"
+        agreeing = go if recommendation == "GO" else total - go
+        confidence = round(agreeing / total, 2)
+        if total < 3:
+            confidence = min(confidence, 0.6)
+        heuristics.append(
+            {
+                "when": group["context"],
+                "recommendation": recommendation,
+                "confidence": confidence,
+                "supporting_episodes": total,
+            }
+        )
+    return {"heuristics": heuristics}
+
+
+def _stub_agent(prompt: str) -> dict:
+    """Answer agent.py's next-action and confirmation prompts."""
+    context = {
+        "feature_risk": _field(prompt, "feature_risk"),
+        "day_of_week": _field(prompt, "day_of_week"),
+        "clash": _field(prompt, "clash"),
+    }
+    if "still safe to execute" in prompt:
+        return {"confirm": not _risky(context), "reason": "Stub confirmation."}
+
+    allowed = re.search(r"Allowed actions:\s*(\[.*?\])", prompt, re.S)
+    allowed = json.loads(allowed.group(1).replace("'", '"')) if allowed else []
+    action = allowed[0] if allowed else "abort_release"
+    if _risky(context) and "abort_release" in allowed:
+        action = "abort_release"
+    return {"action": action, "reason": "Stub rule."}
+
+
+class StubClient:
+    """Deterministic, rule-based offline backend for benchmarks and load tests.
+
+    Responses are schema-valid planner, red-team, reflection and agent JSON.
+    ``latency`` (seconds, plus up to ``jitter``) is slept per call, a
+    ``failure_rate`` fraction of calls raises ``TransientLLMError`` and an
+    ``invalid_rate`` fraction returns text that is not JSON.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed=None,
+        invalid_rate: float = 0.0,
+    ):
+        """Configure injected latency, failures and malformed responses."""
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.invalid_rate = invalid_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _plan_call(self):
+        """Return this call's delay and injected fault (None, "error" or "invalid")."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.random() * self.jitter
+            roll = self._random.random()
+        if roll < self.failure_rate:
+            return delay, "error"
+        if roll < self.failure_rate + self.invalid_rate:
+            return delay, "invalid"
+        return delay, None
+
+    def _respond(self, contents, fault) -> LLMResponse:
+        """Build the canned response for a prompt."""
+        if fault == "error":
+            raise TransientLLMError("stub: injected failure")
+        if fault == "invalid":
+            return LLMResponse(text="stub: injected malformed response")
+        prompt = prompt_text(contents)
+        if "deployment decision planner" in prompt:
+            payload = _stub_planner(prompt)
+        elif "red-team reviewer" in prompt:
+            payload = _stub_red_team(prompt)
+        elif "extracting reusable decision heuristics" in prompt:
+            payload = _stub_reflection(prompt)
+        else:
+            payload = _stub_agent(prompt)
+        text = json.dumps(payload)
+        return LLMResponse(
+            text=text, prompt_tokens=len(prompt) // 4, response_tokens=len(text) // 4
+        )
+
+    def generate(self, model: str, contents, config: dict = None) -> LLMResponse:
+        """Sleep for the injected latency and return a canned response."""
+        delay, fault = self._plan_call()
+        if delay:
+            time.sleep(delay)
+        return self._respond(contents, fault)
+
+    async def agenerate(self, model: str, contents, config: dict = None) -> LLMResponse:
+        """Async counterpart of ``generate``."""
+        delay, fault = self._plan_call()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(contents, fault)
+
+
+def make_client(backend: str = None) -> LLMClient:
+    """Return the LLM backend selected by name or RELEASE_AGENT_LLM."""
+    backend = backend or os.environ.get(LLM_BACKEND_ENV, "gemini")
+    if backend == "gemini":
+        return GeminiClient()
+    if backend == "stub":
+        return StubClient(
+            latency=float(os.environ.get(STUB_LATENCY_ENV, "0")),
+            failure_rate=float(os.environ.get(STUB_FAILURE_RATE_ENV, "0")),
+            invalid_rate=float(os.environ.get(STUB_INVALID_RATE_ENV, "0")),
+        )
+    raise ValueError(f"Unknown LLM backend: {backend}")
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> LLMClient:
+    """Return the process-wide client, creating it on first use.
+
+    The SDK client owns an HTTP connection pool, so reusing one instance
+    across runs and request threads avoids reconnecting on every call.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = make_client()
+        return _shared_client
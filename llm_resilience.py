@@ -0,0 +1,357 @@
+"""Deadlines, retries and a circuit breaker around LLM calls.
+
+``resilient_generate`` wraps ``timed_generate`` with a per-attempt deadline,
+jittered exponential backoff on transient, timed-out or malformed responses,
+and a process-wide circuit breaker. When the call cannot be completed it
+raises ``LLMUnavailable`` and the caller falls back to a conservative answer.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+from llm_client import LLMError, TransientLLMError, call_timeout
+from metrics import LLM_CALLS, atimed_generate, timed_generate
+
+RETRIES_ENV = "RELEASE_AGENT_LLM_RETRIES"
+BREAKER_THRESHOLD_ENV = "RELEASE_AGENT_BREAKER_THRESHOLD"
+BREAKER_RESET_ENV = "RELEASE_AGENT_BREAKER_RESET"
+CALL_WORKERS_ENV = "RELEASE_AGENT_LLM_WORKERS"
+CALL_WORKERS = 32
+
+
+class LLMUnavailable(LLMError):
+    """Raised when a call failed after its retries or the circuit is open."""
+
+
+class CircuitOpen(LLMUnavailable):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+class CallPoolSaturated(LLMUnavailable):
+    """Raised without calling the backend while every call worker is hung."""
+
+
+@dataclass
+class RetryPolicy:
+    """Per-attempt deadline and jittered exponential backoff between attempts."""
+
+    timeout: float = 20.0
+    retries: int = 2
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Read RELEASE_AGENT_LLM_TIMEOUT and RELEASE_AGENT_LLM_RETRIES."""
+        return cls(
+            timeout=call_timeout(),
+            retries=int(os.environ.get(RETRIES_ENV, cls.retries)),
+        )
+
+    def backoff(self, attempt: int, rng=random) -> float:
+        """Return a full-jitter delay before retry number ``attempt`` (1-based)."""
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker shared by every call site.
+
+    After ``threshold`` failed attempts in a row the circuit opens and calls
+    fail fast for ``reset_timeout`` seconds. Then a single probe is let
+    through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        """Open after ``threshold`` failures; probe again after ``reset_timeout``."""
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Read RELEASE_AGENT_BREAKER_THRESHOLD and RELEASE_AGENT_BREAKER_RESET."""
+        return cls(
+            threshold=int(os.environ.get(BREAKER_THRESHOLD_ENV, 5)),
+            reset_timeout=float(os.environ.get(BREAKER_RESET_ENV, 30.0)),
+        )
+
+    @property
+    def state(self) -> str:
+        """Return ``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Return True when a call may go to the backend."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed attempt, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                if self._opened_at is None or self._probing:
+                    print(f"LLM CIRCUIT OPEN after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class CallPool:
+    """Worker threads that run blocking calls so callers can stop waiting.
+
+    Callers wait for a free worker up to their deadline. A call whose caller
+    timed out keeps its worker until the backend returns; the pool is only
+    saturated when every worker is held by such an abandoned call.
+    """
+
+    def __init__(self, workers: int = CALL_WORKERS):
+        """Run at most ``workers`` calls at once."""
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="llm-call")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._abandoned = 0
+
+    @classmethod
+    def from_env(cls) -> "CallPool":
+        """Read RELEASE_AGENT_LLM_WORKERS."""
+        return cls(int(os.environ.get(CALL_WORKERS_ENV, CALL_WORKERS)))
+
+    @property
+    def abandoned(self) -> int:
+        """Return how many workers are held by calls nobody waits for."""
+        with self._lock:
+            return self._abandoned
+
+    def saturated(self) -> bool:
+        """Return True when every worker is held by an abandoned call."""
+        return self.abandoned >= self.workers
+
+    def submit(self, fn, *args, wait: float = None):
+        """Run ``fn`` once a worker is free, or return None after ``wait`` seconds."""
+        if not self._slots.acquire(timeout=wait):
+            return None
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def abandon(self, future) -> None:
+        """Stop waiting for ``future``; its worker counts as hung until it returns."""
+        if future.cancel():
+            return
+        with self._lock:
+            self._abandoned += 1
+        future.add_done_callback(self._returned)
+
+    def shutdown(self) -> None:
+        """Stop taking calls; calls already running finish in the background."""
+        self._executor.shutdown(wait=False)
+
+    def _returned(self, future) -> None:
+        """Give back the worker of an abandoned call."""
+        with self._lock:
+            self._abandoned -= 1
+
+
+_breaker = None
+_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_breaker() -> CircuitBreaker:
+    """Return the process-wide circuit breaker, created from the environment."""
+    global _breaker
+    with _shared_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker.from_env()
+        return _breaker
+
+
+def reset_shared_breaker() -> None:
+    """Drop the process-wide breaker so the next call re-reads the environment."""
+    global _breaker
+    with _shared_lock:
+        _breaker = None
+
+
+def shared_call_pool() -> CallPool:
+    """Return the process-wide call pool, created from the environment."""
+    global _pool
+    with _shared_lock:
+        if _pool is None:
+            _pool = CallPool.from_env()
+        return _pool
+
+
+def reserve_call_workers(workers: int) -> None:
+    """Grow the process-wide call pool to at least ``workers`` threads."""
+    global _pool
+    with _shared_lock:
+        if _pool is not None and _pool.workers >= workers:
+            return
+        configured = int(os.environ.get(CALL_WORKERS_ENV, CALL_WORKERS))
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = CallPool(max(workers, configured))
+
+
+def _failed(breaker: CircuitBreaker, call: str, outcome: str, error: str) -> str:
+    """Record a failed attempt and return its description."""
+    breaker.record_failure()
+    LLM_CALLS.inc(call=call, outcome=outcome)
+    return f"{outcome}: {error}"
+
+
+def resilient_generate(
+    client,
+    call: str,
+    model: str,
+    contents,
+    config: dict = None,
+    accept=None,
+    policy: RetryPolicy = None,
+    breaker: CircuitBreaker = None,
+    rng=random,
+):
+    """Run ``timed_generate`` with a deadline, retries and the circuit breaker.
+
+    Timeouts, ``TransientLLMError`` and responses rejected by ``accept`` are
+    retried; any other error is not. Each attempt first waits for the
+    client's ``throttle`` hook, if any, then up to the deadline for a free
+    call worker, before its own deadline starts. A timed-out call
+    keeps its worker until it returns; when every worker is held this way the
+    call fails fast with ``CallPoolSaturated`` instead of queueing behind
+    them. Raises ``LLMUnavailable`` (or a subclass) when no acceptable
+    response was produced.
+    """
+    policy = policy or RetryPolicy.from_env()
+    breaker = breaker or shared_breaker()
+    pool = shared_call_pool()
+    throttle = getattr(client, "throttle", None)
+    last_error = "no attempts"
+    for attempt in range(policy.retries + 1):
+        if attempt:
+            LLM_CALLS.inc(call=call, outcome="retry")
+            time.sleep(policy.backoff(attempt, rng))
+        if not breaker.allow():
+            LLM_CALLS.inc(call=call, outcome="circuit_open")
+            raise CircuitOpen(f"{call}: circuit open ({last_error})")
+
+        if throttle is not None:
+            throttle()
+        if pool.saturated():
+            LLM_CALLS.inc(call=call, outcome="saturated")
+            raise CallPoolSaturated(f"{call}: all {pool.workers} call workers hung")
+        timeout = policy.timeout or None
+        future = pool.submit(timed_generate, client, call, model, contents, config, wait=timeout)
+        if future is None:
+            LLM_CALLS.inc(call=call, outcome="saturated")
+            raise CallPoolSaturated(f"{call}: no call worker free in {policy.timeout}s")
+        try:
+            response = future.result(timeout=timeout)
+        except FutureTimeout:
+            pool.abandon(future)
+            last_error = _failed(breaker, call, "timeout", f"no response in {policy.timeout}s")
+            continue
+        except TransientLLMError as exc:
+            last_error = _failed(breaker, call, "transient", exc)
+            continue
+        except Exception as exc:
+            _failed(breaker, call, "error", exc)
+            raise LLMUnavailable(f"{call}: {exc}") from exc
+
+        if accept is not None and not accept(response.text):
+            last_error = _failed(breaker, call, "invalid", "response failed validation")
+            continue
+        breaker.record_success()
+        LLM_CALLS.inc(call=call, outcome="success")
+        return response
+
+    LLM_CALLS.inc(call=call, outcome="exhausted")
+    raise LLMUnavailable(f"{call}: gave up after {policy.retries + 1} attempts ({last_error})")
+
+
+async def aresilient_generate(
+    client,
+    call: str,
+    model: str,
+    contents,
+    config: dict = None,
+    accept=None,
+    policy: RetryPolicy = None,
+    breaker: CircuitBreaker = None,
+    rng=random,
+):
+    """Async counterpart of ``resilient_generate``."""
+    policy = policy or RetryPolicy.from_env()
+    breaker = breaker or shared_breaker()
+    throttle = getattr(client, "athrottle", None)
+    last_error = "no attempts"
+    for attempt in range(policy.retries + 1):
+        if attempt:
+            LLM_CALLS.inc(call=call, outcome="retry")
+            await asyncio.sleep(policy.backoff(attempt, rng))
+        if not breaker.allow():
+            LLM_CALLS.inc(call=call, outcome="circuit_open")
+            raise CircuitOpen(f"{call}: circuit open ({last_error})")
+
+        if throttle is not None:
+            await throttle()
+        try:
+            response = await asyncio.wait_for(
+                atimed_generate(client, call, model, contents, config), policy.timeout or None
+            )
+        except asyncio.TimeoutError:
+            last_error = _failed(breaker, call, "timeout", f"no response in {policy.timeout}s")
+            continue
+        except TransientLLMError as exc:
+            last_error = _failed(breaker, call, "transient", exc)
+            continue
+        except Exception as exc:
+            _failed(breaker, call, "error", exc)
+            raise LLMUnavailable(f"{call}: {exc}") from exc
+
+        if accept is not None and not accept(response.text):
+            last_error = _failed(breaker, call, "invalid", "response failed validation")
+            continue
+        breaker.record_success()
+        LLM_CALLS.inc(call=call, outcome="success")
+        return response
+
+    LLM_CALLS.inc(call=call, outcome="exhausted")
+    raise LLMUnavailable(f"{call}: gave up after {policy.retries + 1} attempts ({last_error})")
+
+
+def record_fallback(call: str, error: Exception) -> None:
+    """Count and log a call site answering with its conservative fallback."""
+    LLM_CALLS.inc(call=call, outcome="fallback")
+    print(f"LLM FALLBACK ({call}): {error}")
@@ -1,20 +1,17 @@
-"""Run the release agent and serve the demo UI/API."""
+"""Run the release agent and serve the demo UI/API.
+
+Pipeline modules (and the LLM SDK behind them) are imported on first use so
+that ``--help``, static assets and ``/api/scenarios`` never pay for them.
+"""
 import argparse
 import json
 import mimetypes
 import os
+import threading
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from google import genai
-from agent import decide_next_action
-from heuristic_engine import applicable_heuristics
-from heuristic_validation import validate_heuristic
-from memory import EpisodicMemory
-from planner import run_planner
-from red_team import run_red_team
-from reflection import run_reflection
 from scenarios import (
     SCENARIO_HIGH_RISK_FRIDAY,
     SCENARIO_LOW_RISK_FRIDAY,
@@ -22,19 +19,14 @@ from scenarios import (
     SCENARIO_LOW_RISK_SATURDAY,
     SCENARIO_LOW_RISK_WEEKDAY,
 )
-from simulator import simulate
-from state import ReleaseState
 
-REFLECTION_WINDOW = 5
 FRONTEND_DIR = Path(__file__).parent / "frontend"
-
-
-def get_client():
-    """Create a Gemini client using the configured API key."""
-    api_key = os.environ["GEMINI_API_KEY"]
-    if not api_key:
-        raise RuntimeError("GEMINI_API_KEY is not set")
-    return genai.Client(api_key=api_key)
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BULK_ITEMS = 100
+BULK_WORKERS = 8
+BULK_MAX_PENDING = 256
+BULK_TIMEOUT_SECONDS = 300
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 def build_scenarios():
@@ -48,150 +40,6 @@ def build_scenarios():
     }
 
 
-def normalize_action(decision: str) -> str:
-    """Map planner decisions to simulator actions."""
-    if decision == "GO":
-        return "GO"
-    if decision == "DELAY":
-        return "reschedule"
-    if decision == "NO_GO":
-        return "abort_release"
-    return decision
-
-
-def run_release_agent(scenario: dict, verbose: bool = True) -> dict:
-    """Run the release agent loop for a scenario and return structured results."""
-    memory = EpisodicMemory()
-    client = get_client()
-
-    state = ReleaseState(
-        release_id="ACCOUNT-OPENING-SERVICE-1.0.0",
-        application="ACCOUNT-OPENING-SERVICE",
-        env="prod",
-        day_of_week=scenario["day_of_week"],
-        hour_of_day=scenario["hour_of_day"],
-        feature_risk=scenario["feature_risk"],
-        service_criticality=scenario["service_criticality"],
-    )
-
-    steps = []
-
-    while state.stage not in ["DONE", "ABORTED"]:
-        if verbose:
-            print(f"\nOBSERVE: {state}")
-        # action = decide_next_action(state, memory)
-
-        # ---- CONTEXT FOR DECISION ----
-        context = {
-            "feature_risk": state.feature_risk,
-            "day_of_week": state.day_of_week,
-            "service_criticality": state.service_criticality,
-            "clash_detected": scenario["clash_outcomes"],  # <-- from simulation
-            "env": state.env,
-        }
-
-        # ---- APPLY HEURISTICS (NEW) ----
-        applicable = applicable_heuristics(
-            memory.heuristics(),
-            context,
-        )
-
-        # ---- PLAN (heuristic-aware) ----
-        plan = run_planner(
-            client=client,
-            context=context,
-            heuristics=applicable,
-        )
-
-        decision = plan["decision"]
-        action = normalize_action(decision)
-        if verbose:
-            print("DEBUG plan:", plan, type(plan))
-            print(f"DECIDE: {decision} | reason: {plan.get('reason')}")
-
-        # ---- EXECUTION EVIDENCE (mocked) ----
-        evidence = {
-            "clash_detected": context["clash_detected"],
-            "freeze_window": False,
-            "missing_info": [],
-        }
-
-        # ---- RED TEAM REVIEW (ADVISORY) ----
-        red_team_result = run_red_team(
-            client=client,
-            context=context,
-            decision=plan["decision"],
-            evidence=evidence,
-        )
-
-        if verbose:
-            print("\nRED TEAM REVIEW (ADVISORY):")
-            print(f"Risk level: {red_team_result['risk_level']}")
-            for concern in red_team_result["concerns"]:
-                print(" -", concern)
-            print(f"Suggested action: {red_team_result['suggested_action']}")
-
-        steps.append(
-            {
-                "context": context,
-                "heuristics": applicable,
-                "plan": plan,
-                "red_team": red_team_result,
-                "action": action,
-                "stage": state.stage,
-            }
-        )
-
-        state = simulate(state, action, scenario)
-
-    if verbose:
-        print(f"\nFINAL DECISION: {state.decision}")
-        print("TRACE:")
-        for h in state.history:
-            print(" ", h)
-
-    context = {
-        "feature_risk": state.feature_risk,
-        "day_of_week": state.day_of_week,
-        "service_criticality": state.service_criticality,
-    }
-
-    outcome = "SUCCESS" if state.decision != "ABORT" else "ABORTED"
-
-    memory.write(
-        context=context,
-        decision=state.decision,
-        outcome=outcome,
-    )
-
-    reflection_added = 0
-    reflection_ran = False
-    if should_reflect(memory):
-        reflection_ran = True
-        recent = memory.episodes()[-REFLECTION_WINDOW:]
-        candidates = run_reflection(client, recent)
-
-        for h in candidates:
-            try:
-                validate_heuristic(h)
-                memory.add_heuristic(h)
-                reflection_added += 1
-            except AssertionError:
-                pass
-
-    return {
-        "decision": state.decision,
-        "history": state.history,
-        "steps": steps,
-        "reflection": {"ran": reflection_ran, "added": reflection_added},
-    }
-
-
-def should_reflect(memory) -> bool:
-    """Return True when the reflection window boundary is reached."""
-    return len(memory.episodes()) % REFLECTION_WINDOW == 0
-
-
 def list_scenarios() -> list:
     """Format scenarios for the demo API response."""
     scenarios = build_scenarios()
@@ -201,6 +49,40 @@ def list_scenarios() -> list:
     ]
 
 
+def parse_bulk_items(payload) -> list:
+    """Turn a ``POST /api/runs`` body into scenario dicts, raising ValueError.
+
+    Each item is either a full scenario object (optionally with an ``id``)
+    or ``{"scenario": "<registered id>"}``.
+    """
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('body must be {"items": [...]} with at least one item')
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"at most {MAX_BULK_ITEMS} items per request")
+
+    scenarios = []
+    for index, item in enumerate(items):
+        try:
+            scenarios.append(parse_scenario_item(item))
+        except ValueError as exc:
+            raise ValueError(f"item {index}: {exc}") from None
+    return scenarios
+
+
+def parse_scenario_item(item) -> dict:
+    """Return the scenario for a full scenario object or ``{"scenario": "<id>"}``."""
+    from batch import validate_scenario
+
+    if isinstance(item, dict) and set(item) <= {"id", "scenario"} and "scenario" in item:
+        registry = build_scenarios()
+        if item["scenario"] not in registry:
+            raise ValueError(f"unknown scenario {item['scenario']!r}")
+        item = {"id": item.get("id", item["scenario"]), **registry[item["scenario"]][1]}
+    validate_scenario(item)
+    return item
+
+
 def resolve_scenario(scenario_id: str) -> dict:
     """Return the scenario data for a given ID, falling back to the first."""
     scenarios = build_scenarios()
@@ -209,27 +91,205 @@ def resolve_scenario(scenario_id: str) -> dict:
     return next(iter(scenarios.values()))[1]
 
 
+class AppContext:
+    """Long-lived state shared by every request the server handles.
+
+    Owns one ``EpisodicMemory`` and one pooled LLM client for the lifetime of
+    the process. Both are created on the first run; afterwards the memory
+    only stats its files on each read and replays records appended by other
+    processes, so per-request cost no longer grows with history size.
+    """
+
+    def __init__(self):
+        """Start empty; heavy state is built on first use."""
+        self._lock = threading.Lock()
+        self._memory = None
+        self._client = None
+        self._bulk = None
+        self._jobs = None
+
+    def memory(self):
+        """Return the shared memory store."""
+        with self._lock:
+            if self._memory is None:
+                from memory import EpisodicMemory
+
+                self._memory = EpisodicMemory()
+            return self._memory
+
+    def client(self):
+        """Return the shared LLM client."""
+        with self._lock:
+            if self._client is None:
+                from pipeline import get_client
+
+                self._client = get_client()
+            return self._client
+
+    def bulk(self):
+        """Return the shared bulk runner behind ``POST /api/runs``."""
+        with self._lock:
+            if self._bulk is None:
+                from batch import BulkRunner
+
+                self._bulk = BulkRunner(
+                    self.run, max_workers=BULK_WORKERS, max_pending=BULK_MAX_PENDING
+                )
+            return self._bulk
+
+    def jobs(self):
+        """Return the worker pool behind ``/api/jobs``, starting it on first use."""
+        with self._lock:
+            if self._jobs is None:
+                from job_queue import JobQueue, JobWorkers
+
+                self._jobs = JobWorkers.from_env(JobQueue(), self.run)
+                self._jobs.start()
+            return self._jobs
+
+    def run(self, scenario: dict, on_event=None) -> dict:
+        """Run the pipeline for one scenario against the shared state."""
+        from pipeline import run_release_agent
+
+        return run_release_agent(
+            scenario,
+            verbose=False,
+            memory=self.memory(),
+            client=self.client(),
+            on_event=on_event,
+        )
+
+
 class ReleaseAgentHandler(BaseHTTPRequestHandler):
     """HTTP handler that serves the demo UI and API endpoints."""
-    def _send_json(self, payload: dict, status: int = 200) -> None:
+    def _send_json(self, payload: dict, status: int = 200, headers: dict = None) -> None:
         """Send a JSON response with CORS enabled."""
         body = json.dumps(payload).encode("utf-8")
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(body)
 
-    def _send_text(self, payload: str, status: int = 200) -> None:
+    def _send_text(
+        self, payload: str, status: int = 200, content_type: str = "text/plain; charset=utf-8"
+    ) -> None:
         """Send a plain-text response."""
         body = payload.encode("utf-8")
         self.send_response(status)
-        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Type", content_type)
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
+    def _stream_run(self, scenario_id: str) -> None:
+        """Stream a pipeline run as Server-Sent Events, one event per step."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        connected = True
+
+        def send_event(kind: str, payload: dict) -> None:
+            # A closed browser tab must not abort the run half-way through.
+            nonlocal connected
+            if not connected:
+                return
+            message = f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+            try:
+                self.wfile.write(message.encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                connected = False
+
+        try:
+            scenario = resolve_scenario(scenario_id)
+            result = self.server.app.run(scenario, on_event=send_event)
+            result["scenario_id"] = scenario_id
+            result["scenario"] = scenario
+            send_event("result", result)
+        except Exception as exc:
+            send_event("error", {"error": str(exc)})
+
+    def _read_json_body(self):
+        """Return the parsed JSON request body, or None after sending an error."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send_json({"error": f"body exceeds {MAX_BODY_BYTES} bytes"}, status=413)
+            return None
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self._send_json({"error": "body is not valid JSON"}, status=400)
+            return None
+
+    def _run_bulk(self) -> None:
+        """Handle ``POST /api/runs``: many scenarios, coalesced and run concurrently."""
+        from batch import QueueFull
+
+        payload = self._read_json_body()
+        if payload is None:
+            return
+        try:
+            scenarios = parse_bulk_items(payload)
+        except ValueError as exc:
+            self._send_json({"error": str(exc)}, status=400)
+            return
+
+        bulk = self.server.app.bulk()
+        try:
+            results = bulk.run_many(scenarios, timeout=BULK_TIMEOUT_SECONDS)
+        except QueueFull as exc:
+            self._send_json({"error": str(exc)}, status=429, headers={"Retry-After": "1"})
+            return
+        self._send_json(
+            {
+                "results": results,
+                "summary": {
+                    "items": len(results),
+                    "coalesced": sum(r["coalesced"] for r in results),
+                    "errors": sum("error" in r for r in results),
+                },
+            }
+        )
+
+    def _submit_job(self) -> None:
+        """Handle ``POST /api/jobs``: queue one scenario and return its job at once."""
+        payload = self._read_json_body()
+        if payload is None:
+            return
+        try:
+            scenario = parse_scenario_item(payload)
+        except ValueError as exc:
+            self._send_json({"error": str(exc)}, status=400)
+            return
+        workers = self.server.app.jobs()
+        job, deduplicated = workers.queue.submit(scenario)
+        if not deduplicated:
+            workers.notify()
+        self._send_json(
+            {"job": job, "deduplicated": deduplicated},
+            status=200 if deduplicated else 202,
+            headers={"Location": f"/api/jobs/{job['id']}"},
+        )
+
+    def _send_stats(self, params: dict) -> None:
+        """Handle ``GET /api/stats``: filtered outcome counts from the incremental aggregates."""
+        from outcome_stats import parse_query
+
+        try:
+            query = parse_query(params)
+        except ValueError as exc:
+            self._send_json({"error": str(exc)}, status=400)
+            return
+        self._send_json(self.server.app.memory().outcome_stats().query(**query))
+
     def _serve_file(self, path: str) -> None:
         """Serve a static asset from the frontend directory."""
         if path in {"", "/"}:
@@ -256,12 +316,34 @@ class ReleaseAgentHandler(BaseHTTPRequestHandler):
         if parsed.path == "/api/scenarios":
             self._send_json({"scenarios": list_scenarios()})
             return
+        if parsed.path == "/api/metrics":
+            from metrics import REGISTRY
+
+            self._send_text(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+            return
+        if parsed.path == "/api/stats":
+            self._send_stats(parse_qs(parsed.query))
+            return
+        if parsed.path == "/api/jobs":
+            self._send_json({"counts": self.server.app.jobs().queue.counts()})
+            return
+        if parsed.path.startswith("/api/jobs/"):
+            job = self.server.app.jobs().queue.get(parsed.path[len("/api/jobs/") :])
+            if job is None:
+                self._send_json({"error": "Unknown job"}, status=404)
+            else:
+                self._send_json(job)
+            return
+        if parsed.path == "/api/run/stream":
+            params = parse_qs(parsed.query)
+            self._stream_run(params.get("scenario", [None])[0])
+            return
         if parsed.path == "/api/run":
             params = parse_qs(parsed.query)
             scenario_id = params.get("scenario", [None])[0]
             try:
                 scenario = resolve_scenario(scenario_id)
-                result = run_release_agent(scenario, verbose=False)
+                result = self.server.app.run(scenario)
                 result["scenario_id"] = scenario_id
                 result["scenario"] = scenario
                 self._send_json(result)
@@ -270,14 +352,141 @@ class ReleaseAgentHandler(BaseHTTPRequestHandler):
             return
         self._serve_file(parsed.path)
 
+    def do_POST(self) -> None:
+        """Route API calls that take a JSON body."""
+        parsed = urlparse(self.path)
+        if parsed.path == "/api/runs":
+            self._run_bulk()
+            return
+        if parsed.path == "/api/jobs":
+            self._submit_job()
+            return
+        self._send_json({"error": "Not found"}, status=404)
+
 
 def serve(host: str, port: int) -> None:
     """Start the demo HTTP server."""
     server = ThreadingHTTPServer((host, port), ReleaseAgentHandler)
+    server.app = AppContext()
+    # Resume jobs queued before a restart without delaying the first request.
+    threading.Thread(target=server.app.jobs, name="job-startup", daemon=True).start()
     print(f"Serving demo UI at http://{host}:{port}")
     server.serve_forever()
 
 
+def run_batch_file(path: str, output: str, concurrency: int, llm_rate: float) -> dict:
+    """Evaluate every scenario in ``path`` and stream results to ``output``."""
+    from batch import RateLimitedClient, RateLimiter, load_scenarios, run_batch
+    from llm_resilience import reserve_call_workers
+    from memory import EpisodicMemory
+    from pipeline import fast_path_stats, get_client, run_release_agent
+
+    reserve_call_workers(concurrency)
+    memory = EpisodicMemory()
+    client = get_client()
+    if llm_rate:
+        client = RateLimitedClient(client, RateLimiter(llm_rate))
+
+    summary = run_batch(
+        load_scenarios(path),
+        lambda scenario: run_release_agent(
+            scenario, verbose=False, memory=memory, client=client
+        ),
+        output,
+        max_in_flight=concurrency,
+    )
+    summary["fast_path"] = fast_path_stats()
+    print("BATCH SUMMARY:", json.dumps(summary, indent=2))
+    return summary
+
+
+def run_miner(min_support: int, min_confidence: float, dry_run: bool) -> list:
+    """Mine heuristics from the whole episode history (rollups included) and store them."""
+    from heuristic_miner import mine_heuristics
+    from memory import EpisodicMemory
+
+    memory = EpisodicMemory()
+    total = memory.episode_count()
+    heuristics = mine_heuristics(
+        memory.history(), min_support=min_support, min_confidence=min_confidence
+    )
+    print(f"MINED {len(heuristics)} HEURISTICS FROM {total} EPISODES")
+    if dry_run:
+        print(json.dumps(heuristics, indent=2))
+        return heuristics
+
+    for heuristic in heuristics:
+        memory.set_heuristic(heuristic)
+    memory.mark_reflected(total)
+    return heuristics
+
+
+def compile_decisions(envs: list) -> dict:
+    """Compile (or top up) the decision table over the whole context lattice."""
+    from decision_table import TABLE_FILE, DecisionTable, compile_table
+    from memory import EpisodicMemory
+    from pipeline import get_client
+
+    existing = DecisionTable.load(TABLE_FILE) if TABLE_FILE.exists() else None
+    table = compile_table(EpisodicMemory(), get_client(), envs=envs, table=existing)
+    table.save(TABLE_FILE)
+    print(f"DECISION TABLE: {table.filled()}/{table.size} CELLS -> {TABLE_FILE}")
+    print(json.dumps(table.provenance, indent=2))
+    return table.provenance
+
+
+def apply_retention(hot_days: int) -> int:
+    """Archive and roll up reflected episodes older than ``hot_days`` days."""
+    from memory import EpisodicMemory
+    from retention import RetentionPolicy
+
+    policy = RetentionPolicy(hot_days=hot_days)
+    memory = EpisodicMemory()
+    pruned = memory.retain(policy)
+    print(
+        f"RETENTION: {pruned} EPISODES ARCHIVED TO {policy.archive_dir}/, "
+        f"{len(memory.episodes())} HOT, {len(memory.rollups())} ROLLUPS"
+    )
+    return pruned
+
+
+def print_archive(since: str, until: str) -> None:
+    """Print archived episodes between two ISO dates as JSON lines."""
+    from retention import EpisodeArchive
+
+    for episode in EpisodeArchive().episodes(since, until):
+        print(json.dumps(episode))
+
+
+def write_workload(count: int, seed: int, output: str) -> None:
+    """Write ``count`` synthetic releases as JSONL, usable with ``--batch``."""
+    from workload import release_stream
+
+    with open(output, "w", encoding="utf-8") as handle:
+        for _, release in zip(range(count), release_stream(seed=seed)):
+            handle.write(json.dumps(release) + "\n")
+    print(f"WROTE {count} RELEASES TO {output}")
+
+
+def run_monte_carlo(releases: int, seed: int) -> dict:
+    """Score the stored heuristics against the conservative rules on randomized releases."""
+    from heuristic_engine import FastPathPolicy
+    from memory import EpisodicMemory
+    from monte_carlo import HeuristicTable, conservative_rules, run_policy
+
+    heuristics = EpisodicMemory().heuristics()
+    policies = {
+        "heuristics": HeuristicTable(heuristics, fast_path=FastPathPolicy.from_env()),
+        "conservative_rules": conservative_rules,
+    }
+    reports = {
+        name: run_policy(policy, releases=releases, seed=seed) for name, policy in policies.items()
+    }
+    print(f"MONTE CARLO: {releases} RELEASES, {len(heuristics)} HEURISTICS")
+    print(json.dumps(reports, indent=2))
+    return reports
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Release agent demo runner")
     parser.add_argument("--serve", action="store_true", help="Serve the demo UI")
@@ -285,10 +494,137 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8000)
     parser.add_argument("--quiet", action="store_true")
+    parser.add_argument(
+        "--job-workers",
+        type=int,
+        help="Workers draining /api/jobs (default: $RELEASE_AGENT_JOB_WORKERS or 4)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run the asyncio pipeline (overlapping LLM calls)",
+    )
+    parser.add_argument(
+        "--llm",
+        choices=["gemini", "stub"],
+        help="LLM backend (default: $RELEASE_AGENT_LLM or gemini)",
+    )
+    parser.add_argument("--batch", help="JSON/JSONL file of scenarios to evaluate")
+    parser.add_argument(
+        "--output",
+        help="Batch results file (default batch_results.jsonl) or, with "
+        "--generate-workload, the workload file (default workload.jsonl)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Max scenarios in flight"
+    )
+    parser.add_argument(
+        "--llm-rate", type=float, default=None, help="Max LLM calls per second"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Bypass the LLM response cache"
+    )
+    parser.add_argument(
+        "--no-fast-path",
+        action="store_true",
+        help="Always call the LLM planner, even when a heuristic is decisive",
+    )
+    parser.add_argument(
+        "--reflection",
+        choices=["llm", "miner"],
+        help="Heuristic extraction backend (default: $RELEASE_AGENT_REFLECTION or llm)",
+    )
+    parser.add_argument(
+        "--mine-heuristics",
+        action="store_true",
+        help="Mine heuristics from the whole episode history and exit",
+    )
+    parser.add_argument("--min-support", type=int, default=3)
+    parser.add_argument("--min-confidence", type=float, default=0.6)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print mined heuristics without storing them"
+    )
+    parser.add_argument(
+        "--monte-carlo",
+        type=int,
+        metavar="RELEASES",
+        help="Simulate RELEASES randomized releases under the stored heuristics and exit",
+    )
+    parser.add_argument(
+        "--compile-decisions",
+        action="store_true",
+        help="Precompile planner decisions for every release context and exit",
+    )
+    parser.add_argument(
+        "--envs", nargs="+", default=["prod"], help="Environments the decision table covers"
+    )
+    parser.add_argument(
+        "--retain-days",
+        type=int,
+        metavar="DAYS",
+        help="Archive and roll up reflected episodes older than DAYS and exit",
+    )
+    parser.add_argument(
+        "--read-archive",
+        nargs="+",
+        metavar="DATE",
+        help="Print archived episodes from SINCE [to UNTIL] (ISO dates) and exit",
+    )
+    parser.add_argument(
+        "--generate-workload",
+        type=int,
+        metavar="RELEASES",
+        help="Write RELEASES seeded synthetic releases as JSONL to --output and exit",
+    )
+    parser.add_argument("--seed", type=int, default=0)
     args = parser.parse_args()
 
-    if args.serve:
+    if args.no_cache:
+        os.environ["RELEASE_AGENT_LLM_CACHE"] = "off"
+    if args.llm:
+        os.environ["RELEASE_AGENT_LLM"] = args.llm
+    if args.reflection:
+        os.environ["RELEASE_AGENT_REFLECTION"] = args.reflection
+    if args.no_fast_path:
+        os.environ["RELEASE_AGENT_FAST_PATH"] = "off"
+    if args.job_workers:
+        os.environ["RELEASE_AGENT_JOB_WORKERS"] = str(args.job_workers)
+
+    if args.compile_decisions:
+        compile_decisions(args.envs)
+    elif args.retain_days is not None:
+        apply_retention(args.retain_days)
+    elif args.read_archive:
+        if len(args.read_archive) > 2:
+            parser.error("--read-archive takes SINCE and an optional UNTIL")
+        since, until = (args.read_archive + [None])[:2]
+        print_archive(since, until)
+    elif args.generate_workload:
+        write_workload(args.generate_workload, args.seed, args.output or "workload.jsonl")
+    elif args.monte_carlo:
+        run_monte_carlo(args.monte_carlo, args.seed)
+    elif args.mine_heuristics:
+        run_miner(args.min_support, args.min_confidence, args.dry_run)
+    elif args.serve:
         serve(args.host, args.port)
+    elif args.batch:
+        output = args.output or "batch_results.jsonl"
+        run_batch_file(args.batch, output, args.concurrency, args.llm_rate)
+    elif args.use_async:
+        import asyncio
+
+        from pipeline import drain_background_tasks, run_release_agent_async
+
+        scenario = resolve_scenario(args.scenario)
+
+        async def _run_async() -> None:
+            await run_release_agent_async(scenario, verbose=not args.quiet)
+            await drain_background_tasks()
+
+        asyncio.run(_run_async())
     else:
+        from pipeline import run_release_agent
+
         scenario = resolve_scenario(args.scenario)
         run_release_agent(scenario, verbose=not args.quiet)
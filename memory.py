@@ -1,33 +1,82 @@
 """Persist episodic memory and learned heuristics to disk."""
-import json
+import os
+import threading
+import time
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
+from heuristic_engine import HeuristicIndex, merge_heuristic
+from memory_retrieval import EpisodeIndex
+from memory_store import JsonlStore, SqliteStore, apply_record
+from metrics import stage_timer
+from outcome_stats import OutcomeStats
+from retention import RetentionPolicy, rollup_episodes
+
 MEMORY_FILE = Path("memory.json")
+MEMORY_DB = Path("memory.db")
+MEMORY_BACKEND_ENV = "RELEASE_AGENT_MEMORY_BACKEND"
+# A reflection claim older than this is presumed abandoned by a crashed run.
+REFLECTION_LEASE_SECONDS = 300
 
 
-class EpisodicMemory:
-    """Persisted memory store for episodes and extracted heuristics."""
-    def __init__(self):
-        """Load memory state from disk into process memory."""
-        self.memory = self._load()
+def open_store(backend: str = None):
+    """Return the storage engine selected by name or environment."""
+    backend = backend or os.environ.get(MEMORY_BACKEND_ENV, "jsonl")
+    if backend == "jsonl":
+        return JsonlStore(MEMORY_FILE, retention=RetentionPolicy.from_env())
+    if backend == "sqlite":
+        return SqliteStore(MEMORY_DB, import_from=MEMORY_FILE)
+    raise ValueError(f"Unknown memory backend: {backend}")
 
-    def _load(self) -> dict:
-        """Read the memory file, handling legacy list formats."""
-        if not MEMORY_FILE.exists():
-            return {"episodes": [], "heuristics": []}
 
-        data = json.loads(MEMORY_FILE.read_text())
+class EpisodicMemory:
+    """Persisted memory store for episodes and extracted heuristics."""
+    def __init__(self, store=None):
+        """Load memory state from the storage engine into process memory."""
+        self.store = store if store is not None else open_store()
+        self._lock = threading.RLock()
+        self._index = None
+        self._episode_index = None
+        self._stats = None
+        self._heuristic_version = 0
+        self._load()
 
-        # migration safety: old list-based memory
-        if isinstance(data, list):
-            return {"episodes": data, "heuristics": []}
+    def _load(self) -> None:
+        """Replace the cached state with a full snapshot of the store."""
+        with stage_timer("memory_load"):
+            self.memory, self._cursor = self.store.snapshot()
+        self._heuristic_version += 1
 
-        return data
+    def _append(self, kind: str, data: dict) -> None:
+        """Append one record to the store and replay it into the cache."""
+        with stage_timer("memory_append"):
+            self.store.append(kind, data)
+        self.refresh()
 
-    def _save(self) -> None:
-        """Persist the in-memory state to the memory file."""
-        MEMORY_FILE.write_text(json.dumps(self.memory, indent=2))
+    def refresh(self) -> None:
+        """Replay records written by other threads or processes since the last read."""
+        with self._lock:
+            records, cursor = self.store.tail(self._cursor)
+            if records is None:
+                self._load()
+                self._index = None
+                self._episode_index = None
+                self._stats = None
+                return
+            for record in records:
+                apply_record(self.memory, record)
+                if record["kind"] in ("heuristic", "heuristic_update"):
+                    self._heuristic_version += 1
+                if self._index is not None and record["kind"] == "heuristic":
+                    self._index.add(record["data"])
+                if self._index is not None and record["kind"] == "heuristic_update":
+                    self._index.replace(record["data"]["position"], record["data"]["heuristic"])
+                if self._episode_index is not None and record["kind"] == "episode":
+                    self._episode_index.add(record["data"])
+                if self._stats is not None and record["kind"] == "episode":
+                    self._stats.add(record["data"])
+            self._cursor = cursor
 
     # ---------- WRITE ----------
 
@@ -40,21 +89,174 @@ class EpisodicMemory:
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
-        self.memory["episodes"].append(entry)
-        self._save()
+        self._append("episode", entry)
 
     # ---------- READ ----------
 
     def episodes(self) -> list:
         """Return the list of stored episode records."""
+        self.refresh()
         return self.memory["episodes"]
 
+    def episode_count(self) -> int:
+        """Return how many episodes were ever recorded, including pruned ones."""
+        self.refresh()
+        with self._lock:
+            return self.memory["pruned_episodes"] + len(self.memory["episodes"])
+
+    def episodes_since(self, position: int, end: int = None):
+        """Return (hot episodes from absolute ``position`` up to ``end``, total episode count)."""
+        self.refresh()
+        with self._lock:
+            pruned, episodes = self.memory["pruned_episodes"], self.memory["episodes"]
+            stop = None if end is None else max(0, end - pruned)
+            return episodes[max(0, position - pruned) : stop], pruned + len(episodes)
+
+    def rollups(self) -> list:
+        """Return the per-month outcome counts of episodes retention moved out."""
+        self.refresh()
+        return self.memory["rollups"]
+
+    def history(self) -> list:
+        """Return rollups as ``count``-weighted records followed by the hot episodes."""
+        self.refresh()
+        with self._lock:
+            return rollup_episodes(self.memory["rollups"]) + self.memory["episodes"]
+
+    def retain(self, policy: RetentionPolicy) -> int:
+        """Archive and roll up episodes expired under ``policy``; return how many."""
+        pruned = self.store.retain(policy)
+        self.refresh()
+        return pruned
+
     def heuristics(self) -> list:
         """Return the list of stored heuristics."""
+        self.refresh()
         return self.memory["heuristics"]
 
+    def heuristic_version(self) -> int:
+        """Return a counter that changes whenever this process sees the heuristics change."""
+        self.refresh()
+        return self._heuristic_version
+
+    def heuristic_index(self) -> HeuristicIndex:
+        """Return the heuristic index, built once and then updated incrementally."""
+        self.refresh()
+        with self._lock:
+            if self._index is None:
+                self._index = HeuristicIndex(self.memory["heuristics"])
+            return self._index
+
+    def episode_index(self) -> EpisodeIndex:
+        """Return the episode retrieval index, built once and then updated incrementally."""
+        self.refresh()
+        with self._lock:
+            if self._episode_index is None:
+                self._episode_index = EpisodeIndex(self.memory["episodes"])
+            return self._episode_index
+
+    def outcome_stats(self) -> OutcomeStats:
+        """Return the outcome counters, built once and then updated incrementally."""
+        self.refresh()
+        with self._lock:
+            if self._stats is None:
+                with stage_timer("stats_rebuild"):
+                    self._stats = OutcomeStats.from_episodes(
+                        self.memory["episodes"], self.memory["rollups"]
+                    )
+            return self._stats
+
+    def reflected_episodes(self) -> int:
+        """Return how many leading episodes reflection has already distilled."""
+        self.refresh()
+        return self.memory["reflected_episodes"]
+
     def add_heuristic(self, heuristic: dict) -> None:
         """Append a validated heuristic and persist it."""
         print("ADDING HEURISTIC TO MEMORY:", heuristic)
-        self.memory["heuristics"].append(heuristic)
-        self._save()
+        self._append("heuristic", heuristic)
+
+    def _find_heuristic(self, when: dict):
+        """Return (position, heuristic) for the best match on ``when``, or (None, None)."""
+        index = self.heuristic_index()
+        with self._lock:
+            position = index.find(when)
+            if position is None:
+                return None, None
+            return position, self.memory["heuristics"][position]
+
+    def _update_heuristic(self, position: int, heuristic: dict) -> None:
+        """Persist a new version of the heuristic at ``position``."""
+        self._append("heuristic_update", {"position": position, "heuristic": heuristic})
+
+    def merge_heuristic(self, heuristic: dict) -> bool:
+        """Merge into the heuristic with the same ``when`` clause, or append it.
+
+        Returns True when an existing heuristic was updated.
+        """
+        position, existing = self._find_heuristic(heuristic["when"])
+        if existing is None:
+            self.add_heuristic(heuristic)
+            return False
+
+        merged = merge_heuristic(existing, heuristic)
+        print("MERGING HEURISTIC INTO MEMORY:", merged)
+        self._update_heuristic(position, merged)
+        return True
+
+    def set_heuristic(self, heuristic: dict) -> bool:
+        """Overwrite the heuristic with the same ``when`` clause, or append it.
+
+        Used for heuristics recomputed over the whole history, whose counts
+        already include the existing heuristic's evidence. Returns True when
+        an existing heuristic was replaced.
+        """
+        position, existing = self._find_heuristic(heuristic["when"])
+        if existing is None:
+            self.add_heuristic(heuristic)
+            return False
+        if existing != heuristic:
+            print("REPLACING HEURISTIC IN MEMORY:", heuristic)
+            self._update_heuristic(position, heuristic)
+        return True
+
+    def mark_reflected(self, episodes: int) -> None:
+        """Record that the first ``episodes`` episodes have been distilled."""
+        self._append("reflection_mark", {"episodes": episodes})
+
+    def claim_reflection(self, lease: float = REFLECTION_LEASE_SECONDS):
+        """Claim the episodes past the reflection mark for one reflection.
+
+        The claim is taken atomically in the store, so across threads and
+        processes only one reflection holds it; a claim older than ``lease``
+        seconds is taken over. Returns the claim (``start``/``end`` absolute
+        positions), or None when another reflection holds it or nothing is new.
+        """
+        now = time.time()
+
+        def claim(memory):
+            current = memory["reflection_claim"]
+            if current is not None and now - current["at"] < lease:
+                return None
+            start = memory["reflected_episodes"]
+            end = memory["pruned_episodes"] + len(memory["episodes"])
+            if end <= start:
+                return None
+            return {"id": uuid.uuid4().hex, "start": start, "end": end, "at": now}
+
+        self.refresh()
+        with self._lock:
+            current = self.memory["reflection_claim"]
+            if current is not None and now - current["at"] < lease:
+                return None  # held as of our last read; skip the store round trip
+        data = self.store.append_if("reflection_claim", claim)
+        self.refresh()
+        return data
+
+    def finish_reflection(self, claim: dict) -> None:
+        """Advance the mark past ``claim`` once its heuristics are persisted."""
+        self.mark_reflected(claim["end"])
+
+    def release_reflection(self, claim: dict) -> None:
+        """Give ``claim`` up without advancing the mark, so its episodes are claimed again."""
+        self._append("reflection_release", {"id": claim["id"]})
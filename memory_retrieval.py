@@ -0,0 +1,113 @@
+"""Relevance-ranked, token-bounded retrieval of past episodes for prompts."""
+from dataclasses import dataclass
+
+FEATURES = ("feature_risk", "service_criticality", "day_of_week")
+WEIGHTS = {"feature_risk": 3.0, "service_criticality": 2.0, "day_of_week": 2.0}
+HINT_HEADER = "\nHistorical context (advisory only):\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def episode_features(episode: dict) -> tuple:
+    """Return the episode's retrieval features in ``FEATURES`` order."""
+    context = episode.get("context", {})
+    return tuple(context.get(feature) for feature in FEATURES)
+
+
+def format_episode(episode: dict) -> str:
+    """Render one episode as a compact hint line."""
+    context = episode.get("context", {})
+    conditions = " ".join(f"{k}={context[k]}" for k in FEATURES if k in context)
+    return f"- {conditions} -> {episode.get('decision')} ({episode.get('outcome')})\n"
+
+
+@dataclass
+class HintReport:
+    """How much of memory a hint used and how many tokens it saved."""
+    episodes_considered: int
+    episodes_used: int
+    prompt_tokens: int
+    baseline_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        """Tokens saved versus dumping every episode into the prompt."""
+        return self.baseline_tokens - self.prompt_tokens
+
+
+class EpisodeIndex:
+    """Episodes grouped by their exact feature tuple.
+
+    Distinct feature tuples are bounded by the categorical space (risk x
+    criticality x day), so ranking costs O(groups) rather than
+    O(episodes). It also keeps a running token count of the unbounded
+    "every episode" hint so savings can be reported without rebuilding it.
+    """
+
+    def __init__(self, episodes=()):
+        """Index an initial iterable of episode records."""
+        self._episodes = []
+        self._groups = {}  # feature tuple -> positions, oldest first
+        self.baseline_tokens = estimate_tokens(HINT_HEADER)
+        for episode in episodes:
+            self.add(episode)
+
+    def __len__(self) -> int:
+        """Return the number of indexed episodes."""
+        return len(self._episodes)
+
+    def add(self, episode: dict) -> None:
+        """Index one more episode."""
+        self._groups.setdefault(episode_features(episode), []).append(len(self._episodes))
+        self._episodes.append(episode)
+        self.baseline_tokens += estimate_tokens(f"{episode}\n")
+
+    def top_k(self, query: dict, k: int) -> list:
+        """Return up to ``k`` episodes most similar to ``query``, newest first on ties."""
+        query_features = tuple(query.get(feature) for feature in FEATURES)
+        ranked = sorted(
+            list(self._groups.items()),
+            key=lambda item: (_similarity(query_features, item[0]), item[1][-1]),
+            reverse=True,
+        )
+        selected = []
+        for _, positions in ranked:
+            for position in reversed(positions):
+                selected.append(self._episodes[position])
+                if len(selected) >= k:
+                    return selected
+        return selected
+
+
+def _similarity(query: tuple, features: tuple) -> float:
+    """Weighted feature agreement between a query and an episode group."""
+    score = 0.0
+    for name, wanted, actual in zip(FEATURES, query, features):
+        if wanted is not None and wanted == actual:
+            score += WEIGHTS[name]
+    return score
+
+
+def build_memory_hint(index: EpisodeIndex, query: dict, top_k: int, token_budget: int):
+    """Return (hint text, HintReport) for the most relevant episodes within budget."""
+    if not len(index):
+        return "", HintReport(0, 0, 0, 0)
+
+    hint = HINT_HEADER
+    used = 0
+    tokens = estimate_tokens(hint)
+    for episode in index.top_k(query, top_k):
+        line = format_episode(episode)
+        cost = estimate_tokens(line)
+        if tokens + cost > token_budget:
+            break
+        hint += line
+        tokens += cost
+        used += 1
+
+    if not used:
+        return "", HintReport(len(index), 0, 0, index.baseline_tokens)
+    return hint, HintReport(len(index), used, tokens, index.baseline_tokens)
@@ -0,0 +1,480 @@
+"""Storage engines backing episodic memory.
+
+Both engines are log-structured: every episode or heuristic is persisted as
+one appended record, and readers catch up by replaying the records written
+since their last cursor. That keeps writes O(1) and lets several threads or
+processes share the same memory without losing each other's writes.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from retention import apply_retention
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+SNAPSHOT_FORMAT = 2
+COMPACT_BYTES = 256 * 1024
+SNAPSHOT_RETRIES = 5
+
+
+def empty_memory() -> dict:
+    """Return a fresh, empty memory payload."""
+    return {
+        "episodes": [],
+        "heuristics": [],
+        "reflected_episodes": 0,
+        "reflection_claim": None,
+        "pruned_episodes": 0,
+        "rollups": [],
+    }
+
+
+def apply_record(memory: dict, record: dict) -> None:
+    """Fold a single log record into an in-memory payload."""
+    if record["kind"] == "episode":
+        memory["episodes"].append(record["data"])
+    elif record["kind"] == "heuristic":
+        memory["heuristics"].append(record["data"])
+    elif record["kind"] == "heuristic_update":
+        memory["heuristics"][record["data"]["position"]] = record["data"]["heuristic"]
+    elif record["kind"] == "reflection_mark":
+        memory["reflected_episodes"] = max(
+            memory["reflected_episodes"], record["data"]["episodes"]
+        )
+        claim = memory["reflection_claim"]
+        if claim is not None and claim["end"] <= memory["reflected_episodes"]:
+            memory["reflection_claim"] = None
+    elif record["kind"] == "reflection_claim":
+        memory["reflection_claim"] = record["data"]
+    elif record["kind"] == "reflection_release":
+        claim = memory["reflection_claim"]
+        if claim is not None and claim["id"] == record["data"]["id"]:
+            memory["reflection_claim"] = None
+
+
+class JsonlStore:
+    """Compacted JSON snapshot plus an append-only JSONL log.
+
+    Each write appends one record to the log instead of rewriting the whole
+    history. Once the log grows past ``compact_bytes`` it is folded into a new
+    snapshot generation and truncated. Writers serialise on an advisory file
+    lock; readers never take the lock. With a ``retention`` policy every
+    compaction also moves expired episodes out of the snapshot.
+    """
+
+    def __init__(
+        self, snapshot_path, log_path=None, compact_bytes: int = COMPACT_BYTES, retention=None
+    ):
+        """Configure snapshot/log locations, compaction threshold and retention."""
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = (
+            Path(log_path) if log_path else self.snapshot_path.with_suffix(".jsonl")
+        )
+        self.lock_path = self.snapshot_path.with_suffix(".lock")
+        self.compact_bytes = compact_bytes
+        self.retention = retention
+        self._generation = None
+
+    # ---------- READ ----------
+
+    def snapshot(self, migrate: bool = True):
+        """Return the full memory payload and a cursor for later ``tail`` calls.
+
+        With ``migrate=False`` a legacy memory.json is read but not rewritten.
+        """
+        for _ in range(SNAPSHOT_RETRIES):
+            snapshot_key = _stat_key(self.snapshot_path)
+            memory, generation = self._read_snapshot(migrate)
+            header, records, offset = self._read_log(0)
+
+            if header is not None and header > generation:
+                continue  # a compaction landed between the two reads
+
+            if header == generation:
+                for record in records:
+                    apply_record(memory, record)
+            else:
+                offset = 0  # missing or stale log: nothing to replay
+
+            self._generation = generation
+            return memory, (snapshot_key, generation, offset)
+
+        raise RuntimeError(f"{self.snapshot_path} kept changing while loading")
+
+    def tail(self, cursor):
+        """Return records appended since ``cursor``, or None if a reload is needed."""
+        snapshot_key, generation, offset = cursor
+        if _stat_key(self.snapshot_path) != snapshot_key:
+            return None, cursor
+
+        size = _stat_size(self.log_path)
+        if size == offset:
+            return [], cursor
+        if size < offset:
+            return None, cursor
+
+        header, records, new_offset = self._read_log(offset)
+        if _stat_key(self.snapshot_path) != snapshot_key:
+            return None, cursor  # compacted while we were reading
+        if offset == 0 and header != generation:
+            if header is not None and header < generation:
+                return [], cursor  # stale log, reset by the next writer
+            return None, cursor
+        return records, (snapshot_key, generation, new_offset)
+
+    def _read_snapshot(self, migrate: bool = True):
+        """Read the snapshot, migrating legacy memory.json layouts in place if asked."""
+        if not self.snapshot_path.exists():
+            return empty_memory(), 0
+
+        data = json.loads(self.snapshot_path.read_text())
+
+        # migration safety: old list-based memory and pre-log dict memory
+        if isinstance(data, list):
+            data = {"episodes": data, "heuristics": []}
+        if data.get("format") != SNAPSHOT_FORMAT:
+            episodes = data.get("episodes", [])
+            memory = {
+                "episodes": episodes,
+                "heuristics": data.get("heuristics", []),
+                # Legacy memories predate the mark; their heuristics already
+                # reflect every stored episode, so don't distil them again.
+                "reflected_episodes": data.get("reflected_episodes", len(episodes)),
+                "reflection_claim": None,
+                "pruned_episodes": 0,
+                "rollups": [],
+            }
+            if migrate:
+                self._write_snapshot(memory, 0)
+            return memory, 0
+
+        memory = {
+            "episodes": data["episodes"],
+            "heuristics": data["heuristics"],
+            "reflected_episodes": data.get("reflected_episodes", 0),
+            "reflection_claim": data.get("reflection_claim"),
+            "pruned_episodes": data.get("pruned_episodes", 0),
+            "rollups": data.get("rollups", []),
+        }
+        return memory, data["generation"]
+
+    def _read_log(self, offset: int):
+        """Read complete log records from ``offset``; return (header, records, end)."""
+        try:
+            handle = self.log_path.open("rb")
+        except FileNotFoundError:
+            return None, [], 0
+
+        header = None
+        records = []
+        with handle:
+            handle.seek(offset)
+            if offset == 0:
+                line = handle.readline()
+                if not line.endswith(b"\n"):
+                    return None, [], 0
+                header = json.loads(line)["generation"]
+                offset = len(line)
+            end = offset
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # torn trailing write, picked up on the next tail
+                end += len(line)
+                records.append(json.loads(line))
+        return header, records, end
+
+    # ---------- WRITE ----------
+
+    def append(self, kind: str, data: dict) -> None:
+        """Append one record to the log, compacting when it grows too long."""
+        with self._locked():
+            self._append(kind, data)
+
+    def append_if(self, kind: str, make_data):
+        """Append the record ``make_data`` builds from the current memory, atomically.
+
+        ``make_data`` sees the memory as of the writer lock and returns the
+        record's data, or None to append nothing. Returns that data.
+        """
+        with self._locked():
+            memory, _ = self.snapshot()
+            data = make_data(memory)
+            if data is not None:
+                self._append(kind, data)
+            return data
+
+    def _append(self, kind: str, data: dict) -> None:
+        """Append while already holding the writer lock."""
+        line = json.dumps({"kind": kind, "data": data}, separators=(",", ":")) + "\n"
+        self._ensure_log()
+        with self.log_path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+        if _stat_size(self.log_path) >= self.compact_bytes:
+            self._compact()
+
+    def compact(self) -> None:
+        """Fold the log into a new snapshot generation and start a fresh log."""
+        with self._locked():
+            self._ensure_log()
+            self._compact()
+
+    def retain(self, policy) -> int:
+        """Compact, moving episodes expired under ``policy`` out; return how many."""
+        with self._locked():
+            self._ensure_log()
+            return self._compact(policy)
+
+    def _compact(self, retention=None) -> int:
+        """Compact while already holding the writer lock; return episodes pruned."""
+        memory, (_, generation, _) = self.snapshot()
+        retention = retention or self.retention
+        pruned = apply_retention(memory, retention) if retention is not None else 0
+        self._write_snapshot(memory, generation + 1)
+        self._reset_log(generation + 1)
+        self._generation = generation + 1
+        return pruned
+
+    def _ensure_log(self) -> None:
+        """Make sure the log on disk belongs to the current snapshot generation."""
+        header = self._read_log_header()
+        if header is not None and header == self._generation:
+            return
+        _, generation = self._read_snapshot()
+        self._generation = generation
+        if header != generation:
+            self._reset_log(generation)
+
+    def _read_log_header(self):
+        """Return the log's generation header without reading its records."""
+        try:
+            with self.log_path.open("rb") as handle:
+                line = handle.readline()
+        except FileNotFoundError:
+            return None
+        if not line.endswith(b"\n"):
+            return None
+        return json.loads(line)["generation"]
+
+    def _write_snapshot(self, memory: dict, generation: int) -> None:
+        """Atomically replace the snapshot file."""
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "generation": generation,
+            "episodes": memory["episodes"],
+            "heuristics": memory["heuristics"],
+            "reflected_episodes": memory["reflected_episodes"],
+            "reflection_claim": memory["reflection_claim"],
+            "pruned_episodes": memory["pruned_episodes"],
+            "rollups": memory["rollups"],
+        }
+        _atomic_write(self.snapshot_path, json.dumps(payload, indent=2))
+
+    def _reset_log(self, generation: int) -> None:
+        """Atomically replace the log with an empty one for ``generation``."""
+        _atomic_write(self.log_path, json.dumps({"generation": generation}) + "\n")
+
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive advisory lock shared by all writer threads/processes."""
+        with open(self.lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class SqliteStore:
+    """SQLite-backed record log in WAL mode.
+
+    Inserts are single autocommitted statements, so every episode/heuristic
+    lands atomically, and WAL readers never wait on the writer. Each thread
+    gets its own connection. Retention deletes expired episode rows and keeps
+    the pruned count and rollups in a one-row ``retention`` table whose
+    generation tells readers to reload.
+    """
+
+    def __init__(self, path, import_from=None):
+        """Open (and create) the database, importing a JSON memory on first open."""
+        self.path = Path(path)
+        self._local = threading.local()
+        self._init_schema(import_from)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self, import_from) -> None:
+        """Create the tables and import an existing JSON memory once, read-only."""
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS retention (id INTEGER PRIMARY KEY CHECK (id = 1), "
+            "generation INTEGER NOT NULL, pruned_episodes INTEGER NOT NULL, rollups TEXT NOT NULL)"
+        )
+        conn.execute("INSERT OR IGNORE INTO retention VALUES (1, 0, 0, '[]')")
+        if import_from is None or not Path(import_from).exists():
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM records LIMIT 1").fetchone() is None:
+                memory, _ = JsonlStore(import_from).snapshot(migrate=False)
+                conn.executemany(
+                    "INSERT INTO records (kind, data) VALUES (?, ?)",
+                    [("episode", json.dumps(e)) for e in memory["episodes"]]
+                    + [("heuristic", json.dumps(h)) for h in memory["heuristics"]]
+                    + [
+                        (
+                            "reflection_mark",
+                            json.dumps({"episodes": memory["reflected_episodes"]}),
+                        )
+                    ],
+                )
+                conn.execute(
+                    "UPDATE retention SET pruned_episodes = ?, rollups = ?",
+                    (memory["pruned_episodes"], json.dumps(memory["rollups"])),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _generation(self, conn) -> int:
+        """Return the retention generation."""
+        return conn.execute("SELECT generation FROM retention").fetchone()[0]
+
+    def _read(self, conn):
+        """Return the full memory payload and cursor; callers hold a transaction."""
+        generation, pruned, rollups = conn.execute(
+            "SELECT generation, pruned_episodes, rollups FROM retention"
+        ).fetchone()
+        memory = empty_memory()
+        memory["pruned_episodes"] = pruned
+        memory["rollups"] = json.loads(rollups)
+        records, last_id = self._rows(conn, 0)
+        for record in records:
+            apply_record(memory, record)
+        return memory, (generation, last_id)
+
+    def _rows(self, conn, last_id: int):
+        """Return records inserted after row ``last_id`` and the new last row id."""
+        rows = conn.execute(
+            "SELECT id, kind, data FROM records WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        if not rows:
+            return [], last_id
+        return [{"kind": kind, "data": json.loads(data)} for _, kind, data in rows], rows[-1][0]
+
+    def snapshot(self):
+        """Return the full memory payload and a cursor for later ``tail`` calls."""
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            return self._read(conn)
+        finally:
+            conn.execute("COMMIT")
+
+    def tail(self, cursor):
+        """Return records inserted after the cursor, or None after a retention pass."""
+        generation, last_id = cursor
+        conn = self._connect()
+        if self._generation(conn) != generation:
+            return None, cursor
+        records, last_id = self._rows(conn, last_id)
+        return records, (generation, last_id)
+
+    def append(self, kind: str, data: dict) -> None:
+        """Insert one record atomically."""
+        self._connect().execute(
+            "INSERT INTO records (kind, data) VALUES (?, ?)", (kind, json.dumps(data))
+        )
+
+    def append_if(self, kind: str, make_data):
+        """Insert the record ``make_data`` builds from the current memory, atomically.
+
+        ``make_data`` sees the memory inside a write transaction and returns
+        the record's data, or None to insert nothing. Returns that data.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            memory, _ = self._read(conn)
+            data = make_data(memory)
+            if data is not None:
+                conn.execute(
+                    "INSERT INTO records (kind, data) VALUES (?, ?)", (kind, json.dumps(data))
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return data
+
+    def retain(self, policy) -> int:
+        """Move episodes expired under ``policy`` out of the database; return how many."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            memory, (generation, _) = self._read(conn)
+            pruned_before = memory["pruned_episodes"]
+            pruned = apply_retention(memory, policy)
+            if pruned:
+                ids = conn.execute(
+                    "SELECT id FROM records WHERE kind = 'episode' ORDER BY id LIMIT ?",
+                    (pruned,),
+                ).fetchall()
+                conn.execute(
+                    "DELETE FROM records WHERE kind = 'episode' AND id <= ?", (ids[-1][0],)
+                )
+                conn.execute(
+                    "UPDATE retention SET generation = ?, pruned_episodes = ?, rollups = ?",
+                    (generation + 1, pruned_before + pruned, json.dumps(memory["rollups"])),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return pruned
+
+
+def _stat_key(path: Path):
+    """Return a value that changes whenever ``path`` is replaced or rewritten."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _stat_size(path: Path) -> int:
+    """Return the file size, treating a missing file as empty."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Write text to a sibling temp file and rename it over ``path``."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
@@ -0,0 +1,201 @@
+"""In-process latency, size and token metrics rendered in Prometheus text format."""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from llm_client import prompt_text
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CHARS_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+
+def _labels(labels: dict, extra: str = "") -> str:
+    """Render a Prometheus label set, e.g. ``{call="planner",le="0.5"}``."""
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        """Create an empty histogram with upper bounds ``buckets``."""
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # sorted label items -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation."""
+        key = tuple(sorted(labels.items()))
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[slot] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        """Return the exposition lines for every label set."""
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        lines = []
+        for key in sorted(snapshot):
+            series = snapshot[key]
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                bucket_labels = _labels(key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(key)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        """Create an empty counter; ``name`` should end in ``_total``."""
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Add ``amount`` to the labelled series."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def total(self, **labels) -> float:
+        """Return the sum over every series whose labels include ``labels``."""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(value for key, value in self._series.items() if wanted <= set(key))
+
+    def render(self) -> list:
+        """Return the exposition lines for every label set."""
+        with self._lock:
+            snapshot = dict(self._series)
+        return [f"{self.name}{_labels(key)} {snapshot[key]}" for key in sorted(snapshot)]
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        """Start with no metrics."""
+        self._metrics = []
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = SECONDS_BUCKETS) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "release_agent_llm_call_seconds", "Wall time of LLM calls that reached the backend."
+)
+LLM_PROMPT_CHARS = REGISTRY.histogram(
+    "release_agent_llm_prompt_chars", "Prompt size in characters.", CHARS_BUCKETS
+)
+LLM_RESPONSE_CHARS = REGISTRY.histogram(
+    "release_agent_llm_response_chars", "Response size in characters.", CHARS_BUCKETS
+)
+LLM_TOKENS = REGISTRY.counter(
+    "release_agent_llm_tokens_total", "Tokens reported by the LLM backend."
+)
+LLM_ERRORS = REGISTRY.counter(
+    "release_agent_llm_errors_total", "LLM calls that raised an exception."
+)
+LLM_CALLS = REGISTRY.counter(
+    "release_agent_llm_attempts_total",
+    "LLM attempt outcomes (success, retry, timeout, transient, invalid, error, "
+    "circuit_open, saturated, exhausted, fallback).",
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "release_agent_stage_seconds",
+    "Wall time of pipeline stages (heuristic matching, planning, memory, simulation, ...).",
+)
+RUN_SECONDS = REGISTRY.histogram(
+    "release_agent_run_seconds", "Wall time of complete pipeline runs."
+)
+RUNS = REGISTRY.counter("release_agent_runs_total", "Completed pipeline runs by decision.")
+TRANSITIONS = REGISTRY.counter(
+    "release_agent_simulator_transitions_total", "Simulator transitions by action."
+)
+
+
+@contextmanager
+def stage_timer(stage: str, timings: dict = None):
+    """Time a block into ``release_agent_stage_seconds`` and ``timings[stage + "_ms"]``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[f"{stage}_ms"] = round(elapsed * 1e3, 3)
+
+
+def _record_llm(call: str, contents, response, elapsed: float) -> None:
+    """Record one completed LLM call."""
+    LLM_CALL_SECONDS.observe(elapsed, call=call)
+    LLM_PROMPT_CHARS.observe(len(prompt_text(contents)), call=call)
+    LLM_RESPONSE_CHARS.observe(len(response.text or ""), call=call)
+    LLM_TOKENS.inc(response.prompt_tokens, call=call, kind="prompt")
+    LLM_TOKENS.inc(response.response_tokens, call=call, kind="response")
+
+
+def timed_generate(client, call: str, model: str, contents, config: dict = None):
+    """Call ``client.generate`` and record latency, sizes and token usage under ``call``."""
+    started = time.perf_counter()
+    try:
+        response = client.generate(model, contents, config)
+    except Exception:
+        LLM_ERRORS.inc(call=call)
+        raise
+    _record_llm(call, contents, response, time.perf_counter() - started)
+    return response
+
+
+async def atimed_generate(client, call: str, model: str, contents, config: dict = None):
+    """Async counterpart of ``timed_generate``."""
+    started = time.perf_counter()
+    try:
+        response = await client.agenerate(model, contents, config)
+    except Exception:
+        LLM_ERRORS.inc(call=call)
+        raise
+    _record_llm(call, contents, response, time.perf_counter() - started)
+    return response
@@ -0,0 +1,443 @@
+"""Vectorized Monte Carlo simulation of release decision policies.
+
+``ReleaseBatch`` holds N release states as integer-coded NumPy columns and
+advances all of them at once with the transitions ``simulator.simulate``
+applies to one ``ReleaseState``; the transition tables are derived from
+``simulator.TRANSITIONS``, so a one-row batch and ``simulate`` agree step
+for step. ``run_policy`` drives randomized releases drawn from a
+``ReleaseDistribution`` through the pipeline's decision loop under a
+vectorized policy and reports aggregate decision and incident rates.
+"""
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from heuristic_engine import CONFIDENCE_THRESHOLD, FastPathPolicy, HeuristicIndex
+from pipeline import ACTION_FOR, MAX_DECISIONS
+from simulator import TRANSITIONS
+from state import ReleaseState
+from vocabulary import (
+    TERMINAL_STAGES,
+    Action,
+    Day,
+    Decision,
+    Level,
+    Recommendation,
+    Stage,
+)
+
+# code -> member; a column value is the member's position in its vocabulary.
+STAGES = tuple(Stage)
+LEVELS = tuple(Level)
+DAYS = tuple(Day)
+DECISIONS = tuple(Decision)
+ACTIONS = tuple(Action)
+RECOMMENDATIONS = tuple(Recommendation)
+CLASHES = ("UNKNOWN", False, True)  # ReleaseState.clash values
+
+
+def _codes(members) -> dict:
+    """Return the member -> code mapping for a vocabulary tuple."""
+    return {member: code for code, member in enumerate(members)}
+
+
+STAGE_CODE = _codes(STAGES)
+LEVEL_CODE = _codes(LEVELS)
+DAY_CODE = _codes(DAYS)
+DECISION_CODE = _codes(DECISIONS)
+ACTION_CODE = _codes(ACTIONS)
+RECOMMENDATION_CODE = _codes(RECOMMENDATIONS)
+CLASH_CODE = {"UNKNOWN": 0, False: 1, True: 2}
+CLASH_FALSE, CLASH_TRUE = CLASH_CODE[False], CLASH_CODE[True]
+
+# An action code of IDLE leaves a row untouched (finished releases, padding).
+IDLE = -1
+
+# action code -> next stage / decision (-1: unchanged); the last entry is IDLE.
+NEXT_STAGE = np.array([STAGE_CODE[TRANSITIONS[a][1]] for a in ACTIONS] + [-1], dtype=np.int8)
+NEXT_DECISION = np.array(
+    [DECISION_CODE[TRANSITIONS[a][2]] if TRANSITIONS[a][2] is not None else -1 for a in ACTIONS]
+    + [-1],
+    dtype=np.int8,
+)
+TERMINAL = np.array([stage in TERMINAL_STAGES for stage in STAGES])
+# recommendation code -> simulator action code, as ``pipeline.normalize_action``.
+ACTION_FOR_CODE = np.array([ACTION_CODE[ACTION_FOR[r]] for r in RECOMMENDATIONS], dtype=np.int8)
+EVALUATE_RISK = ACTION_CODE[Action.EVALUATE_RISK]
+CHECK_CLASH = ACTION_CODE[Action.CHECK_CLASH]
+RESCHEDULE = ACTION_CODE[Action.RESCHEDULE]
+HOLD = ACTION_CODE[Action.HOLD]
+UNDECIDED = DECISION_CODE[Decision.UNDECIDED]
+GO = DECISION_CODE[Decision.GO]
+
+
+def _code(table: dict, value, name: str) -> int:
+    """Return the code of ``value``, rejecting values outside the vocabulary."""
+    try:
+        return table[value]
+    except KeyError:
+        raise ValueError(f"Unsupported {name}: {value!r}") from None
+
+
+def _weights(table: dict, weights: dict, name: str):
+    """Return (codes, cumulative probabilities) for a categorical distribution."""
+    codes = np.array([_code(table, value, name) for value in weights], dtype=np.int8)
+    probabilities = np.array(list(weights.values()), dtype=np.float64)
+    if len(codes) == 0 or (probabilities < 0).any() or probabilities.sum() <= 0:
+        raise ValueError(f"{name} weights must be non-negative and not all zero")
+    cdf = np.cumsum(probabilities / probabilities.sum())
+    cdf[-1] = 1.0
+    return codes, cdf
+
+
+def _draw(rng, codes, cdf, size: int):
+    """Sample ``size`` codes from a categorical distribution."""
+    if len(codes) == 1:
+        return np.full(size, codes[0], dtype=codes.dtype)
+    return codes[np.searchsorted(cdf, rng.random(size), side="right")]
+
+
+@dataclass
+class Draws:
+    """Per-release scenario values sampled from a ``ReleaseDistribution``."""
+
+    feature_risk: np.ndarray
+    service_criticality: np.ndarray
+    day_of_week: np.ndarray
+    hour_of_day: np.ndarray
+    clash: np.ndarray
+
+
+@dataclass
+class ReleaseDistribution:
+    """Distribution over release scenarios and their simulated incident odds.
+
+    Weights map vocabulary values to relative frequencies. A released (GO)
+    change causes an incident with probability ``incident_rate`` for its
+    feature risk, times ``day_factor`` for its day and ``clash_factor`` if it
+    still clashes when released (rescheduling clears the clash).
+    """
+
+    feature_risk: dict = field(default_factory=lambda: {"LOW": 1, "MEDIUM": 1, "HIGH": 1})
+    service_criticality: dict = field(
+        default_factory=lambda: {"LOW": 1, "MEDIUM": 1, "HIGH": 1}
+    )
+    day_of_week: dict = field(
+        default_factory=lambda: dict.fromkeys(("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"), 1)
+    )
+    hour_of_day: dict = field(default_factory=lambda: dict.fromkeys(range(24), 1))
+    clash_probability: float = 0.2
+    incident_rate: dict = field(
+        default_factory=lambda: {"LOW": 0.01, "MEDIUM": 0.03, "HIGH": 0.1}
+    )
+    day_factor: dict = field(default_factory=lambda: {"FRI": 1.5, "SAT": 2.0, "SUN": 2.0})
+    clash_factor: float = 3.0
+    conflicting_service: str = ""
+
+    @classmethod
+    def from_scenario(cls, scenario: dict, **kwargs) -> "ReleaseDistribution":
+        """Return the point distribution of a scenario fixture.
+
+        The clash is the first of ``clash_outcomes``, as ``simulate`` uses it.
+        """
+        return cls(
+            feature_risk={scenario["feature_risk"]: 1},
+            service_criticality={scenario["service_criticality"]: 1},
+            day_of_week={scenario["day_of_week"]: 1},
+            hour_of_day={scenario["hour_of_day"]: 1},
+            clash_probability=1.0 if scenario["clash_outcomes"][0] else 0.0,
+            conflicting_service=scenario["conflicting_services"][0],
+            **kwargs,
+        )
+
+    def __post_init__(self):
+        """Precompute the samplers and the incident probability tables."""
+        self._risk = _weights(LEVEL_CODE, self.feature_risk, "feature_risk")
+        self._criticality = _weights(LEVEL_CODE, self.service_criticality, "service_criticality")
+        self._day = _weights(DAY_CODE, self.day_of_week, "day_of_week")
+        self._hour = _weights({hour: hour for hour in range(24)}, self.hour_of_day, "hour_of_day")
+        self._incident = np.zeros(len(LEVELS))
+        for level, rate in self.incident_rate.items():
+            self._incident[_code(LEVEL_CODE, level, "incident_rate level")] = rate
+        self._day_factor = np.ones(len(DAYS))
+        for day, factor in self.day_factor.items():
+            self._day_factor[_code(DAY_CODE, day, "day_factor day")] = factor
+
+    def sample(self, size: int, rng) -> Draws:
+        """Draw ``size`` release scenarios."""
+        clash = rng.random(size) < self.clash_probability
+        return Draws(
+            feature_risk=_draw(rng, *self._risk, size),
+            service_criticality=_draw(rng, *self._criticality, size),
+            day_of_week=_draw(rng, *self._day, size),
+            hour_of_day=_draw(rng, *self._hour, size),
+            clash=np.where(clash, CLASH_TRUE, CLASH_FALSE).astype(np.int8),
+        )
+
+    def incident_probability(self, batch: "ReleaseBatch") -> np.ndarray:
+        """Return each released row's incident probability (0 for rows not released)."""
+        probability = self._incident[batch.feature_risk] * self._day_factor[batch.day_of_week]
+        clashing = batch.clash == CLASH_TRUE
+        probability = np.where(clashing, probability * self.clash_factor, probability)
+        return np.where(batch.decision == GO, np.minimum(probability, 1.0), 0.0)
+
+
+class ReleaseBatch:
+    """N release states as integer-coded columns, advanced together by ``step``.
+
+    Columns mirror ``ReleaseState`` fields; ``trace`` (when enabled) keeps one
+    action-code array per step, with ``IDLE`` for rows that did not act.
+    """
+
+    COLUMNS = (
+        "stage",
+        "feature_risk",
+        "service_criticality",
+        "day_of_week",
+        "hour_of_day",
+        "clash",
+        "decision",
+        "revision",
+    )
+
+    def __init__(self, size: int, trace: bool = False):
+        """Create ``size`` rows holding ``ReleaseState`` defaults."""
+        defaults = ReleaseState(release_id="", application="", env="")
+        self.size = size
+        self.stage = np.full(size, STAGE_CODE[defaults.stage], dtype=np.int8)
+        self.feature_risk = np.full(size, LEVEL_CODE[defaults.feature_risk], dtype=np.int8)
+        self.service_criticality = np.full(
+            size, LEVEL_CODE[defaults.service_criticality], dtype=np.int8
+        )
+        self.day_of_week = np.full(size, DAY_CODE[defaults.day_of_week], dtype=np.int8)
+        self.hour_of_day = np.full(size, defaults.hour_of_day, dtype=np.int8)
+        self.clash = np.full(size, CLASH_CODE[defaults.clash], dtype=np.int8)
+        self.decision = np.full(size, DECISION_CODE[defaults.decision], dtype=np.int8)
+        self.revision = np.full(size, defaults.revision, dtype=np.int32)
+        self.trace = [] if trace else None
+
+    @classmethod
+    def from_states(cls, states: list, trace: bool = False) -> "ReleaseBatch":
+        """Encode ``ReleaseState`` objects; their existing traces are not copied."""
+        batch = cls(len(states), trace=trace)
+        for row, state in enumerate(states):
+            batch.stage[row] = _code(STAGE_CODE, state.stage, "stage")
+            batch.feature_risk[row] = _code(LEVEL_CODE, state.feature_risk, "feature_risk")
+            batch.service_criticality[row] = _code(
+                LEVEL_CODE, state.service_criticality, "service_criticality"
+            )
+            batch.day_of_week[row] = _code(DAY_CODE, state.day_of_week, "day_of_week")
+            batch.hour_of_day[row] = state.hour_of_day
+            batch.clash[row] = _code(CLASH_CODE, state.clash, "clash")
+            batch.decision[row] = _code(DECISION_CODE, state.decision, "decision")
+            batch.revision[row] = state.revision
+        return batch
+
+    def to_states(
+        self,
+        release_id: str = "",
+        application: str = "",
+        env: str = "prod",
+        conflicting_service: str = "",
+    ) -> list:
+        """Decode the rows into ``ReleaseState`` objects (requires ``trace``).
+
+        ``conflicting_service`` is set on rows that ran ``check_clash``.
+        """
+        if self.trace is None:
+            raise ValueError("to_states needs a batch created with trace=True")
+        steps = np.stack(self.trace, axis=1) if self.trace else np.empty((self.size, 0), np.int8)
+        states = []
+        for row in range(self.size):
+            trace = [ACTIONS[code] for code in steps[row].tolist() if code != IDLE]
+            states.append(
+                ReleaseState(
+                    release_id=release_id,
+                    application=application,
+                    env=env,
+                    stage=STAGES[self.stage[row]],
+                    feature_risk=LEVELS[self.feature_risk[row]],
+                    service_criticality=LEVELS[self.service_criticality[row]],
+                    day_of_week=DAYS[self.day_of_week[row]],
+                    hour_of_day=int(self.hour_of_day[row]),
+                    clash=CLASHES[self.clash[row]],
+                    conflicting_service=(
+                        conflicting_service if Action.CHECK_CLASH in trace else ""
+                    ),
+                    decision=DECISIONS[self.decision[row]],
+                    trace=trace,
+                    revision=int(self.revision[row]),
+                )
+            )
+        return states
+
+    def open(self) -> np.ndarray:
+        """Return a mask of rows that have not reached a terminal stage."""
+        return ~TERMINAL[self.stage]
+
+    def step(self, actions: np.ndarray, draws: Draws) -> None:
+        """Apply one action per row (``IDLE`` to skip), as ``simulate`` does."""
+        evaluate = actions == EVALUATE_RISK
+        if evaluate.any():
+            changed = evaluate & (
+                (self.feature_risk != draws.feature_risk)
+                | (self.service_criticality != draws.service_criticality)
+                | (self.day_of_week != draws.day_of_week)
+            )
+            self.feature_risk = np.where(evaluate, draws.feature_risk, self.feature_risk)
+            self.service_criticality = np.where(
+                evaluate, draws.service_criticality, self.service_criticality
+            )
+            self.day_of_week = np.where(evaluate, draws.day_of_week, self.day_of_week)
+            self.hour_of_day = np.where(evaluate, draws.hour_of_day, self.hour_of_day)
+            self.revision += changed
+        self.clash = np.where(actions == CHECK_CLASH, draws.clash, self.clash)
+        self.clash = np.where(actions == RESCHEDULE, np.int8(CLASH_FALSE), self.clash)
+
+        stage = NEXT_STAGE[actions]
+        self.stage = np.where(stage >= 0, stage, self.stage)
+        decision = NEXT_DECISION[actions]
+        self.decision = np.where(decision >= 0, decision, self.decision)
+        if self.trace is not None:
+            self.trace.append(np.asarray(actions, dtype=np.int8).copy())
+
+
+# ---------- POLICIES ----------
+# A policy maps a ReleaseBatch to one Recommendation code per row.
+
+_RISKY_DAYS = np.array([day in {Day.FRI, Day.SAT, Day.SUN} for day in DAYS])
+_NO_GO = RECOMMENDATION_CODE[Recommendation.NO_GO]
+_GO = RECOMMENDATION_CODE[Recommendation.GO]
+
+
+def conservative_rules(batch: ReleaseBatch) -> np.ndarray:
+    """NO_GO for high risk, Friday/weekend or a clash, otherwise GO.
+
+    The same rule the offline planner applies when no heuristic matches.
+    """
+    risky = (
+        (batch.feature_risk == LEVEL_CODE[Level.HIGH])
+        | _RISKY_DAYS[batch.day_of_week]
+        | (batch.clash == CLASH_TRUE)
+    )
+    return np.where(risky, _NO_GO, _GO).astype(np.int8)
+
+
+class HeuristicTable:
+    """Heuristic policy precomputed over every (risk, criticality, day, clash) cell.
+
+    Each cell takes the fast-path decision when ``fast_path`` finds a decisive
+    heuristic, otherwise the most confident applicable heuristic (as the
+    planner is told to), otherwise ``fallback``. Lookups are one gather.
+    """
+
+    def __init__(
+        self,
+        heuristics: list,
+        fast_path: FastPathPolicy = None,
+        fallback=conservative_rules,
+        env: str = "prod",
+    ):
+        """Resolve every cell of the context lattice once."""
+        fast_path = fast_path if fast_path is not None else FastPathPolicy()
+        index = HeuristicIndex(heuristics)
+        self.fallback = fallback
+        self.table = np.full((len(LEVELS), len(LEVELS), len(DAYS), len(CLASHES)), -1, np.int8)
+        for (risk, criticality, day, clash), _ in np.ndenumerate(self.table):
+            context = {
+                "feature_risk": LEVELS[risk],
+                "day_of_week": DAYS[day],
+                "service_criticality": LEVELS[criticality],
+                "clash_detected": [] if clash == 0 else [CLASHES[clash]],
+                "env": env,
+            }
+            applicable = index.applicable(context, CONFIDENCE_THRESHOLD)
+            plan = fast_path.decide(applicable)
+            if plan is not None:
+                recommendation = plan["decision"]
+            elif applicable:
+                recommendation = max(applicable, key=lambda h: h["confidence"])["recommendation"]
+            else:
+                continue
+            self.table[risk, criticality, day, clash] = RECOMMENDATION_CODE[recommendation]
+        self.complete = bool((self.table >= 0).all())
+
+    def __call__(self, batch: ReleaseBatch) -> np.ndarray:
+        """Return the table's recommendation for each row."""
+        recommendations = self.table[
+            batch.feature_risk, batch.service_criticality, batch.day_of_week, batch.clash
+        ]
+        if self.complete:
+            return recommendations
+        return np.where(recommendations >= 0, recommendations, self.fallback(batch))
+
+
+# ---------- DRIVER ----------
+
+
+def run_trajectories(
+    batch: ReleaseBatch, draws: Draws, policy, max_decisions: int = MAX_DECISIONS
+) -> np.ndarray:
+    """Run the pipeline's loop on every row; return the decisions made per row.
+
+    Each release is observed (``evaluate_risk``, ``check_clash``), then the
+    policy decides until the release is terminal; a DELAY reschedules, and a
+    release still undecided after ``max_decisions`` is held as DELAY.
+    """
+    batch.step(np.full(batch.size, EVALUATE_RISK, dtype=np.int8), draws)
+    batch.step(np.full(batch.size, CHECK_CLASH, dtype=np.int8), draws)
+    decisions = np.zeros(batch.size, dtype=np.int8)
+    for _ in range(max_decisions):
+        active = batch.open()
+        if not active.any():
+            return decisions
+        batch.step(np.where(active, ACTION_FOR_CODE[policy(batch)], np.int8(IDLE)), draws)
+        decisions += active
+    active = batch.open()
+    if active.any():
+        batch.step(np.where(active, np.int8(HOLD), np.int8(IDLE)), draws)
+    return decisions
+
+
+def run_policy(
+    policy,
+    distribution: ReleaseDistribution = None,
+    releases: int = 1_000_000,
+    seed: int = 0,
+    max_decisions: int = MAX_DECISIONS,
+    chunk_size: int = 1 << 16,
+) -> dict:
+    """Simulate ``releases`` randomized releases under ``policy`` and summarize them.
+
+    Rows are processed in chunks of ``chunk_size`` to keep the columns in cache.
+    """
+    distribution = distribution if distribution is not None else ReleaseDistribution()
+    rng = np.random.default_rng(seed)
+    decisions = np.zeros(len(DECISIONS), dtype=np.int64)
+    incidents = decision_count = 0
+    started = time.perf_counter()
+    for start in range(0, releases, chunk_size):
+        size = min(chunk_size, releases - start)
+        draws = distribution.sample(size, rng)
+        batch = ReleaseBatch(size)
+        decision_count += int(run_trajectories(batch, draws, policy, max_decisions).sum())
+        decisions += np.bincount(batch.decision, minlength=len(DECISIONS))
+        incidents += int((rng.random(size) < distribution.incident_probability(batch)).sum())
+    seconds = time.perf_counter() - started
+
+    total = max(releases, 1)
+    released = int(decisions[GO])
+    return {
+        "releases": releases,
+        "rates": {
+            str(DECISIONS[code]): round(int(count) / total, 6)
+            for code, count in enumerate(decisions)
+            if code != UNDECIDED
+        },
+        "incident_rate": round(incidents / total, 6),
+        "incidents_per_go": round(incidents / released, 6) if released else 0.0,
+        "mean_decisions": round(decision_count / total, 4),
+        "seconds": round(seconds, 4),
+        "trajectories_per_s": round(releases / seconds) if seconds else None,
+    }
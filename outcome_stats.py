@@ -0,0 +1,271 @@
+"""Incrementally maintained decision and outcome counters over episode history.
+
+``OutcomeStats`` keeps, for every (feature_risk, service_criticality,
+day_of_week) cell, decision/outcome counters in total and per UTC day. The
+cells are bounded by the categorical space, so a filtered query reads the
+counters of the matching cells instead of scanning every episode. Weekly and
+monthly series are rolled up from the daily counters at query time.
+``EpisodicMemory`` folds each new episode in as it is replayed, and
+``from_episodes`` rebuilds the counters from history in one pass over the
+episode columns. Episodes that retention rolled up keep their counts under
+a ``YYYY-MM`` period instead of a day (see ``retention.py``).
+"""
+import threading
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+
+GROUP_KEYS = ("feature_risk", "service_criticality", "day_of_week")
+LABELS = ("decision", "outcome")
+# Every counter key: the UTC day of the episode, its context and its labels.
+KEY_FIELDS = ("day",) + GROUP_KEYS + LABELS
+FILTERS = GROUP_KEYS + LABELS
+BUCKETS = ("day", "week", "month")
+
+
+def episode_key(episode: dict) -> tuple:
+    """Return the counter key for one episode record."""
+    context = episode.get("context", {})
+    return (
+        (episode.get("timestamp") or "")[:10] or None,
+        *(context.get(key) for key in GROUP_KEYS),
+        episode.get("decision"),
+        episode.get("outcome"),
+    )
+
+
+def _in_range(day: str, since: str, until: str) -> bool:
+    """Return True when an ISO day, or a ``YYYY-MM`` rollup period, is in range.
+
+    A period counts when its month overlaps the range.
+    """
+    if day is None:
+        return False
+    width = len(day)
+    return not ((since and day < since[:width]) or (until and day > until[:width]))
+
+
+@lru_cache(maxsize=4096)
+def bucket_of(day: str, bucket: str) -> str:
+    """Return the ``day`` / ``week`` / ``month`` bucket label for an ISO day.
+
+    Rolled-up ``YYYY-MM`` periods keep their month label in every series.
+    """
+    if day is None or bucket == "day" or len(day) == 7:
+        return day
+    if bucket == "month":
+        return day[:7]
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def episode_columns(episodes: list) -> list:
+    """Return the ``KEY_FIELDS`` columns of ``episodes``, one list per field."""
+    contexts = [episode.get("context", {}) for episode in episodes]
+    return [
+        [(episode.get("timestamp") or "")[:10] or None for episode in episodes],
+        *([context.get(key) for context in contexts] for key in GROUP_KEYS),
+        *([episode.get(label) for episode in episodes] for label in LABELS),
+    ]
+
+
+class Summary:
+    """Episode, decision and outcome tallies for one slice of the counters."""
+
+    def __init__(self):
+        """Start with no episodes."""
+        self.episodes = 0
+        self.decisions = Counter()
+        self.outcomes = Counter()
+
+    def add(self, decision: str, outcome: str, count: int) -> None:
+        """Tally ``count`` episodes with one decision and outcome."""
+        self.episodes += count
+        self.decisions[decision] += count
+        self.outcomes[outcome] += count
+
+    def to_dict(self) -> dict:
+        """Return the tallies with per-decision and per-outcome rates."""
+        return {
+            "episodes": self.episodes,
+            "decisions": dict(self.decisions),
+            "outcomes": dict(self.outcomes),
+            "decision_rates": _rates(self.decisions, self.episodes),
+            "outcome_rates": _rates(self.outcomes, self.episodes),
+        }
+
+
+def _rates(counts: Counter, total: int) -> dict:
+    """Return each count as a share of ``total``."""
+    return {key: round(count / total, 4) for key, count in counts.items()} if total else {}
+
+
+class OutcomeStats:
+    """Decision/outcome counters per context cell, in total and per UTC day."""
+
+    def __init__(self, counts=None):
+        """Start from an optional mapping of ``KEY_FIELDS`` tuple -> episodes."""
+        self._lock = threading.Lock()
+        self._totals = {}  # context cell -> Counter of (decision, outcome)
+        self._daily = {}  # context cell -> Counter of (day, decision, outcome)
+        for key, count in (counts or {}).items():
+            self._add(key, count)
+
+    @classmethod
+    def from_episodes(cls, episodes, rollups=()) -> "OutcomeStats":
+        """Build the counters from ``episodes`` in a single pass over their columns.
+
+        ``rollups`` are retention's per-month counts of pruned episodes; they
+        are counted under their ``YYYY-MM`` period instead of a day.
+        """
+        counts = Counter(zip(*episode_columns(list(episodes))))
+        for rollup in rollups:
+            context = rollup["context"]
+            key = (
+                rollup["period"],
+                *(context.get(field) for field in GROUP_KEYS),
+                rollup["decision"],
+                rollup["outcome"],
+            )
+            counts[key] += rollup["episodes"]
+        return cls(counts)
+
+    def __len__(self) -> int:
+        """Return the number of episodes counted."""
+        with self._lock:
+            return sum(sum(counter.values()) for counter in self._totals.values())
+
+    def _add(self, key: tuple, count: int) -> None:
+        """Add ``count`` episodes under a counter key; callers hold the lock."""
+        day, cell, labels = key[0], key[1:4], key[4:]
+        totals = self._totals.get(cell)
+        if totals is None:
+            totals = self._totals[cell] = Counter()
+            self._daily[cell] = Counter()
+        totals[labels] += count
+        self._daily[cell][(day, *labels)] += count
+
+    def add(self, episode: dict) -> None:
+        """Count one more episode."""
+        self.add_counts(episode_key(episode), 1)
+
+    def add_counts(self, key: tuple, count: int) -> None:
+        """Add ``count`` episodes under a ``KEY_FIELDS`` tuple."""
+        with self._lock:
+            self._add(key, count)
+
+    def counts(self) -> dict:
+        """Return a copy of the counters, keyed by ``KEY_FIELDS`` tuples."""
+        with self._lock:
+            return {
+                (day, *cell, *labels): count
+                for cell, daily in self._daily.items()
+                for (day, *labels), count in daily.items()
+            }
+
+    def query(
+        self,
+        filters: dict = None,
+        since: str = None,
+        until: str = None,
+        group_by=(),
+        bucket: str = None,
+    ) -> dict:
+        """Return counts and rates for the episodes matching every filter.
+
+        ``filters`` maps a ``FILTERS`` field to the values it may take;
+        ``since`` / ``until`` are inclusive ISO days (timestamps are cut to
+        the day), and a rolled-up month counts when it overlaps the range;
+        episodes without a timestamp only count in queries that use neither,
+        nor a ``bucket``. ``group_by`` adds a breakdown by ``FILTERS``
+        fields and ``bucket`` a ``day`` / ``week`` / ``month`` time series.
+        """
+        filters = {key: set(values) for key, values in (filters or {}).items() if values}
+        since = since[:10] if since else None
+        until = until[:10] if until else None
+        # Without a time filter or series the per-cell totals are enough.
+        timed = bool(since or until or bucket)
+        decisions, outcomes = filters.get("decision"), filters.get("outcome")
+        with self._lock:
+            cells = [
+                (cell, Counter(self._daily[cell] if timed else self._totals[cell]))
+                for cell in self._totals
+                if all(
+                    value in filters.get(field, (value,))
+                    for field, value in zip(GROUP_KEYS, cell)
+                )
+            ]
+
+        total, groups, series = Summary(), {}, {}
+        for cell, counter in cells:
+            for key, count in counter.items():
+                day, (decision, outcome) = (key[0], key[1:]) if timed else (None, key)
+                if decisions and decision not in decisions or outcomes and outcome not in outcomes:
+                    continue
+                if timed and not _in_range(day, since, until):
+                    continue
+                total.add(decision, outcome, count)
+                if group_by:
+                    fields = dict(zip(GROUP_KEYS, cell), decision=decision, outcome=outcome)
+                    group = tuple(fields[field] for field in group_by)
+                    groups.setdefault(group, Summary()).add(decision, outcome, count)
+                if bucket:
+                    label = bucket_of(day, bucket)
+                    series.setdefault(label, Summary()).add(decision, outcome, count)
+
+        report = {
+            "filters": {key: sorted(values) for key, values in filters.items()},
+            "since": since,
+            "until": until,
+            **total.to_dict(),
+        }
+        if group_by:
+            report["groups"] = [
+                {**dict(zip(group_by, group)), **summary.to_dict()}
+                for group, summary in sorted(groups.items(), key=lambda item: str(item[0]))
+            ]
+        if bucket:
+            report["bucket"] = bucket
+            report["series"] = [
+                {"bucket": label, **summary.to_dict()}
+                for label, summary in sorted(series.items())
+            ]
+        return report
+
+
+def parse_query(params: dict) -> dict:
+    """Turn ``GET /api/stats`` query parameters into ``query`` arguments.
+
+    Filters take repeated or comma-separated values, e.g.
+    ``feature_risk=HIGH&day_of_week=FRI,SAT``. Raises ValueError for unknown
+    parameters, group-by fields or buckets.
+    """
+    allowed = set(FILTERS) | {"since", "until", "group_by", "bucket"}
+    unknown = sorted(set(params) - allowed)
+    if unknown:
+        raise ValueError(f"unknown stats parameters: {', '.join(unknown)}")
+
+    def values(name: str) -> list:
+        """Return the non-empty values of a repeated or comma-separated parameter."""
+        return [v for raw in params.get(name, []) for v in raw.split(",") if v]
+
+    group_by = tuple(values("group_by"))
+    for field in group_by:
+        if field not in FILTERS:
+            raise ValueError(f"cannot group by {field!r}; use one of {', '.join(FILTERS)}")
+    bucket = (params.get("bucket") or [None])[-1]
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    for name in ("since", "until"):
+        for value in params.get(name, []):
+            try:
+                date.fromisoformat(value[:10])
+            except ValueError:
+                raise ValueError(f"{name} must be an ISO date, got {value!r}") from None
+    return {
+        "filters": {field: values(field) for field in FILTERS if values(field)},
+        "since": (params.get("since") or [None])[-1],
+        "until": (params.get("until") or [None])[-1],
+        "group_by": group_by,
+        "bucket": bucket,
+    }
@@ -0,0 +1,639 @@
+"""Release agent pipeline: plan, review, simulate, remember, reflect."""
+import asyncio
+import os
+import threading
+import time
+
+from decision_summary import build_context_summary, build_decision_summary
+from decision_table import get_decision_table
+from heuristic_engine import FastPathPolicy
+from heuristic_miner import mine_heuristics
+from heuristic_validation import validate_heuristic
+from llm_cache import get_cache
+from llm_client import shared_client
+from memory import EpisodicMemory
+from metrics import RUN_SECONDS, RUNS, TRANSITIONS, stage_timer
+from planner import run_planner, run_planner_async
+from red_team import run_red_team, run_red_team_async
+from reflection import run_reflection, run_reflection_async
+from simulator import simulate
+from state import ReleaseState
+from vector_index import get_decision_index
+from vocabulary import DAYS, LEVELS, TERMINAL_STAGES, Action, Decision, Recommendation
+
+REFLECTION_WINDOW = 5
+REFLECTION_ENV = "RELEASE_AGENT_REFLECTION"
+# Red-team placeholder for decisions the planner did not make (fast path or fallback).
+NOT_REVIEWED = {"concerns": [], "risk_level": "NOT_REVIEWED", "suggested_action": "NONE"}
+
+# A DELAY reschedules and re-plans; stop re-planning after this many decisions.
+MAX_DECISIONS = 5
+OUTCOMES = {Decision.GO: "SUCCESS", Decision.ABORT: "ABORTED", Decision.DELAY: "DELAYED"}
+ACTION_FOR = {
+    Recommendation.GO: Action.GO,
+    Recommendation.DELAY: Action.RESCHEDULE,
+    Recommendation.NO_GO: Action.ABORT_RELEASE,
+}
+
+# Plan sources that make no LLM call: the compiled decision table and the fast path.
+LOCAL_SOURCES = {"table", "heuristic"}
+
+_decision_lock = threading.Lock()
+_decision_counts = {"decisions": 0, "local": 0}
+SIMILAR_RELEASES = 3
+
+
+def get_client():
+    """Return the process-wide LLM client (Gemini unless RELEASE_AGENT_LLM=stub)."""
+    return shared_client()
+
+
+def normalize_action(decision: str) -> str:
+    """Map planner decisions to simulator actions."""
+    return ACTION_FOR.get(decision, decision)
+
+
+def new_release_state(scenario: dict) -> ReleaseState:
+    """Build the initial release state for a scenario (identity fields are optional)."""
+    risk = scenario["feature_risk"]
+    criticality = scenario["service_criticality"]
+    day = scenario["day_of_week"]
+    return ReleaseState(
+        release_id=scenario.get("release_id", "ACCOUNT-OPENING-SERVICE-1.0.0"),
+        application=scenario.get("application", "ACCOUNT-OPENING-SERVICE"),
+        env=scenario.get("env", "prod"),
+        day_of_week=DAYS.get(day, day),
+        hour_of_day=scenario["hour_of_day"],
+        feature_risk=LEVELS.get(risk, risk),
+        service_criticality=LEVELS.get(criticality, criticality),
+    )
+
+
+def build_context(state: ReleaseState, scenario: dict) -> dict:
+    """Return the planner context for the current state."""
+    return {
+        "feature_risk": state.feature_risk,
+        "day_of_week": state.day_of_week,
+        "service_criticality": state.service_criticality,
+        "clash_detected": scenario["clash_outcomes"],  # <-- from simulation
+        "env": state.env,
+    }
+
+
+def build_evidence(context: dict) -> dict:
+    """Return the (mocked) execution evidence handed to the red team."""
+    return {
+        "clash_detected": context["clash_detected"],
+        "freeze_window": False,
+        "missing_info": [],
+    }
+
+
+def count_decision(source: str) -> None:
+    """Tally whether a loop decision was served locally or by the planner."""
+    with _decision_lock:
+        _decision_counts["decisions"] += 1
+        if source in LOCAL_SOURCES:
+            _decision_counts["local"] += 1
+
+
+def fast_path_stats() -> dict:
+    """Return process-wide counts of decisions served without an LLM call."""
+    with _decision_lock:
+        stats = dict(_decision_counts)
+    stats["local_fraction"] = (
+        round(stats["local"] / stats["decisions"], 3) if stats["decisions"] else 0.0
+    )
+    return stats
+
+
+def local_plan(memory, context: dict, applicable: list, policy: FastPathPolicy, timings: dict):
+    """Return a decision served without the planner, or None.
+
+    The compiled decision table answers first (skipping heuristic-compiled
+    cells when the fast path is disabled); otherwise the heuristic fast path
+    decides when an applicable heuristic is decisive.
+    """
+    table = get_decision_table()
+    if table is not None:
+        with stage_timer("decision_table", timings):
+            plan = table.plan(context, memory, heuristics=policy.enabled)
+        if plan is not None:
+            return plan
+    return policy.decide(applicable)
+
+
+def print_red_team(red_team_result: dict) -> None:
+    """Print an advisory red-team review."""
+    print("\nRED TEAM REVIEW (ADVISORY):")
+    print(f"Risk level: {red_team_result['risk_level']}")
+    for concern in red_team_result["concerns"]:
+        print(" -", concern)
+    print(f"Suggested action: {red_team_result['suggested_action']}")
+
+
+def episode_context(state: ReleaseState) -> dict:
+    """Return the context stored with episodes and indexed summaries."""
+    return {
+        "feature_risk": state.feature_risk,
+        "day_of_week": state.day_of_week,
+        "service_criticality": state.service_criticality,
+    }
+
+
+def recall_similar(context: dict) -> list:
+    """Return the most similar past releases from the decision index."""
+    index = get_decision_index()
+    if index is None:
+        return []
+    hits = index.search(build_context_summary(context), k=SIMILAR_RELEASES)
+    return [
+        {
+            "context": hit["context"],
+            "decision": hit["decision"],
+            "outcome": hit["outcome"],
+            "similarity": round(hit["similarity"], 2),
+        }
+        for hit in hits
+    ]
+
+
+def index_decision(state: ReleaseState, steps: list, outcome: str) -> None:
+    """Add the run's decision summary to the decision index."""
+    index = get_decision_index()
+    if index is None or not steps:
+        return
+    last = steps[-1]
+    summary = build_decision_summary(
+        context=last["context"],
+        planner=last["plan"],
+        red_team=last["red_team"],
+        final_decision=state.decision,
+        human_outcome=outcome,
+    )
+    index.add(
+        summary,
+        {
+            "release_id": state.release_id,
+            "context": episode_context(state),
+            "decision": state.decision,
+            "outcome": outcome,
+        },
+    )
+
+
+def should_hold(state: ReleaseState, steps: list) -> bool:
+    """Return True when an unfinished run should stop re-planning.
+
+    That is after ``MAX_DECISIONS`` decisions, or straight after a fallback
+    DELAY, since re-planning against an unavailable LLM cannot do better.
+    """
+    if state.stage in TERMINAL_STAGES:
+        return False
+    return len(steps) >= MAX_DECISIONS or steps[-1]["source"] == "fallback"
+
+
+def hold_release(state: ReleaseState) -> None:
+    """End an unfinished run with a DELAY decision."""
+    simulate(state, Action.HOLD, None)
+
+
+def is_degraded(steps: list) -> bool:
+    """Return True when any decision was the planner's LLM-unavailable fallback."""
+    return any(step["source"] == "fallback" for step in steps)
+
+
+def record_episode(memory, state: ReleaseState, verbose: bool, degraded: bool = False) -> str:
+    """Print the final trace, write the run's episode to memory and return its outcome.
+
+    Degraded runs are not written: a fallback DELAY says nothing about the
+    release and would skew reflection.
+    """
+    if verbose:
+        print(f"\nFINAL DECISION: {state.decision}")
+        print("TRACE:")
+        for h in state.history:
+            print(" ", h)
+        print("LLM CACHE:", get_cache().stats())
+        print("FAST PATH:", fast_path_stats())
+
+    outcome = OUTCOMES.get(state.decision, "SUCCESS")
+    if degraded:
+        if verbose:
+            print("DEGRADED RUN: LLM unavailable, episode not recorded")
+        return outcome
+
+    memory.write(
+        context=episode_context(state),
+        decision=state.decision,
+        outcome=outcome,
+    )
+    return outcome
+
+
+def add_heuristics(memory, candidates: list) -> dict:
+    """Validate reflection candidates and merge the valid ones into memory."""
+    counts = {"added": 0, "merged": 0}
+    for h in candidates:
+        try:
+            validate_heuristic(h)
+        except AssertionError:
+            continue
+        if memory.merge_heuristic(h):
+            counts["merged"] += 1
+        else:
+            counts["added"] += 1
+    return counts
+
+
+def claim_episodes(memory):
+    """Claim the episodes past the reflection mark; return (claim, episodes).
+
+    The claim is atomic in the store, so a concurrent run, or a background
+    reflection still in flight, never distils the same episodes twice.
+    Returns (None, []) when another reflection holds the claim.
+    """
+    claim = memory.claim_reflection()
+    if claim is None:
+        return None, []
+    episodes, _ = memory.episodes_since(claim["start"], claim["end"])
+    return claim, episodes
+
+
+def settle_claim(memory, claim: dict, candidates) -> dict:
+    """Persist reflection ``candidates``, then advance the mark past ``claim``.
+
+    ``None`` candidates mean reflection failed: the claim is released so a
+    later run distils the same episodes again.
+    """
+    if candidates is None:
+        memory.release_reflection(claim)
+        return {"added": 0, "merged": 0}
+    try:
+        counts = add_heuristics(memory, candidates)
+    except BaseException:
+        memory.release_reflection(claim)
+        raise
+    memory.finish_reflection(claim)
+    return counts
+
+
+def use_miner() -> bool:
+    """Return True when RELEASE_AGENT_REFLECTION selects the offline miner."""
+    return os.environ.get(REFLECTION_ENV, "llm") == "miner"
+
+
+def reflect(client, memory) -> dict:
+    """Distil episodes added since the last reflection into heuristics."""
+    claim, episodes = claim_episodes(memory)
+    if claim is None:
+        return {"added": 0, "merged": 0}
+    try:
+        if use_miner():
+            candidates = mine_heuristics(episodes)
+        else:
+            candidates = run_reflection(client, episodes)
+    except BaseException:
+        memory.release_reflection(claim)
+        raise
+    return settle_claim(memory, claim, candidates)
+
+
+def summarize_sources(steps: list) -> dict:
+    """Count a run's decisions and how many were served without the planner."""
+    local = sum(1 for step in steps if step["source"] in LOCAL_SOURCES)
+    return {"decisions": len(steps), "local": local}
+
+
+def step_simulator(state: ReleaseState, action: str, scenario: dict, timings: dict):
+    """Advance the simulator one transition, timing and counting it."""
+    with stage_timer("simulate", timings):
+        state = simulate(state, action, scenario)
+    TRANSITIONS.inc(action=action)
+    return state
+
+
+def finish_run(state: ReleaseState, started: float, run_timings: dict) -> dict:
+    """Record run-level metrics and return the run's timings with its total."""
+    elapsed = time.perf_counter() - started
+    RUN_SECONDS.observe(elapsed)
+    RUNS.inc(decision=state.decision)
+    run_timings["total_ms"] = round(elapsed * 1e3, 3)
+    return run_timings
+
+
+def _ignore_event(kind: str, payload: dict) -> None:
+    """Default ``on_event`` sink."""
+
+
+def run_release_agent(
+    scenario: dict,
+    verbose: bool = True,
+    memory=None,
+    client=None,
+    on_event=None,
+    policy: FastPathPolicy = None,
+) -> dict:
+    """Run the release agent loop for a scenario and return structured results.
+
+    ``on_event(kind, payload)`` is called as soon as each step is produced
+    (context, heuristics, plan, red_team, transition, episode, reflection) so
+    callers can stream progress instead of waiting for the whole run.
+    When ``policy`` (default: from the environment) finds a decisive
+    heuristic, the planner and red-team calls are skipped for that step.
+    """
+    memory = memory if memory is not None else EpisodicMemory()
+    client = client if client is not None else get_client()
+    policy = policy if policy is not None else FastPathPolicy.from_env()
+    emit = on_event or _ignore_event
+
+    started = time.perf_counter()
+    state = new_release_state(scenario)
+
+    steps = []
+    context_revision = None
+
+    while state.stage not in TERMINAL_STAGES:
+        if verbose:
+            print(f"\nOBSERVE: {state}")
+        # action = decide_next_action(state, memory)
+        timings = {}
+
+        # ---- CONTEXT FOR DECISION (rebuilt only when its inputs change) ----
+        if state.revision != context_revision:
+            context_revision = state.revision
+            context = build_context(state, scenario)
+            evidence = build_evidence(context)
+        emit("context", {"stage": state.stage, "context": context})
+
+        # ---- APPLY HEURISTICS (NEW) ----
+        with stage_timer("heuristic_match", timings):
+            applicable = memory.heuristic_index().applicable(context)
+        emit("heuristics", {"heuristics": applicable})
+
+        # ---- LOCAL PATH: the decision table or a decisive heuristic skips the LLM ----
+        plan = local_plan(memory, context, applicable, policy, timings)
+        similar = []
+        if plan is None:
+            # ---- RECALL SIMILAR PAST RELEASES ----
+            with stage_timer("recall", timings):
+                similar = recall_similar(context)
+
+            # ---- PLAN (heuristic-aware) ----
+            with stage_timer("planner", timings):
+                plan = run_planner(
+                    client=client,
+                    context=context,
+                    heuristics=applicable,
+                    similar=similar,
+                )
+        source = plan.get("source", "planner")
+        count_decision(source)
+        emit("plan", {"plan": plan, "source": source})
+
+        decision = plan["decision"]
+        action = normalize_action(decision)
+        if verbose:
+            print("DEBUG plan:", plan, type(plan))
+            print(f"DECIDE: {decision} | reason: {plan.get('reason')}")
+
+        # ---- RED TEAM REVIEW (ADVISORY) ----
+        if source != "planner":
+            red_team_result = dict(NOT_REVIEWED)
+        else:
+            with stage_timer("red_team", timings):
+                red_team_result = run_red_team(
+                    client=client,
+                    context=context,
+                    decision=plan["decision"],
+                    evidence=evidence,
+                )
+
+        emit("red_team", {"red_team": red_team_result})
+        if verbose:
+            print_red_team(red_team_result)
+
+        step = {
+            "context": context,
+            "heuristics": applicable,
+            "similar": similar,
+            "plan": plan,
+            "source": source,
+            "red_team": red_team_result,
+            "action": action,
+            "stage": state.stage,
+            "timings": timings,
+        }
+        steps.append(step)
+
+        previous_stage = state.stage
+        state = step_simulator(state, action, scenario, timings)
+        if should_hold(state, steps):
+            hold_release(state)
+        emit(
+            "transition",
+            {"action": action, "from": previous_stage, "to": state.stage},
+        )
+
+    run_timings = {}
+    degraded = is_degraded(steps)
+    with stage_timer("memory_save", run_timings):
+        outcome = record_episode(memory, state, verbose, degraded)
+    if not degraded:
+        with stage_timer("index", run_timings):
+            index_decision(state, steps, outcome)
+    emit("episode", {"decision": state.decision})
+
+    reflection = {"ran": False, "added": 0, "merged": 0}
+    if should_reflect(memory):
+        with stage_timer("reflection", run_timings):
+            reflection = {"ran": True, **reflect(client, memory)}
+    emit("reflection", reflection)
+
+    return {
+        "decision": state.decision,
+        "history": state.history,
+        "steps": steps,
+        "reflection": reflection,
+        "fast_path": summarize_sources(steps),
+        "degraded": degraded,
+        "timings": finish_run(state, started, run_timings),
+    }
+
+
+# ---------- ASYNC PIPELINE ----------
+
+_background_tasks = set()
+
+
+def predict_decision(applicable: list):
+    """Guess the planner's decision from the most confident applicable heuristic."""
+    if not applicable:
+        return None
+    return max(applicable, key=lambda h: h["confidence"])["recommendation"]
+
+
+async def reflect_async(client, memory, claim: dict, episodes: list) -> dict:
+    """Distil already-claimed episodes into heuristics on the event loop."""
+    try:
+        if use_miner():
+            candidates = mine_heuristics(episodes)
+        else:
+            candidates = await run_reflection_async(client, episodes)
+    except BaseException:
+        memory.release_reflection(claim)
+        raise
+    return settle_claim(memory, claim, candidates)
+
+
+async def run_release_agent_async(
+    scenario: dict,
+    verbose: bool = True,
+    memory=None,
+    client=None,
+    background_reflection: bool = True,
+    policy: FastPathPolicy = None,
+) -> dict:
+    """Async release agent loop that overlaps independent LLM calls.
+
+    The red-team review is advisory and never changes the next state, so it
+    runs as a task alongside the rest of the loop. When an applicable
+    heuristic predicts the planner's decision, the review is launched
+    speculatively before planning finishes and discarded on a mismatch.
+    Steps resolved by the heuristic fast path make no LLM calls at all.
+    Reflection is scheduled in the background unless
+    ``background_reflection`` is False; await ``drain_background_tasks()``
+    before shutting the event loop down.
+    """
+    memory = memory if memory is not None else EpisodicMemory()
+    client = client if client is not None else get_client()
+    policy = policy if policy is not None else FastPathPolicy.from_env()
+
+    started = time.perf_counter()
+    state = new_release_state(scenario)
+
+    steps = []
+    reviews = []
+    tasks = []
+    context_revision = None
+
+    try:
+        while state.stage not in TERMINAL_STAGES:
+            if verbose:
+                print(f"\nOBSERVE: {state}")
+            timings = {}
+
+            if state.revision != context_revision:
+                context_revision = state.revision
+                context = build_context(state, scenario)
+                evidence = build_evidence(context)
+            with stage_timer("heuristic_match", timings):
+                applicable = memory.heuristic_index().applicable(context)
+
+            plan = local_plan(memory, context, applicable, policy, timings)
+            similar, review = [], None
+            if plan is None:
+                with stage_timer("recall", timings):
+                    similar = recall_similar(context)
+                predicted = predict_decision(applicable)
+                speculative = None
+                if predicted is not None:
+                    speculative = asyncio.create_task(
+                        run_red_team_async(client, context, predicted, evidence)
+                    )
+                    tasks.append(speculative)
+
+                with stage_timer("planner", timings):
+                    plan = await run_planner_async(
+                        client=client, context=context, heuristics=applicable, similar=similar
+                    )
+
+                if plan.get("source") == "fallback":
+                    if speculative is not None:
+                        speculative.cancel()
+                elif speculative is not None and predicted == plan["decision"]:
+                    review = speculative
+                else:
+                    if speculative is not None:
+                        speculative.cancel()
+                    review = asyncio.create_task(
+                        run_red_team_async(client, context, plan["decision"], evidence)
+                    )
+                    tasks.append(review)
+
+            source = plan.get("source", "planner")
+            count_decision(source)
+            decision = plan["decision"]
+            action = normalize_action(decision)
+            if verbose:
+                print(f"DECIDE: {decision} | reason: {plan.get('reason')}")
+
+            step = {
+                "context": context,
+                "heuristics": applicable,
+                "similar": similar,
+                "plan": plan,
+                "source": source,
+                "red_team": dict(NOT_REVIEWED) if review is None else None,
+                "action": action,
+                "stage": state.stage,
+                "timings": timings,
+            }
+            steps.append(step)
+            if review is not None:
+                reviews.append((step, review))
+
+            state = step_simulator(state, action, scenario, timings)
+            if should_hold(state, steps):
+                hold_release(state)
+
+        for step, review in reviews:
+            with stage_timer("red_team_wait", step["timings"]):
+                step["red_team"] = await review
+            if verbose:
+                print_red_team(step["red_team"])
+    finally:
+        for task in tasks:
+            task.cancel()  # no-op for finished reviews; cleans up on errors
+
+    run_timings = {}
+    degraded = is_degraded(steps)
+    with stage_timer("memory_save", run_timings):
+        outcome = record_episode(memory, state, verbose, degraded)
+    if not degraded:
+        with stage_timer("index", run_timings):
+            index_decision(state, steps, outcome)
+
+    reflection = {"ran": False, "added": 0, "merged": 0}
+    claim, episodes = claim_episodes(memory) if should_reflect(memory) else (None, [])
+    if claim is not None:
+        reflection["ran"] = True
+        if background_reflection:
+            task = asyncio.create_task(reflect_async(client, memory, claim, episodes))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            reflection["background"] = True
+        else:
+            with stage_timer("reflection", run_timings):
+                reflection.update(await reflect_async(client, memory, claim, episodes))
+
+    return {
+        "decision": state.decision,
+        "history": state.history,
+        "steps": steps,
+        "reflection": reflection,
+        "fast_path": summarize_sources(steps),
+        "degraded": degraded,
+        "timings": finish_run(state, started, run_timings),
+    }
+
+
+async def drain_background_tasks() -> None:
+    """Wait for background reflection tasks started by the async pipeline."""
+    while _background_tasks:
+        await asyncio.gather(*list(_background_tasks), return_exceptions=True)
+
+
+def should_reflect(memory) -> bool:
+    """Return True once a full window of episodes has not been distilled yet."""
+    return memory.episode_count() - memory.reflected_episodes() >= REFLECTION_WINDOW
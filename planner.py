@@ -1,6 +1,14 @@
 """LLM planner that proposes deployment decisions."""
 import json
 
+from llm_cache import cache_key, get_cache
+from llm_resilience import (
+    LLMUnavailable,
+    aresilient_generate,
+    record_fallback,
+    resilient_generate,
+)
+
 PLANNER_PROMPT = """
 You are a deployment decision planner.
 
@@ -10,9 +18,13 @@ Context:
 Applicable heuristics:
 {heuristics}
 
+Similar past releases:
+{similar}
+
 Rules:
 - If a heuristic applies, you MUST follow its recommendation unless there is a strong reason not to.
 - If you override a heuristic, explain why.
+- Similar past releases are advisory; weigh their outcomes but do not copy them blindly.
 - Be conservative with production releases
 - Return JSON only.
 - Produce EXACTLY ONE decision.
@@ -26,21 +38,101 @@ Output format (single object only):
 """
 
 MODEL = "gemini-3-flash-preview"
+PROMPT_VERSION = 2
+DECISIONS = {"GO", "NO_GO", "DELAY"}
+
+
+def _parses(text: str) -> bool:
+    """Return True when the response is a JSON object with a known decision."""
+    try:
+        obj = json.loads(text)
+    except (ValueError, TypeError):
+        return False
+    return isinstance(obj, dict) and obj.get("decision") in DECISIONS
+
 
+def fallback_plan(error: Exception) -> dict:
+    """Return the conservative decision used when the LLM is unavailable."""
+    return {
+        "decision": "DELAY",
+        "reason": f"Planner unavailable, holding the release ({error}).",
+        "source": "fallback",
+    }
 
-def run_planner(client, context: dict, heuristics: list) -> dict:
-    """Ask the LLM to return a deployment decision and short rationale."""
-    prompt = PLANNER_PROMPT.format(
+
+def _build_prompt(context: dict, heuristics: list, similar: list) -> str:
+    """Render the planner prompt for a context, its heuristics and similar releases."""
+    return PLANNER_PROMPT.format(
         context=json.dumps(context, indent=2),
         heuristics=json.dumps(heuristics, indent=2),
+        similar=json.dumps(similar, indent=2),
     )
 
-    response = client.models.generate_content(
-        model=MODEL, contents=prompt, config={"response_mime_type": "application/json"}
+
+def run_planner(
+    client, context: dict, heuristics: list, cache=None, similar: list = None
+) -> dict:
+    """Ask the LLM to return a deployment decision and short rationale.
+
+    ``similar`` is an optional list of similar past releases recalled from
+    the decision index. When the LLM is unavailable the conservative
+    ``fallback_plan`` (DELAY) is returned instead of raising.
+    """
+    similar = similar or []
+    prompt = _build_prompt(context, heuristics, similar)
+
+    def call() -> str:
+        response = resilient_generate(
+            client,
+            "planner",
+            MODEL,
+            prompt,
+            {"response_mime_type": "application/json"},
+            accept=_parses,
+        )
+        return response.text
+
+    cache = cache or get_cache()
+    key = cache_key(
+        MODEL, PROMPT_VERSION, context=context, heuristics=heuristics, similar=similar
     )
+    try:
+        text = cache.get_or_call(key, call, accept=_parses)
+    except LLMUnavailable as exc:
+        record_fallback("planner", exc)
+        return fallback_plan(exc)
+
+    print("PLANNER OUTPUT:", json.loads(text))
+    return json.loads(text)
 
-    # print("PLANNER RESPONSE:", response)
 
-    text = response.candidates[0].content.parts[0].text
+async def run_planner_async(
+    client, context: dict, heuristics: list, cache=None, similar: list = None
+) -> dict:
+    """Async variant of ``run_planner`` on the client's ``agenerate``."""
+    similar = similar or []
+    prompt = _build_prompt(context, heuristics, similar)
+
+    async def call() -> str:
+        response = await aresilient_generate(
+            client,
+            "planner",
+            MODEL,
+            prompt,
+            {"response_mime_type": "application/json"},
+            accept=_parses,
+        )
+        return response.text
+
+    cache = cache or get_cache()
+    key = cache_key(
+        MODEL, PROMPT_VERSION, context=context, heuristics=heuristics, similar=similar
+    )
+    try:
+        text = await cache.aget_or_call(key, call, accept=_parses)
+    except LLMUnavailable as exc:
+        record_fallback("planner", exc)
+        return fallback_plan(exc)
+
     print("PLANNER OUTPUT:", json.loads(text))
     return json.loads(text)
@@ -2,6 +2,14 @@
 import json
 from typing import List, TypedDict
 
+from llm_cache import cache_key, get_cache
+from llm_resilience import (
+    LLMUnavailable,
+    aresilient_generate,
+    record_fallback,
+    resilient_generate,
+)
+
 
 class RedTeamResult(TypedDict):
     """Typed dictionary schema for red-team review outputs."""
@@ -43,19 +51,11 @@ Output format:
 
 # red_team.py
 MODEL = "gemini-3-flash-preview"
+PROMPT_VERSION = 1
 
 
-def run_red_team(client, context: dict, decision: str, evidence: dict) -> RedTeamResult:
-    """Run the red-team reviewer and validate its structured response."""
-    prompt = RED_TEAM_PROMPT.format(
-        context=json.dumps(context, indent=2),
-        decision=decision,
-        evidence=json.dumps(evidence, indent=2),
-    )
-
-    response = client.models.generate_content(model=MODEL, contents=prompt)
-
-    text = response.candidates[0].content.parts[0].text
+def _parse_review(text: str) -> RedTeamResult:
+    """Parse, normalise and validate a raw red-team response."""
     parsed = json.loads(text)
 
     # ---- HARD NORMALISATION ----
@@ -70,3 +70,80 @@ def run_red_team(client, context: dict, decision: str, evidence: dict) -> RedTea
     assert isinstance(parsed["concerns"], list)
 
     return parsed
+
+
+def _is_valid_review(text: str) -> bool:
+    """Return True when the response passes red-team validation."""
+    try:
+        _parse_review(text)
+    except (ValueError, TypeError, KeyError, AssertionError):
+        return False
+    return True
+
+
+def fallback_review(error: Exception) -> RedTeamResult:
+    """Return the review used when the LLM is unavailable: treat it as high risk."""
+    return {
+        "concerns": [f"Red-team review unavailable ({error})."],
+        "risk_level": "HIGH",
+        "suggested_action": "DELAY",
+    }
+
+
+def _build_prompt(context: dict, decision: str, evidence: dict) -> str:
+    """Render the red-team prompt for a proposed decision."""
+    return RED_TEAM_PROMPT.format(
+        context=json.dumps(context, indent=2),
+        decision=decision,
+        evidence=json.dumps(evidence, indent=2),
+    )
+
+
+def run_red_team(
+    client, context: dict, decision: str, evidence: dict, cache=None
+) -> RedTeamResult:
+    """Run the red-team reviewer and validate its structured response."""
+    prompt = _build_prompt(context, decision, evidence)
+
+    def call() -> str:
+        response = resilient_generate(
+            client, "red_team", MODEL, prompt, accept=_is_valid_review
+        )
+        return response.text
+
+    cache = cache or get_cache()
+    key = cache_key(
+        MODEL, PROMPT_VERSION, context=context, decision=decision, evidence=evidence
+    )
+    try:
+        text = cache.get_or_call(key, call, accept=_is_valid_review)
+    except LLMUnavailable as exc:
+        record_fallback("red_team", exc)
+        return fallback_review(exc)
+
+    return _parse_review(text)
+
+
+async def run_red_team_async(
+    client, context: dict, decision: str, evidence: dict, cache=None
+) -> RedTeamResult:
+    """Async variant of ``run_red_team`` on the client's ``agenerate``."""
+    prompt = _build_prompt(context, decision, evidence)
+
+    async def call() -> str:
+        response = await aresilient_generate(
+            client, "red_team", MODEL, prompt, accept=_is_valid_review
+        )
+        return response.text
+
+    cache = cache or get_cache()
+    key = cache_key(
+        MODEL, PROMPT_VERSION, context=context, decision=decision, evidence=evidence
+    )
+    try:
+        text = await cache.aget_or_call(key, call, accept=_is_valid_review)
+    except LLMUnavailable as exc:
+        record_fallback("red_team", exc)
+        return fallback_review(exc)
+
+    return _parse_review(text)
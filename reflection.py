@@ -1,13 +1,22 @@
 """Heuristic extraction from recent episodic memory."""
 import json
 
+from llm_cache import cache_key, get_cache
+from llm_resilience import (
+    LLMUnavailable,
+    aresilient_generate,
+    record_fallback,
+    resilient_generate,
+)
+
 REFLECTION_PROMPT = """
 You are extracting reusable decision heuristics from past episodes.
 
-Episodes:
+Episode outcome counts:
 {episodes}
 
 Rules:
+- Each entry aggregates every new episode with that exact context.
 - Only generalise across shared context attributes.
 - Do NOT invent new attributes.
 - If fewer than 3 supporting episodes exist, confidence MUST be <= 0.6.
@@ -28,20 +37,99 @@ Output format:
 
 
 MODEL = "gemini-3-flash-preview"
+PROMPT_VERSION = 2
+
+
+def _parses(text: str) -> bool:
+    """Return True when the response is a JSON object."""
+    try:
+        return isinstance(json.loads(text), dict)
+    except (ValueError, TypeError):
+        return False
+
 
+def aggregate_episodes(episodes: list) -> list:
+    """Collapse episodes into one decision/outcome count entry per distinct context."""
+    groups = {}
+    for episode in episodes:
+        context = episode.get("context", {})
+        key = json.dumps(context, sort_keys=True)
+        group = groups.setdefault(
+            key, {"context": context, "episodes": 0, "decisions": {}, "outcomes": {}}
+        )
+        group["episodes"] += 1
+        decision, outcome = episode.get("decision"), episode.get("outcome")
+        group["decisions"][decision] = group["decisions"].get(decision, 0) + 1
+        group["outcomes"][outcome] = group["outcomes"].get(outcome, 0) + 1
+    return [groups[key] for key in sorted(groups)]
 
-def run_reflection(client, episodes: list) -> list:
-    """Generate heuristic candidates from recent episodes via the LLM."""
-    prompt = REFLECTION_PROMPT.format(episodes=json.dumps(episodes, indent=2))
 
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=prompt,
-        config={"temperature": 0.0, "response_mime_type": "application/json"},
+def _build_prompt(groups: list) -> str:
+    """Render the reflection prompt for aggregated episode counts."""
+    return REFLECTION_PROMPT.format(
+        episodes=json.dumps(groups, sort_keys=True, separators=(",", ":"))
     )
 
-    # Gemini returns structured candidates
-    text = response.candidates[0].content.parts[0].text
+
+def run_reflection(client, episodes: list, cache=None) -> list:
+    """Generate heuristic candidates from new episodes via the LLM.
+
+    Episodes are pre-aggregated into per-context counts, so the prompt
+    grows with the number of distinct contexts rather than episodes.
+    Returns None when the LLM is unavailable, so the caller can retry the
+    same episodes later.
+    """
+    groups = aggregate_episodes(episodes)
+    prompt = _build_prompt(groups)
+
+    def call() -> str:
+        response = resilient_generate(
+            client,
+            "reflection",
+            MODEL,
+            prompt,
+            {"temperature": 0.0, "response_mime_type": "application/json"},
+            accept=_parses,
+        )
+        # Gemini returns structured candidates
+        return response.text
+
+    cache = cache or get_cache()
+    key = cache_key(MODEL, PROMPT_VERSION, groups=groups)
+    try:
+        text = cache.get_or_call(key, call, accept=_parses)
+    except LLMUnavailable as exc:
+        record_fallback("reflection", exc)
+        return None
+
+    parsed = json.loads(text)
+    print("REFLECTION OUTPUT:", json.dumps(parsed, indent=2))
+    return parsed.get("heuristics", [])
+
+
+async def run_reflection_async(client, episodes: list, cache=None) -> list:
+    """Async variant of ``run_reflection`` on the client's ``agenerate``."""
+    groups = aggregate_episodes(episodes)
+    prompt = _build_prompt(groups)
+
+    async def call() -> str:
+        response = await aresilient_generate(
+            client,
+            "reflection",
+            MODEL,
+            prompt,
+            {"temperature": 0.0, "response_mime_type": "application/json"},
+            accept=_parses,
+        )
+        return response.text
+
+    cache = cache or get_cache()
+    key = cache_key(MODEL, PROMPT_VERSION, groups=groups)
+    try:
+        text = await cache.aget_or_call(key, call, accept=_parses)
+    except LLMUnavailable as exc:
+        record_fallback("reflection", exc)
+        return None
 
     parsed = json.loads(text)
     print("REFLECTION OUTPUT:", json.dumps(parsed, indent=2))
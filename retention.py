@@ -0,0 +1,209 @@
+"""Retention for long-lived episodic memory: hot window, rollups and archive.
+
+Raw episodes stay in memory for ``hot_days``. Older ones that reflection has
+already distilled are moved out of the hot list in one step:
+
+- their raw records are written to gzip-compressed, month-partitioned JSONL
+  batches under ``archive_dir``, which are only opened on demand;
+- their decision/outcome counts are folded into per-(month, context,
+  decision, outcome) rollups kept in the memory payload, which the miner and
+  the outcome stats still read;
+- ``pruned_episodes`` grows by the number moved, so absolute episode
+  positions (the reflection high-water mark) keep their meaning.
+
+Resident memory and load time are then bounded by the hot window plus one
+rollup per month and context instead of the whole history.
+"""
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+
+RETENTION_ENV = "RELEASE_AGENT_RETAIN_DAYS"
+ARCHIVE_DIR = Path("memory_archive")
+UNDATED = "undated"
+
+
+def episode_period(episode: dict):
+    """Return the ``YYYY-MM`` month of an episode, or None without a timestamp."""
+    return (episode.get("timestamp") or "")[:7] or None
+
+
+def _rollup_key(rollup: dict) -> tuple:
+    """Return the identity of a rollup entry."""
+    return (
+        rollup["period"],
+        json.dumps(rollup["context"], sort_keys=True),
+        rollup["decision"],
+        rollup["outcome"],
+    )
+
+
+def roll_up(episodes: list, rollups: list = ()) -> list:
+    """Return ``rollups`` with ``episodes`` folded into their counts, in key order."""
+    merged = {_rollup_key(rollup): dict(rollup) for rollup in rollups}
+    for episode in episodes:
+        rollup = {
+            "period": episode_period(episode),
+            "context": episode.get("context", {}),
+            "decision": episode.get("decision"),
+            "outcome": episode.get("outcome"),
+            "episodes": 0,
+        }
+        merged.setdefault(_rollup_key(rollup), rollup)["episodes"] += 1
+    return [merged[key] for key in sorted(merged, key=lambda key: tuple(map(str, key)))]
+
+
+def rollup_episodes(rollups: list) -> list:
+    """Return rollups as episode-shaped records weighted by ``count``."""
+    return [
+        {
+            "context": rollup["context"],
+            "decision": rollup["decision"],
+            "outcome": rollup["outcome"],
+            "period": rollup["period"],
+            "count": rollup["episodes"],
+        }
+        for rollup in rollups
+    ]
+
+
+class EpisodeArchive:
+    """Gzip-compressed JSONL batches of raw episodes, partitioned by month.
+
+    Each retention pass writes one file per month it touches, named after
+    the absolute position of the first episode it moves out
+    (``<root>/<YYYY-MM>/episodes-<start>.jsonl.gz``). Files are replaced
+    atomically, so a pass retried after a crash rewrites the same batches
+    instead of archiving its episodes twice.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        """Use ``root`` as the archive directory (created on first write)."""
+        self.root = Path(root)
+
+    def path(self, period, start: int) -> Path:
+        """Return the batch file for a ``YYYY-MM`` period (or undated) and start position."""
+        return self.root / (period or UNDATED) / f"episodes-{start:012d}.jsonl.gz"
+
+    def batches(self) -> list:
+        """Return ``(period, start, path)`` for every batch, oldest first."""
+        found = []
+        for path in self.root.glob("*/episodes-*.jsonl.gz"):
+            period = path.parent.name
+            start = int(path.name[len("episodes-") : -len(".jsonl.gz")])
+            found.append((None if period == UNDATED else period, start, path))
+        return sorted(found, key=lambda item: (item[0] or "", item[1]))
+
+    def write(self, episodes: list, start: int) -> None:
+        """Archive ``episodes``, the first at absolute position ``start``, and fsync them.
+
+        Batches at or after ``start`` were left by a pass that never
+        committed its prune; they are removed so this pass replaces them.
+        """
+        for _, batch_start, path in self.batches():
+            if batch_start >= start:
+                path.unlink()
+        partitions = {}
+        for episode in episodes:
+            partitions.setdefault(episode_period(episode), []).append(episode)
+        for period, group in partitions.items():
+            path = self.path(period, start)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            lines = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in group)
+            with open(tmp_path, "wb") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as handle:
+                    handle.write(lines.encode("utf-8"))
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_path, path)
+
+    def episodes(self, since: str = None, until: str = None):
+        """Yield archived episodes between two inclusive ISO dates.
+
+        Only the batches whose month overlaps the range are opened.
+        Undated episodes are yielded only when neither bound is given.
+        """
+        since, until = (since or "")[:10], (until or "")[:10]
+        for period, _, path in self.batches():
+            if period is None and (since or until):
+                continue
+            if period is not None and (
+                (since and period < since[:7]) or (until and period > until[:7])
+            ):
+                continue
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    episode = json.loads(line)
+                    day = (episode.get("timestamp") or "")[:10]
+                    if (since and day < since) or (until and day > until):
+                        continue
+                    yield episode
+
+
+@dataclass
+class RetentionPolicy:
+    """How long raw episodes stay hot before they are archived and rolled up."""
+
+    hot_days: int = 90
+    archive_dir: Path = ARCHIVE_DIR
+
+    def __post_init__(self):
+        """Reject a negative hot window."""
+        if self.hot_days < 0:
+            raise ValueError("hot_days must be >= 0")
+
+    @classmethod
+    def from_env(cls):
+        """Return the policy set by RELEASE_AGENT_RETAIN_DAYS, or None when unset."""
+        days = os.environ.get(RETENTION_ENV)
+        return cls(hot_days=int(days)) if days else None
+
+    def archive(self) -> EpisodeArchive:
+        """Return the archive pruned episodes are written to."""
+        return EpisodeArchive(self.archive_dir)
+
+    def cutoff(self, now: datetime = None) -> str:
+        """Return the first ISO day whose episodes stay hot."""
+        now = now or datetime.now(timezone.utc)
+        return (now.date() - timedelta(days=self.hot_days)).isoformat()
+
+
+def expired_prefix(memory: dict, cutoff: str) -> int:
+    """Return how many leading hot episodes are older than ``cutoff`` and reflected.
+
+    Episodes past the reflection high-water mark are never pruned, so
+    reflection always sees them raw.
+    """
+    reflected = memory["reflected_episodes"] - memory["pruned_episodes"]
+    count = 0
+    for episode in islice(memory["episodes"], max(0, reflected)):
+        day = (episode.get("timestamp") or "")[:10]
+        if day and day >= cutoff:
+            break
+        count += 1
+    return count
+
+
+def apply_retention(memory: dict, policy: RetentionPolicy, now: datetime = None) -> int:
+    """Archive and roll up expired episodes of a memory payload in place.
+
+    The archive is written before the payload changes and keyed by the
+    first expired episode's absolute position, so a run repeated after a
+    crash in between replaces the same batches instead of duplicating them.
+    Returns the number of episodes moved out.
+    """
+    count = expired_prefix(memory, policy.cutoff(now))
+    if not count:
+        return 0
+    expired = memory["episodes"][:count]
+    policy.archive().write(expired, start=memory["pruned_episodes"])
+    memory["rollups"] = roll_up(expired, memory["rollups"])
+    memory["episodes"] = memory["episodes"][count:]
+    memory["pruned_episodes"] += count
+    return count
+
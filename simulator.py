@@ -1,36 +1,64 @@
 """Simple release simulation state machine."""
-def simulate(state, action, scenario):
-    """Advance the release state based on an action and scenario data."""
-    state.history.append(f"ACTION: {action}")
+from vocabulary import DAYS, LEVELS, Action, Decision, Stage, coerce
+
+
+def _evaluate_risk(state, scenario) -> None:
+    """Load the risk and timing signals from the scenario."""
+    risk = LEVELS.get(scenario["feature_risk"], scenario["feature_risk"])
+    criticality = LEVELS.get(scenario["service_criticality"], scenario["service_criticality"])
+    day = DAYS.get(scenario["day_of_week"], scenario["day_of_week"])
+    if (
+        risk is not state.feature_risk
+        or criticality is not state.service_criticality
+        or day is not state.day_of_week
+    ):
+        state.feature_risk = risk
+        state.service_criticality = criticality
+        state.day_of_week = day
+        state.revision += 1
+    state.hour_of_day = scenario["hour_of_day"]
 
-    if action == "evaluate_risk":
-        state.feature_risk = scenario["feature_risk"]
-        state.service_criticality = scenario["service_criticality"]
-        state.day_of_week = scenario["day_of_week"]
-        state.hour_of_day = scenario["hour_of_day"]
-        state.stage = "RISK_EVAL"
 
-    elif action == "check_clash":
-        state.clash = scenario["clash_outcomes"][0]
-        state.conflicting_service = scenario["conflicting_services"][0]
-        state.stage = "SCHEDULING"
+def _check_clash(state, scenario) -> None:
+    """Load the first clash outcome from the scenario."""
+    state.clash = scenario["clash_outcomes"][0]
+    state.conflicting_service = scenario["conflicting_services"][0]
 
-    elif action == "reschedule":
-        state.clash = False
-        state.stage = "DECISION"
 
-    elif action == "approve_release" or action == "GO":
-        state.decision = "GO"
-        state.stage = "DONE"
+def _clear_clash(state, scenario) -> None:
+    """A rescheduled release no longer clashes."""
+    state.clash = False
 
-    elif action == "abort_release":
-        state.decision = "ABORT"
-        state.stage = "ABORTED"
 
-    elif action == "reflect":
-        state.stage = "REFLECT"
+# action -> (action, next stage, decision or None, side effect or None)
+TRANSITIONS = {
+    action: (action, *transition)
+    for action, transition in {
+        Action.EVALUATE_RISK: (Stage.RISK_EVAL, None, _evaluate_risk),
+        Action.CHECK_CLASH: (Stage.SCHEDULING, None, _check_clash),
+        Action.RESCHEDULE: (Stage.DECISION, None, _clear_clash),
+        Action.APPROVE_RELEASE: (Stage.DONE, Decision.GO, None),
+        Action.GO: (Stage.DONE, Decision.GO, None),
+        Action.ABORT_RELEASE: (Stage.ABORTED, Decision.ABORT, None),
+        Action.REFLECT: (Stage.REFLECT, None, None),
+        Action.FINISH: (Stage.DONE, None, None),
+        Action.HOLD: (Stage.DELAYED, Decision.DELAY, None),
+    }.items()
+}
 
-    elif action == "finish":
-        state.stage = "DONE"
 
+def simulate(state, action, scenario):
+    """Advance the release state based on an action and scenario data."""
+    transition = TRANSITIONS.get(action)
+    if transition is None:  # unknown actions are traced but change nothing
+        state.trace.append(coerce(Action, action))
+        return state
+
+    action, stage, decision, effect = transition
+    state.trace.append(action)
+    if effect is not None:
+        effect(state, scenario)
+    state.stage = stage
+    if decision is not None:
+        state.decision = decision
     return state
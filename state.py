@@ -2,23 +2,30 @@
 from dataclasses import dataclass, field
 from typing import List
 
+from vocabulary import Day, Decision, Level, Stage
 
-@dataclass
+
+@dataclass(slots=True)
 class ReleaseState:
-    """Mutable release state used by the simulator and agent."""
+    """Mutable release state used by the simulator and agent.
+
+    Fields hold interned ``vocabulary`` members and ``trace`` records the
+    simulator actions applied, in order, as shared ``Action`` references;
+    ``history`` renders it as text only when asked.
+    """
     release_id: str
     application: str
     env: str
 
-    stage: str = "START"
-    # START → RISK_EVAL → SCHEDULING → DECISION → REFLECT → DONE / ABORTED
+    stage: Stage = Stage.START
+    # START → RISK_EVAL → SCHEDULING → DECISION → REFLECT → DONE / ABORTED / DELAYED
 
     # Risk signals
-    feature_risk: str = "UNKNOWN"  # LOW / MEDIUM / HIGH
-    service_criticality: str = "UNKNOWN"  # LOW / MEDIUM / HIGH
+    feature_risk: Level = Level.UNKNOWN
+    service_criticality: Level = Level.UNKNOWN
 
     # Time context
-    day_of_week: str = "UNKNOWN"  # MON ... SUN
+    day_of_week: Day = Day.UNKNOWN
     hour_of_day: int = -1  # 0–23
 
     # Clash context
@@ -26,5 +33,12 @@ class ReleaseState:
     conflicting_service: str = ""
 
     # Outcome
-    decision: str = "UNDECIDED"  # GO / DELAY / ABORT
-    history: List[str] = field(default_factory=list)
+    decision: Decision = Decision.UNDECIDED
+    trace: List[str] = field(default_factory=list)
+    # Bumped by the simulator whenever a planner-context field changes value.
+    revision: int = 0
+
+    @property
+    def history(self) -> List[str]:
+        """Return the trace as ``ACTION: <action>`` lines."""
+        return [f"ACTION: {action}" for action in self.trace]
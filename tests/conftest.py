@@ -0,0 +1,15 @@
+"""Shared fixtures: every test runs in its own working directory."""
+import pytest
+
+from llm_resilience import reset_shared_breaker
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run in ``tmp_path`` so memory, archive, cache and job files stay out of the repo."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RELEASE_AGENT_LLM_CACHE", "off")
+    monkeypatch.delenv("RELEASE_AGENT_RETAIN_DAYS", raising=False)
+    reset_shared_breaker()
+    yield tmp_path
+    reset_shared_breaker()
@@ -0,0 +1,118 @@
+"""Singleflight coalescing and admission control in the bulk runner."""
+import threading
+
+import pytest
+
+from batch import BulkRunner, QueueFull, run_batch, scenario_key
+from scenarios import SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY
+
+
+class CountingRunner:
+    """Pipeline stand-in that counts executions and can be held open."""
+
+    def __init__(self, hold: bool = False):
+        """Return immediately, or wait for ``release`` when ``hold`` is set."""
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+        self.runs = []
+        self._lock = threading.Lock()
+
+    def __call__(self, scenario: dict) -> dict:
+        """Record the run and return a decision."""
+        self.release.wait(5)
+        with self._lock:
+            self.runs.append(scenario)
+        return {"decision": "GO", "id": scenario.get("id")}
+
+
+def test_scenario_key_ignores_the_id():
+    assert scenario_key(dict(SCENARIO_LOW_RISK_WEEKDAY, id="a")) == scenario_key(
+        dict(SCENARIO_LOW_RISK_WEEKDAY, id="b")
+    )
+    assert scenario_key(SCENARIO_LOW_RISK_WEEKDAY) != scenario_key(SCENARIO_HIGH_RISK_FRIDAY)
+
+
+def test_scenario_key_keeps_releases_apart():
+    first = dict(SCENARIO_LOW_RISK_WEEKDAY, release_id="REL-1", application="billing")
+
+    assert scenario_key(first) != scenario_key(dict(first, release_id="REL-2"))
+    assert scenario_key(first) != scenario_key(dict(first, application="payments"))
+
+
+def test_different_releases_with_the_same_inputs_each_run():
+    runner = CountingRunner()
+    bulk = BulkRunner(runner, max_workers=2)
+    scenarios = [dict(SCENARIO_LOW_RISK_WEEKDAY, release_id=f"REL-{i}") for i in range(3)]
+
+    records = bulk.run_many(scenarios, timeout=5)
+
+    assert len(runner.runs) == 3
+    assert not any(r["coalesced"] for r in records)
+
+
+def test_duplicates_in_one_request_run_once():
+    runner = CountingRunner()
+    bulk = BulkRunner(runner, max_workers=2)
+    scenarios = [dict(SCENARIO_LOW_RISK_WEEKDAY, id=i) for i in range(4)]
+    scenarios.append(dict(SCENARIO_HIGH_RISK_FRIDAY, id=4))
+
+    records = bulk.run_many(scenarios, timeout=5)
+
+    assert len(runner.runs) == 2
+    assert [r["coalesced"] for r in records] == [False, True, True, True, False]
+    assert [r["id"] for r in records] == [0, 1, 2, 3, 4]
+    assert all(r["decision"] == "GO" for r in records)
+    assert bulk.counters == {"executions": 2, "coalesced": 3, "rejected": 0}
+
+
+def test_in_flight_scenarios_are_shared_across_requests():
+    runner = CountingRunner(hold=True)
+    bulk = BulkRunner(runner, max_workers=2)
+
+    [(first, _)] = bulk.submit_many([SCENARIO_LOW_RISK_WEEKDAY])
+    [(second, coalesced)] = bulk.submit_many([dict(SCENARIO_LOW_RISK_WEEKDAY, id="again")])
+    runner.release.set()
+
+    assert coalesced is True
+    assert second is first
+    assert first.result(timeout=5)["decision"] == "GO"
+    assert len(runner.runs) == 1
+
+
+def test_finished_scenarios_run_again():
+    runner = CountingRunner()
+    bulk = BulkRunner(runner, max_workers=1)
+
+    bulk.run_many([SCENARIO_LOW_RISK_WEEKDAY], timeout=5)
+    bulk.run_many([SCENARIO_LOW_RISK_WEEKDAY], timeout=5)
+
+    assert len(runner.runs) == 2
+
+
+def test_requests_beyond_max_pending_are_rejected_whole():
+    runner = CountingRunner(hold=True)
+    bulk = BulkRunner(runner, max_workers=1, max_pending=1)
+    bulk.submit_many([SCENARIO_LOW_RISK_WEEKDAY])
+
+    with pytest.raises(QueueFull):
+        bulk.submit_many([SCENARIO_LOW_RISK_WEEKDAY, SCENARIO_HIGH_RISK_FRIDAY])
+    # joining the execution already in flight needs no new slot
+    [(_, coalesced)] = bulk.submit_many([SCENARIO_LOW_RISK_WEEKDAY])
+    runner.release.set()
+
+    assert coalesced is True
+    assert bulk.counters["rejected"] == 1
+
+
+def test_batch_summary_counts_degraded_runs(workdir):
+    def runner(scenario):
+        """Degrade high-risk runs with the planner's fallback DELAY."""
+        degraded = scenario["feature_risk"] == "HIGH"
+        return {"decision": "DELAY" if degraded else "GO", "degraded": degraded}
+
+    scenarios = [SCENARIO_LOW_RISK_WEEKDAY, SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_HIGH_RISK_FRIDAY]
+
+    summary = run_batch(scenarios, runner, workdir / "results.jsonl", max_in_flight=2)
+
+    assert (summary["scenarios"], summary["errors"], summary["degraded"]) == (3, 0, 2)
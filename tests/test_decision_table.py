@@ -0,0 +1,135 @@
+"""Compiling, serving and invalidating the precompiled decision table."""
+import json
+
+import pytest
+
+from decision_table import DecisionTable, changed_clauses, compile_table
+from heuristic_engine import FastPathPolicy
+from llm_client import LLMResponse
+from memory import EpisodicMemory
+from memory_store import JsonlStore
+from pipeline import local_plan
+
+HIGH_RISK_NO_GO = {
+    "when": {"feature_risk": "HIGH"},
+    "recommendation": "NO_GO",
+    "confidence": 0.95,
+    "supporting_episodes": 10,
+}
+
+
+class PlannerStub:
+    """Planner backend that delays Sunday releases and approves the rest."""
+
+    def __init__(self):
+        """Start with no calls made."""
+        self.calls = 0
+
+    def generate(self, model, contents, config=None):
+        """Return a planner decision for the context in the prompt."""
+        self.calls += 1
+        decision = "DELAY" if '"day_of_week": "SUN"' in contents else "GO"
+        return LLMResponse(text=json.dumps({"decision": decision, "reason": "stub"}))
+
+
+def context(risk="LOW", day="MON", criticality="LOW"):
+    """Return a planner context inside the default lattice."""
+    return {
+        "feature_risk": risk,
+        "day_of_week": day,
+        "service_criticality": criticality,
+        "clash_detected": [False],
+        "env": "prod",
+    }
+
+
+@pytest.fixture
+def memory(workdir):
+    """Memory holding one decisive high-risk heuristic."""
+    memory = EpisodicMemory(JsonlStore(workdir / "memory.json"))
+    memory.add_heuristic(dict(HIGH_RISK_NO_GO))
+    return memory
+
+
+@pytest.fixture
+def table(memory):
+    """A table compiled against ``memory`` with the stub planner."""
+    return compile_table(memory, PlannerStub(), FastPathPolicy())
+
+
+def test_compile_uses_heuristics_then_planner_and_skips_delay(table):
+    # 3 risks x 3 criticalities x 7 days x 2 clash states x 1 env
+    assert table.size == 126
+    assert table.lookup(context("HIGH")) == ("NO_GO", "heuristic")
+    assert table.lookup(context("LOW")) == ("GO", "planner")
+    assert table.lookup(context("LOW", "SUN")) is None
+    assert table.provenance["delay_cells"] == 12
+    assert table.provenance["compiled_cells"] == 114
+    assert table.provenance["failed_cells"] == 0
+
+
+def test_recompile_only_asks_for_empty_cells(memory, table):
+    planner = PlannerStub()
+    compile_table(memory, planner, FastPathPolicy(), table=table)
+
+    assert planner.calls == 12  # the Sunday cells the planner delayed
+
+
+def test_plan_skips_heuristic_cells_when_fast_path_is_off(memory, table):
+    assert table.plan(context("HIGH"), memory)["decision"] == "NO_GO"
+    assert table.plan(context("HIGH"), memory, heuristics=False) is None
+    assert table.plan(context("LOW"), memory, heuristics=False)["compiled_from"] == "planner"
+
+
+def test_local_plan_respects_a_disabled_fast_path(memory, table):
+    table.save()
+    high = context("HIGH")
+    applicable = memory.heuristic_index().applicable(high)
+
+    assert local_plan(memory, high, applicable, FastPathPolicy(), {})["source"] == "table"
+    assert local_plan(memory, high, applicable, FastPathPolicy(enabled=False), {}) is None
+
+
+def test_older_delay_cells_are_misses():
+    table = DecisionTable()
+    index = table.position(context())
+    table.cells[index] = "D"
+
+    assert table.lookup(context()) is None
+
+
+def test_heuristic_change_invalidates_only_matching_cells(memory, table):
+    filled = table.filled()
+    memory.merge_heuristic(dict(HIGH_RISK_NO_GO, confidence=0.9))
+
+    assert table.sync(memory) == 42  # every HIGH-risk cell
+    assert table.filled() == filled - 42
+    assert table.lookup(context("HIGH")) is None
+    assert table.lookup(context("LOW")) == ("GO", "planner")
+    assert table.sync(memory) == 0
+
+
+def test_new_narrow_heuristic_invalidates_its_cells(memory, table):
+    memory.add_heuristic(
+        {
+            "when": {"day_of_week": "FRI", "service_criticality": "HIGH"},
+            "recommendation": "NO_GO",
+            "confidence": 0.9,
+            "supporting_episodes": 6,
+        }
+    )
+
+    # FRI x HIGH criticality, for 3 risks x 2 clash states
+    assert table.sync(memory) == 6
+    assert table.lookup(context("LOW", "FRI", "HIGH")) is None
+    assert table.lookup(context("LOW", "FRI", "LOW")) == ("GO", "planner")
+
+
+def test_changed_clauses_reports_added_updated_and_removed():
+    low = dict(HIGH_RISK_NO_GO, when={"feature_risk": "LOW"})
+    updated = dict(HIGH_RISK_NO_GO, confidence=0.9)
+
+    clauses = changed_clauses([HIGH_RISK_NO_GO, low], [updated])
+
+    assert sorted(clauses, key=json.dumps) == [{"feature_risk": "HIGH"}, {"feature_risk": "LOW"}]
+    assert changed_clauses([low], [low]) == []
@@ -0,0 +1,66 @@
+"""Merging learned heuristics, in isolation and through episodic memory."""
+from heuristic_engine import merge_heuristic
+from memory import EpisodicMemory
+from memory_store import JsonlStore
+
+
+def heuristic(recommendation="NO_GO", confidence=0.9, support=4, **when):
+    """Return a heuristic over ``when`` (default: high-risk releases)."""
+    return {
+        "when": when or {"feature_risk": "HIGH"},
+        "recommendation": recommendation,
+        "confidence": confidence,
+        "supporting_episodes": support,
+    }
+
+
+def test_agreeing_evidence_adds_support():
+    merged = merge_heuristic(heuristic(confidence=0.8, support=4), heuristic(confidence=1.0))
+
+    assert merged["recommendation"] == "NO_GO"
+    assert merged["supporting_episodes"] == 8
+    assert merged["confidence"] == 0.9
+
+
+def test_contrary_evidence_lowers_confidence():
+    merged = merge_heuristic(heuristic(support=6), heuristic("GO", confidence=1.0, support=2))
+
+    assert merged["recommendation"] == "NO_GO"
+    assert merged["confidence"] == round(0.9 * 6 / 8, 2)
+
+
+def test_overwhelming_contrary_evidence_flips_the_recommendation():
+    merged = merge_heuristic(heuristic(support=2), heuristic("GO", confidence=1.0, support=8))
+
+    assert merged["recommendation"] == "GO"
+    assert merged["confidence"] == round(1 - 0.9 * 2 / 10, 2)
+
+
+def test_low_support_caps_confidence():
+    merged = merge_heuristic(heuristic(support=1), heuristic(confidence=1.0, support=1))
+
+    assert merged["confidence"] == 0.6
+
+
+def test_memory_merges_on_the_same_when_clause(workdir):
+    memory = EpisodicMemory(JsonlStore(workdir / "memory.json"))
+
+    assert memory.merge_heuristic(heuristic()) is False
+    assert memory.merge_heuristic(heuristic(feature_risk="LOW")) is False
+    assert memory.merge_heuristic(heuristic(confidence=1.0)) is True
+
+    heuristics = memory.heuristics()
+    assert len(heuristics) == 2
+    assert heuristics[0]["supporting_episodes"] == 8
+    # the merged version is what other processes load
+    reloaded = EpisodicMemory(JsonlStore(workdir / "memory.json")).heuristics()
+    assert reloaded == heuristics
+
+
+def test_set_heuristic_replaces_instead_of_merging(workdir):
+    memory = EpisodicMemory(JsonlStore(workdir / "memory.json"))
+    memory.merge_heuristic(heuristic())
+
+    assert memory.set_heuristic(heuristic(confidence=0.95, support=20)) is True
+
+    assert memory.heuristics() == [heuristic(confidence=0.95, support=20)]
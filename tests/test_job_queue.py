@@ -0,0 +1,116 @@
+"""Priorities, deduplication, leases and retries of the persistent job queue."""
+import threading
+
+import pytest
+
+from job_queue import MAX_ATTEMPTS, JobQueue, JobWorkers, job_priority
+from scenarios import SCENARIO_HIGH_RISK_FRIDAY, SCENARIO_LOW_RISK_WEEKDAY
+
+
+@pytest.fixture
+def queue(workdir):
+    """An empty queue in the working directory."""
+    return JobQueue(workdir / "jobs.db")
+
+
+def scenario(release_id, env="prod", criticality="HIGH"):
+    """Return a scenario for ``release_id`` in ``env``."""
+    return dict(
+        SCENARIO_LOW_RISK_WEEKDAY, release_id=release_id, env=env, service_criticality=criticality
+    )
+
+
+def test_priority_orders_env_then_criticality():
+    assert job_priority(scenario("a", "prod", "HIGH")) < job_priority(scenario("a", "prod", "LOW"))
+    assert job_priority(scenario("a", "prod", "LOW")) < job_priority(scenario("a", "staging"))
+    assert job_priority(scenario("a", "staging")) < job_priority(scenario("a", "dev"))
+
+
+def test_most_urgent_job_is_claimed_first(queue):
+    dev, _ = queue.submit(scenario("dev-1", "dev"))
+    prod_low, _ = queue.submit(scenario("prod-low", "prod", "LOW"))
+    prod_high, _ = queue.submit(scenario("prod-high", "prod", "HIGH"))
+
+    assert queue.get(dev["id"])["queue_position"] == 2
+    claimed = [queue.claim("w")["id"] for _ in range(3)]
+
+    assert claimed == [prod_high["id"], prod_low["id"], dev["id"]]
+    assert queue.claim("w") is None
+
+
+def test_active_duplicates_are_not_queued_again(queue):
+    first, reused = queue.submit(scenario("rel-1"))
+    again, reused_again = queue.submit(scenario("rel-1", env="staging"))
+
+    assert (reused, reused_again) == (False, True)
+    assert again["id"] == first["id"]
+
+    job = queue.claim("w")
+    queue.complete(job, {"decision": "GO"})
+    rerun, reused = queue.submit(scenario("rel-1"))
+    assert reused is False and rerun["id"] != first["id"]
+
+
+def test_failed_jobs_are_retried_then_failed(queue):
+    job, _ = queue.submit(scenario("rel-1"))
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        claimed = queue.claim("w")
+        assert claimed["attempts"] == attempt
+        queue.fail(claimed, "RuntimeError: boom")
+
+    final = queue.get(job["id"])
+    assert final["status"] == "failed"
+    assert final["error"] == "RuntimeError: boom"
+    assert queue.claim("w") is None
+
+
+def test_lapsed_leases_are_requeued_and_stale_results_dropped(queue):
+    job, _ = queue.submit(scenario("rel-1"))
+    lost = queue.claim("dead-worker")
+
+    assert queue.recover(lease_seconds=60) == 0  # lease still fresh
+    assert queue.recover(lease_seconds=-1) == 1
+    assert queue.get(job["id"])["status"] == "queued"
+
+    retry = queue.claim("live-worker")
+    queue.complete(lost, {"decision": "NO_GO"})  # the old worker no longer owns it
+    assert queue.get(job["id"])["status"] == "running"
+    queue.complete(retry, {"decision": "GO"})
+
+    done = queue.get(job["id"])
+    assert (done["status"], done["attempts"], done["result"]) == ("done", 2, {"decision": "GO"})
+
+
+def test_heartbeat_renews_the_lease(queue):
+    queue.submit(scenario("rel-1"))
+    queue.claim("w")
+    queue._connect().execute("UPDATE jobs SET heartbeat_at = 0")
+
+    queue.heartbeat("w")
+
+    assert queue.recover(lease_seconds=60) == 0
+
+
+def test_workers_drain_the_queue(queue):
+    finished = threading.Event()
+    results = []
+
+    def runner(item):
+        """Record the job and stop waiting after the second."""
+        results.append(item["release_id"])
+        if len(results) == 2:
+            finished.set()
+        return {"decision": "GO"}
+
+    workers = JobWorkers(queue, runner, workers=1)
+    queue.submit(dict(SCENARIO_HIGH_RISK_FRIDAY, release_id="staging-1", env="staging"))
+    queue.submit(scenario("prod-1"))
+    workers.start()
+    try:
+        assert finished.wait(5)
+    finally:
+        workers.stop(timeout=5)
+
+    assert results == ["prod-1", "staging-1"]
+    assert queue.counts() == {"done": 2}
@@ -0,0 +1,184 @@
+"""Retries, the circuit breaker and the bounded call pool around LLM calls."""
+import threading
+import time
+
+import pytest
+
+import llm_resilience
+from batch import RateLimitedClient, RateLimiter
+from llm_client import LLMResponse, TransientLLMError
+from llm_resilience import (
+    CallPool,
+    CallPoolSaturated,
+    CircuitBreaker,
+    CircuitOpen,
+    LLMUnavailable,
+    RetryPolicy,
+    resilient_generate,
+)
+
+FAST = RetryPolicy(timeout=1.0, retries=2, base_delay=0.0)
+
+
+class ScriptedClient:
+    """Backend that raises or answers from a script, one entry per call."""
+
+    def __init__(self, *script):
+        """Play ``script``: exceptions are raised, strings are returned as text."""
+        self.script = list(script)
+        self.calls = 0
+
+    def generate(self, model, contents, config=None):
+        """Return or raise the next scripted outcome."""
+        self.calls += 1
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return LLMResponse(text=outcome)
+
+
+def generate(client, breaker=None, policy=FAST, accept=None):
+    """Call ``resilient_generate`` with test defaults."""
+    return resilient_generate(
+        client,
+        "test",
+        "model",
+        "prompt",
+        accept=accept,
+        policy=policy,
+        breaker=breaker or CircuitBreaker(),
+    )
+
+
+def test_transient_errors_are_retried():
+    client = ScriptedClient(TransientLLMError("429"), TransientLLMError("503"), "ok")
+
+    assert generate(client).text == "ok"
+    assert client.calls == 3
+
+
+def test_invalid_responses_are_retried_then_given_up():
+    client = ScriptedClient("nope", "nope", "nope")
+
+    with pytest.raises(LLMUnavailable, match="gave up after 3 attempts"):
+        generate(client, accept=lambda text: text == "ok")
+    assert client.calls == 3
+
+
+def test_other_errors_are_not_retried():
+    client = ScriptedClient(ValueError("bad request"), "ok")
+
+    with pytest.raises(LLMUnavailable, match="bad request"):
+        generate(client)
+    assert client.calls == 1
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    client = ScriptedClient(*[TransientLLMError("down")] * 3, "ok")
+
+    with pytest.raises(LLMUnavailable):
+        generate(client, breaker)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        generate(client, breaker)
+    assert client.calls == 3
+
+
+def test_half_open_probe_closes_the_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.state == "half_open"
+    assert generate(ScriptedClient("ok"), breaker).text == "ok"
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    with pytest.raises(CircuitOpen):  # the probe fails, the retry finds it open
+        generate(ScriptedClient(TransientLLMError("down"), "ok"), breaker)
+    assert breaker.state == "open"
+
+
+def test_rate_limiter_waits_do_not_count_against_the_deadline():
+    client = RateLimitedClient(ScriptedClient("ok", "ok", "ok"), RateLimiter(rate=10, burst=1))
+    breaker = CircuitBreaker(threshold=1)
+    policy = RetryPolicy(timeout=0.05, retries=0)
+
+    started = time.monotonic()
+    texts = [generate(client, breaker, policy).text for _ in range(3)]
+
+    assert texts == ["ok"] * 3
+    assert time.monotonic() - started >= 0.15  # two waits of 0.1 s for a token
+    assert breaker.state == "closed"
+
+
+def test_healthy_calls_beyond_the_pool_size_wait_for_a_worker(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "_pool", CallPool(2))
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    class SlowClient:
+        """Backend that answers after a short delay and tracks concurrency."""
+
+        def generate(self, model, contents, config=None):
+            """Answer after 50 ms."""
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return LLMResponse(text="ok")
+
+    breaker = CircuitBreaker(threshold=1)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(generate(SlowClient(), breaker).text))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["ok"] * 8
+    assert max(peak) == 2
+    assert breaker.state == "closed"
+
+
+def test_hung_calls_saturate_the_pool_instead_of_queueing(monkeypatch):
+    pool = CallPool(2)
+    monkeypatch.setattr(llm_resilience, "_pool", pool)
+    release = threading.Event()
+
+    class HungClient:
+        """Backend that does not answer until released."""
+
+        def generate(self, model, contents, config=None):
+            """Block until the test releases the call."""
+            release.wait(5)
+            return LLMResponse(text="late")
+
+    policy = RetryPolicy(timeout=0.05, retries=0)
+    breaker = CircuitBreaker(threshold=100)
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable, match="timeout"):
+            generate(HungClient(), breaker, policy)
+
+    started = time.monotonic()
+    with pytest.raises(CallPoolSaturated):
+        generate(HungClient(), breaker, policy)
+    assert time.monotonic() - started < 0.05
+
+    release.set()  # the hung calls return and give their workers back
+    deadline = time.monotonic() + 5
+    while pool.abandoned and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert generate(ScriptedClient("ok"), breaker, policy).text == "ok"
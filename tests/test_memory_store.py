@@ -0,0 +1,215 @@
+"""Migration, replay, import and reflection claims of the memory storage engines."""
+import json
+import threading
+
+import pytest
+
+from memory import EpisodicMemory
+from memory_store import SNAPSHOT_FORMAT, JsonlStore, SqliteStore
+from pipeline import claim_episodes, reflect
+
+
+def episode(decision="GO", outcome="SUCCESS", day="2025-01-06"):
+    """Return a minimal episode record."""
+    return {
+        "context": {"feature_risk": "LOW", "service_criticality": "LOW", "day_of_week": "MON"},
+        "decision": decision,
+        "outcome": outcome,
+        "timestamp": f"{day}T10:00:00+00:00",
+    }
+
+
+def write_legacy(path, episodes, **extra):
+    """Write a pre-log dict-shaped memory.json."""
+    path.write_text(json.dumps({"episodes": episodes, "heuristics": [], **extra}))
+
+
+def test_legacy_list_memory_is_migrated(workdir):
+    path = workdir / "memory.json"
+    path.write_text(json.dumps([episode(), episode("NO_GO", "ABORTED")]))
+
+    memory, _ = JsonlStore(path).snapshot()
+
+    assert [e["decision"] for e in memory["episodes"]] == ["GO", "NO_GO"]
+    assert json.loads(path.read_text())["format"] == SNAPSHOT_FORMAT
+
+
+def test_legacy_episodes_count_as_reflected(workdir):
+    path = workdir / "memory.json"
+    write_legacy(path, [episode(), episode(), episode()])
+
+    memory, _ = JsonlStore(path).snapshot()
+
+    assert memory["reflected_episodes"] == 3
+
+
+def test_legacy_reflection_mark_is_kept(workdir):
+    path = workdir / "memory.json"
+    write_legacy(path, [episode(), episode(), episode()], reflected_episodes=1)
+
+    memory, _ = JsonlStore(path).snapshot()
+
+    assert memory["reflected_episodes"] == 1
+
+
+def test_jsonl_readers_replay_each_others_writes(workdir):
+    path = workdir / "memory.json"
+    writer, reader = EpisodicMemory(JsonlStore(path)), EpisodicMemory(JsonlStore(path))
+
+    writer.write({"feature_risk": "HIGH"}, "NO_GO", "ABORTED")
+    writer.add_heuristic({"when": {"feature_risk": "HIGH"}, "recommendation": "NO_GO"})
+    writer.mark_reflected(1)
+
+    assert [e["decision"] for e in reader.episodes()] == ["NO_GO"]
+    assert reader.heuristics()[0]["recommendation"] == "NO_GO"
+    assert reader.reflected_episodes() == 1
+
+
+def test_jsonl_reader_reloads_after_compaction(workdir):
+    path = workdir / "memory.json"
+    store = JsonlStore(path, compact_bytes=1)  # compact on every append
+    writer, reader = EpisodicMemory(store), EpisodicMemory(JsonlStore(path))
+    reader.episodes()
+
+    for _ in range(3):
+        writer.write({"feature_risk": "LOW"}, "GO", "SUCCESS")
+
+    assert len(reader.episodes()) == 3
+    assert json.loads(path.read_text())["generation"] == 3
+
+
+def test_sqlite_import_leaves_legacy_json_untouched(workdir):
+    path = workdir / "memory.json"
+    write_legacy(path, [episode(), episode()])
+    before = path.read_text()
+
+    memory, _ = SqliteStore(workdir / "memory.db", import_from=path).snapshot()
+
+    assert path.read_text() == before
+    assert len(memory["episodes"]) == 2
+    assert memory["reflected_episodes"] == 2
+
+
+def test_sqlite_import_carries_retention_state(workdir):
+    path = workdir / "memory.json"
+    rollup = {
+        "period": "2024-01",
+        "context": episode()["context"],
+        "decision": "GO",
+        "outcome": "SUCCESS",
+        "episodes": 40,
+    }
+    path.write_text(
+        json.dumps(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "generation": 4,
+                "episodes": [episode()],
+                "heuristics": [],
+                "reflected_episodes": 41,
+                "pruned_episodes": 40,
+                "rollups": [rollup],
+            }
+        )
+    )
+
+    memory, _ = SqliteStore(workdir / "memory.db", import_from=path).snapshot()
+
+    assert memory["pruned_episodes"] == 40
+    assert memory["reflected_episodes"] == 41
+    assert memory["rollups"] == [rollup]
+
+
+def test_sqlite_readers_replay_each_others_writes(workdir):
+    db = workdir / "memory.db"
+    writer, reader = EpisodicMemory(SqliteStore(db)), EpisodicMemory(SqliteStore(db))
+    reader.episodes()
+
+    writer.write({"feature_risk": "LOW"}, "GO", "SUCCESS")
+    writer.mark_reflected(1)
+
+    assert len(reader.episodes()) == 1
+    assert reader.reflected_episodes() == 1
+
+
+def open_memory(workdir, backend):
+    """Return a new memory over the shared ``backend`` file in ``workdir``."""
+    if backend == "jsonl":
+        return EpisodicMemory(JsonlStore(workdir / "memory.json"))
+    return EpisodicMemory(SqliteStore(workdir / "memory.db"))
+
+
+def fill(memory, count):
+    """Write ``count`` successful low-risk episodes."""
+    for _ in range(count):
+        memory.write({"feature_risk": "LOW"}, "GO", "SUCCESS")
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_concurrent_claims_hand_out_each_episode_once(workdir, backend):
+    fill(open_memory(workdir, backend), 5)
+    memories = [open_memory(workdir, backend) for _ in range(8)]
+    barrier = threading.Barrier(len(memories))
+    claims = []
+
+    def claim(memory):
+        """Claim once all threads are ready."""
+        barrier.wait()
+        claims.append(claim_episodes(memory))
+
+    threads = [threading.Thread(target=claim, args=(memory,)) for memory in memories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    won = [(claim, episodes) for claim, episodes in claims if claim is not None]
+    assert len(claims) == 8
+    assert len(won) == 1
+    assert (won[0][0]["start"], won[0][0]["end"], len(won[0][1])) == (0, 5, 5)
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_mark_advances_only_when_the_claim_is_finished(workdir, backend):
+    memory, other = open_memory(workdir, backend), open_memory(workdir, backend)
+    fill(memory, 5)
+    claim, _ = claim_episodes(memory)
+
+    assert memory.reflected_episodes() == 0
+    fill(memory, 5)
+    assert claim_episodes(other) == (None, [])  # one reflection at a time
+
+    memory.finish_reflection(claim)
+
+    assert other.reflected_episodes() == 5
+    claim, episodes = claim_episodes(other)
+    assert (claim["start"], claim["end"], len(episodes)) == (5, 10, 5)
+
+
+def test_stale_claims_are_taken_over(workdir):
+    memory = open_memory(workdir, "jsonl")
+    fill(memory, 5)
+    abandoned = memory.claim_reflection()
+
+    claim = memory.claim_reflection(lease=0)
+
+    assert claim["id"] != abandoned["id"]
+    assert (claim["start"], claim["end"]) == (0, 5)
+
+
+def test_failed_reflection_leaves_its_episodes_unreflected(workdir):
+    class DownClient:
+        """Backend that rejects every call."""
+
+        def generate(self, model, contents, config=None):
+            """Fail without a retry."""
+            raise ValueError("backend down")
+
+    memory = open_memory(workdir, "jsonl")
+    fill(memory, 5)
+
+    assert reflect(DownClient(), memory) == {"added": 0, "merged": 0}
+
+    assert memory.reflected_episodes() == 0
+    claim, episodes = claim_episodes(memory)
+    assert (claim["start"], claim["end"], len(episodes)) == (0, 5, 5)
@@ -0,0 +1,105 @@
+"""The ``/api/stats`` query parser and the outcome counters it queries."""
+import pytest
+
+from outcome_stats import OutcomeStats, parse_query
+
+
+def episode(risk, day_of_week, decision, outcome, timestamp):
+    """Return an episode record with the stats fields."""
+    return {
+        "context": {
+            "feature_risk": risk,
+            "service_criticality": "HIGH",
+            "day_of_week": day_of_week,
+        },
+        "decision": decision,
+        "outcome": outcome,
+        "timestamp": timestamp,
+    }
+
+
+EPISODES = [
+    episode("HIGH", "FRI", "NO_GO", "ABORTED", "2025-03-07T10:00:00+00:00"),
+    episode("HIGH", "FRI", "GO", "SUCCESS", "2025-03-14T10:00:00+00:00"),
+    episode("LOW", "MON", "GO", "SUCCESS", "2025-03-10T10:00:00+00:00"),
+    episode("LOW", "MON", "GO", "SUCCESS", "2025-04-07T10:00:00+00:00"),
+]
+
+
+def test_parse_query_splits_repeated_and_comma_separated_values():
+    query = parse_query(
+        {
+            "feature_risk": ["HIGH"],
+            "day_of_week": ["FRI,SAT", "SUN"],
+            "group_by": ["decision,outcome"],
+            "bucket": ["week"],
+            "since": ["2025-03-01"],
+        }
+    )
+
+    assert query == {
+        "filters": {"feature_risk": ["HIGH"], "day_of_week": ["FRI", "SAT", "SUN"]},
+        "since": "2025-03-01",
+        "until": None,
+        "group_by": ("decision", "outcome"),
+        "bucket": "week",
+    }
+
+
+def test_parse_query_without_parameters_matches_everything():
+    assert parse_query({}) == {
+        "filters": {},
+        "since": None,
+        "until": None,
+        "group_by": (),
+        "bucket": None,
+    }
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [
+        ({"risk": ["HIGH"]}, "unknown stats parameters: risk"),
+        ({"group_by": ["timestamp"]}, "cannot group by 'timestamp'"),
+        ({"bucket": ["year"]}, "bucket must be one of"),
+        ({"since": ["last week"]}, "since must be an ISO date"),
+        ({"until": ["2025-13-01"]}, "until must be an ISO date"),
+    ],
+)
+def test_parse_query_rejects_bad_parameters(params, message):
+    with pytest.raises(ValueError, match=message):
+        parse_query(params)
+
+
+def test_query_filters_by_context_and_date():
+    stats = OutcomeStats.from_episodes(EPISODES)
+
+    report = stats.query(**parse_query({"feature_risk": ["HIGH"], "until": ["2025-03-10"]}))
+
+    assert report["episodes"] == 1
+    assert report["decisions"] == {"NO_GO": 1}
+    assert report["outcome_rates"] == {"ABORTED": 1.0}
+
+
+def test_query_groups_and_buckets():
+    stats = OutcomeStats.from_episodes(EPISODES)
+
+    report = stats.query(group_by=("feature_risk",), bucket="month")
+
+    assert [(g["feature_risk"], g["episodes"]) for g in report["groups"]] == [
+        ("HIGH", 2),
+        ("LOW", 2),
+    ]
+    assert [(s["bucket"], s["episodes"]) for s in report["series"]] == [
+        ("2025-03", 3),
+        ("2025-04", 1),
+    ]
+
+
+def test_incremental_counts_match_a_rebuild():
+    incremental = OutcomeStats()
+    for item in EPISODES:
+        incremental.add(item)
+
+    assert incremental.counts() == OutcomeStats.from_episodes(EPISODES).counts()
+    assert len(incremental) == len(EPISODES)
@@ -0,0 +1,27 @@
+"""Validation of planner responses before they are cached or used."""
+import json
+
+import pytest
+
+from planner import _parses
+
+
+@pytest.mark.parametrize("decision", ["GO", "NO_GO", "DELAY"])
+def test_known_decisions_parse(decision):
+    assert _parses(json.dumps({"decision": decision, "reason": "ok"}))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "not json",
+        "null",
+        '["decision"]',
+        '"decision"',
+        json.dumps({"reason": "no decision"}),
+        json.dumps({"decision": "MAYBE"}),
+        json.dumps({"decision": None}),
+    ],
+)
+def test_malformed_or_unknown_responses_are_rejected(text):
+    assert not _parses(text)
@@ -0,0 +1,119 @@
+"""Hot-window retention, rollups and the episode archive."""
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from memory import EpisodicMemory
+from memory_store import JsonlStore, SqliteStore
+from retention import EpisodeArchive, RetentionPolicy, apply_retention, expired_prefix
+
+NOW = datetime(2025, 6, 30, 12, tzinfo=timezone.utc)
+
+
+def history(days: int, end: datetime = NOW) -> list:
+    """Return one episode a day for ``days`` days ending at ``end``, oldest first."""
+    return [
+        {
+            "context": {
+                "feature_risk": ("LOW", "HIGH")[i % 2],
+                "service_criticality": "LOW",
+                "day_of_week": "MON",
+            },
+            "decision": ("GO", "NO_GO")[i % 2],
+            "outcome": ("SUCCESS", "ABORTED")[i % 2],
+            "timestamp": (end - timedelta(days=days - 1 - i)).isoformat(),
+        }
+        for i in range(days)
+    ]
+
+
+def payload(episodes: list, reflected: int = None) -> dict:
+    """Return a memory payload holding ``episodes``."""
+    return {
+        "episodes": list(episodes),
+        "heuristics": [],
+        "reflected_episodes": len(episodes) if reflected is None else reflected,
+        "pruned_episodes": 0,
+        "rollups": [],
+    }
+
+
+@pytest.fixture
+def policy(workdir):
+    """A 30-day hot window archiving under the working directory."""
+    return RetentionPolicy(hot_days=30, archive_dir=workdir / "archive")
+
+
+def test_only_reflected_expired_episodes_are_pruned():
+    memory = payload(history(100), reflected=50)
+
+    assert expired_prefix(memory, "2025-05-31") == 50
+    memory["reflected_episodes"] = 100
+    assert expired_prefix(memory, "2025-05-31") == 69
+
+
+def test_archive_round_trip_and_rollups(policy):
+    episodes = history(100)
+    memory = payload(episodes)
+
+    pruned = apply_retention(memory, policy, NOW)
+
+    # the hot window is today plus the 30 days before it
+    assert pruned == 69
+    assert memory["episodes"] == episodes[69:]
+    assert memory["pruned_episodes"] == 69
+    assert sum(rollup["episodes"] for rollup in memory["rollups"]) == 69
+    archive = policy.archive()
+    assert list(archive.episodes()) == episodes[:69]
+    assert list(archive.episodes("2025-04-01", "2025-04-30")) == [
+        e for e in episodes[:69] if e["timestamp"].startswith("2025-04")
+    ]
+    assert {period for period, _, _ in archive.batches()} == {"2025-03", "2025-04", "2025-05"}
+
+
+def test_repeating_a_crashed_pass_does_not_duplicate_the_archive(policy):
+    episodes = history(100)
+    memory = payload(episodes)
+    wider = RetentionPolicy(hot_days=10, archive_dir=policy.archive_dir)
+    # two passes whose archive writes landed but whose prunes were lost
+    apply_retention(copy.deepcopy(memory), policy, NOW)
+    apply_retention(copy.deepcopy(memory), wider, NOW)
+
+    apply_retention(memory, policy, NOW)
+    assert list(policy.archive().episodes()) == episodes[:69]
+
+    apply_retention(memory, wider, NOW)
+    assert list(policy.archive().episodes()) == episodes[:89]
+
+
+def test_undated_episodes_only_read_without_bounds(workdir):
+    archive = EpisodeArchive(workdir / "archive")
+    archive.write([{"decision": "GO"}], start=0)
+
+    assert list(archive.episodes()) == [{"decision": "GO"}]
+    assert list(archive.episodes(since="2025-01-01")) == []
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_retention_keeps_stats_and_reflection_positions(workdir, policy, backend):
+    episodes = history(100, end=datetime.now(timezone.utc))
+    (workdir / "memory.json").write_text(json.dumps(payload(episodes)))
+    if backend == "jsonl":
+        store = JsonlStore(workdir / "memory.json")
+    else:
+        store = SqliteStore(workdir / "memory.db", import_from=workdir / "memory.json")
+    memory = EpisodicMemory(store)
+    before = memory.outcome_stats().query(group_by=("decision",))
+
+    assert memory.retain(policy) == 69
+
+    reader = EpisodicMemory(store)
+    assert len(reader.episodes()) == 31
+    assert reader.episode_count() == 100
+    assert reader.episodes_since(90) == (episodes[90:], 100)
+    after = reader.outcome_stats().query(group_by=("decision",))
+    assert after["groups"] == before["groups"]
+    assert len(reader.history()) == len(reader.rollups()) + 31
+    assert list(policy.archive().episodes()) == episodes[:69]
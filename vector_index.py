@@ -0,0 +1,255 @@
+"""Local vector index over decision summaries for similar-release recall.
+
+Vectors live in a memory-mapped float32 file and metadata in a JSONL file
+next to it. NumPy is an optional dependency: it is imported on first use and
+``get_decision_index()`` returns None when it is not installed.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+INDEX_DIR = Path("decision_index")
+INDEX_ENV = "RELEASE_AGENT_DECISION_INDEX"
+EMBEDDING_DIM = 128
+SEARCH_BLOCK_ROWS = 65536
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def _numpy():
+    """Import NumPy on first use."""
+    import numpy
+
+    return numpy
+
+
+@lru_cache(maxsize=1 << 16)
+def _bucket(feature: str, dim: int) -> tuple:
+    """Return the stable (column, sign) a hashed feature contributes to."""
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """Signed feature-hashing embedding of word n-grams, L2-normalised.
+
+    N-grams never cross a line break, so each ``- Key: value`` line of a
+    decision summary yields features that keep its key and value together.
+    Any object with ``name``, ``dim`` and ``embed(texts) -> (n, dim) array``
+    can be passed to ``VectorStore`` instead.
+    """
+
+    name = "hashing-ngram-v1"
+
+    def __init__(self, dim: int = EMBEDDING_DIM, ngram: int = 2):
+        """Hash word ``ngram``-grams into ``dim`` buckets."""
+        self.dim = dim
+        self.ngram = ngram
+
+    def features(self, text: str) -> list:
+        """Return the per-line word n-grams of ``text``."""
+        grams = []
+        for line in text.lower().splitlines():
+            tokens = TOKEN_RE.findall(line)
+            if 0 < len(tokens) < self.ngram:
+                grams.append(" ".join(tokens))
+            n = self.ngram
+            grams += [" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)]
+        return grams
+
+    def embed(self, texts: list):
+        """Return a float32 matrix with one unit vector per text."""
+        np = _numpy()
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                column, sign = _bucket(feature, self.dim)
+                rows.append(row)
+                columns.append(column)
+                signs.append(sign)
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (rows, columns), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class VectorStore:
+    """Append-only, memory-mapped vector store with cosine top-k search.
+
+    ``vectors.f32`` holds one float32 row per entry and ``records.jsonl`` the
+    matching metadata line. Both are appended under ``index.lock`` so rows
+    stay aligned across processes; readers remap the vectors and read new
+    records whenever the files have grown.
+    """
+
+    def __init__(self, directory=INDEX_DIR, embedder=None):
+        """Open (or create) the index in ``directory``."""
+        np = _numpy()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self._vectors_path = self.directory / "vectors.f32"
+        self._records_path = self.directory / "records.jsonl"
+        self._lock_path = self.directory / "index.lock"
+        self._info_path = self.directory / "index.json"
+        self._row_bytes = self.dim * np.dtype(np.float32).itemsize
+
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._records = []
+        self._records_offset = 0
+        self._check_info()
+        self.refresh()
+
+    def __len__(self) -> int:
+        """Return the number of indexed entries."""
+        self.refresh()
+        return len(self._records)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the cross-process writer lock."""
+        with self._lock, open(self._lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _check_info(self) -> None:
+        """Record the embedder on first use and refuse to mix embedders later."""
+        info = {"embedder": self.embedder.name, "dim": self.dim}
+        with self._locked():
+            if not self._info_path.exists():
+                self._info_path.write_text(json.dumps(info) + "\n", encoding="utf-8")
+                return
+        stored = json.loads(self._info_path.read_text(encoding="utf-8"))
+        if stored != info:
+            raise ValueError(f"{self.directory} was built with {stored}, not {info}")
+
+    # ---------- READ ----------
+
+    def refresh(self) -> None:
+        """Pick up rows appended by this or other processes."""
+        np = _numpy()
+        with self._lock:
+            if self._records_path.exists():
+                with open(self._records_path, "rb") as handle:
+                    handle.seek(self._records_offset)
+                    chunk = handle.read()
+                complete = chunk[: chunk.rfind(b"\n") + 1]
+                self._records_offset += len(complete)
+                self._records.extend(complete.splitlines())  # decoded lazily on hits
+
+            size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+            rows = min(size // self._row_bytes, len(self._records))
+            if rows != len(self._matrix):
+                self._matrix = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+                )
+
+    def search(self, text: str, k: int = 5) -> list:
+        """Return the ``k`` entries most similar to ``text``, best first."""
+        return self.search_batch([text], k)[0]
+
+    def search_batch(self, texts: list, k: int = 5) -> list:
+        """Cosine top-k for several queries in one pass over the vectors.
+
+        Each result is the stored metadata plus a ``similarity`` score. The
+        matrix is scanned in blocks of ``SEARCH_BLOCK_ROWS`` rows so memory
+        stays bounded however large the mapped file grows.
+        """
+        np = _numpy()
+        self.refresh()
+        with self._lock:
+            matrix, records = self._matrix, self._records
+        if not len(matrix) or k <= 0:
+            return [[] for _ in texts]
+
+        queries = self.embedder.embed(texts)
+        best_scores = np.empty((len(texts), 0), dtype=np.float32)
+        best_rows = np.empty((len(texts), 0), dtype=np.int64)
+        for start in range(0, len(matrix), SEARCH_BLOCK_ROWS):
+            block = np.asarray(matrix[start : start + SEARCH_BLOCK_ROWS])
+            block_rows = np.arange(start, start + len(block))
+            scores = np.concatenate([best_scores, (block @ queries.T).T], axis=1)
+            rows = np.concatenate(
+                [best_rows, np.broadcast_to(block_rows, (len(texts), len(block)))], axis=1
+            )
+            keep = min(k, scores.shape[1])
+            top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(rows, top, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [
+            [
+                {**json.loads(records[row]), "similarity": float(score)}
+                for row, score in zip(row_ids.tolist(), row_scores.tolist())
+            ]
+            for row_ids, row_scores in zip(best_rows, best_scores)
+        ]
+
+    # ---------- WRITE ----------
+
+    def add(self, text: str, metadata: dict = None) -> None:
+        """Embed and append one entry."""
+        self.add_many([text], [metadata or {}])
+
+    def add_many(self, texts: list, metadata: list) -> None:
+        """Embed and append several entries in one locked write."""
+        np = _numpy()
+        vectors = np.ascontiguousarray(self.embedder.embed(texts), dtype=np.float32)
+        lines = "".join(
+            json.dumps({**meta, "text": text}) + "\n" for text, meta in zip(texts, metadata)
+        )
+        with self._locked():
+            self.refresh()
+            with open(self._vectors_path, "ab") as handle:
+                # Drop rows left behind by a writer that died before its records landed.
+                handle.truncate(len(self._records) * self._row_bytes)
+                handle.write(vectors.tobytes())
+            with open(self._records_path, "a", encoding="utf-8") as handle:
+                handle.write(lines)
+            self.refresh()
+
+
+_default_index = None
+_default_unavailable = False
+_default_lock = threading.Lock()
+
+
+def get_decision_index():
+    """Return the process-wide decision index, or None when disabled or unavailable.
+
+    Set RELEASE_AGENT_DECISION_INDEX=off to disable it; it is also disabled
+    (with a one-time notice) when NumPy is not installed.
+    """
+    global _default_index, _default_unavailable
+    if os.environ.get(INDEX_ENV, "on").lower() in {"off", "0", "false"}:
+        return None
+    with _default_lock:
+        if _default_index is None and not _default_unavailable:
+            try:
+                _default_index = VectorStore()
+            except ImportError:
+                _default_unavailable = True
+                print("DECISION INDEX DISABLED: numpy is not installed")
+        return _default_index
@@ -0,0 +1,112 @@
+"""Interned vocabulary shared by the state, simulator, actions and validators.
+
+Every member is a ``str`` singleton: it compares, hashes, formats and
+serialises exactly like its value, so members can be used wherever plain
+strings were (dict keys, JSON, prompts) while state and traces hold shared
+references instead of fresh strings.
+"""
+from enum import Enum
+
+
+class Token(str, Enum):
+    """String enum member that behaves like its value everywhere."""
+
+    __hash__ = str.__hash__
+    __str__ = str.__str__
+    __format__ = str.__format__
+    __repr__ = str.__repr__
+
+
+class Stage(Token):
+    """Release lifecycle stages."""
+
+    START = "START"
+    RISK_EVAL = "RISK_EVAL"
+    SCHEDULING = "SCHEDULING"
+    DECISION = "DECISION"
+    REFLECT = "REFLECT"
+    DONE = "DONE"
+    ABORTED = "ABORTED"
+    DELAYED = "DELAYED"
+
+
+class Level(Token):
+    """Feature risk and service criticality levels."""
+
+    LOW = "LOW"
+    MEDIUM = "MEDIUM"
+    HIGH = "HIGH"
+    UNKNOWN = "UNKNOWN"
+
+
+class Day(Token):
+    """Days of the week."""
+
+    MON = "MON"
+    TUE = "TUE"
+    WED = "WED"
+    THU = "THU"
+    FRI = "FRI"
+    SAT = "SAT"
+    SUN = "SUN"
+    UNKNOWN = "UNKNOWN"
+
+
+class Recommendation(Token):
+    """Planner decisions and heuristic recommendations."""
+
+    GO = "GO"
+    NO_GO = "NO_GO"
+    DELAY = "DELAY"
+
+
+class Decision(Token):
+    """Final release decisions recorded on the state."""
+
+    GO = "GO"
+    ABORT = "ABORT"
+    DELAY = "DELAY"
+    UNDECIDED = "UNDECIDED"
+
+
+class Action(Token):
+    """Simulator actions."""
+
+    EVALUATE_RISK = "evaluate_risk"
+    CHECK_CLASH = "check_clash"
+    RESCHEDULE = "reschedule"
+    APPROVE_RELEASE = "approve_release"
+    ABORT_RELEASE = "abort_release"
+    REFLECT = "reflect"
+    FINISH = "finish"
+    GO = "GO"  # planner shorthand for approve_release
+    HOLD = "hold"  # pipeline-only: end an undecided run as DELAY
+
+
+TERMINAL_STAGES = frozenset({Stage.DONE, Stage.ABORTED, Stage.DELAYED})
+
+
+# value -> member lookup tables; ``TABLE.get(value, value)`` is the hot-path coerce.
+STAGES = {member.value: member for member in Stage}
+LEVELS = {member.value: member for member in Level}
+DAYS = {member.value: member for member in Day}
+RECOMMENDATIONS = {member.value: member for member in Recommendation}
+DECISIONS = {member.value: member for member in Decision}
+ACTIONS = {member.value: member for member in Action}
+_TABLES = {
+    Stage: STAGES,
+    Level: LEVELS,
+    Day: DAYS,
+    Recommendation: RECOMMENDATIONS,
+    Decision: DECISIONS,
+    Action: ACTIONS,
+}
+
+
+def coerce(vocabulary, value):
+    """Return the ``vocabulary`` member for ``value``, or ``value`` itself.
+
+    Unknown values (e.g. a new risk level sent to the bulk API) pass through
+    unchanged rather than failing the run.
+    """
+    return _TABLES[vocabulary].get(value, value)
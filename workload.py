@@ -0,0 +1,151 @@
+"""Seeded synthetic release streams for load tests and benchmarks.
+
+``release_stream`` walks a release calendar week by week and yields
+scenarios shaped like the fixtures in ``scenarios.py`` (plus ``id``,
+``release_id``, ``application``, ``env`` and ``scheduled_at``), in time
+order. A few applications release far more often than the rest, each
+application keeps one criticality tier, most changes are low risk, releases
+cluster on Tuesday-Thursday business hours and busy slots clash more often.
+The same seed and profile always produce the same stream.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate, islice
+
+DAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+DOMAINS = (
+    "ACCOUNT-OPENING",
+    "PAYMENTS",
+    "LEDGER",
+    "CARDS",
+    "LOANS",
+    "FRAUD",
+    "KYC",
+    "NOTIFICATIONS",
+    "SEARCH",
+    "PRICING",
+    "STATEMENTS",
+    "ONBOARDING",
+    "REPORTING",
+    "IDENTITY",
+    "TRANSFERS",
+    "SAVINGS",
+)
+KINDS = ("SERVICE", "API", "WORKER", "GATEWAY", "BATCH")
+
+
+def _business_hours() -> dict:
+    """Return hour weights: busy 9-17, quieter evenings, little overnight."""
+    return {
+        hour: 10 if 9 <= hour <= 17 else 3 if 7 <= hour <= 21 else 0.5
+        for hour in range(24)
+    }
+
+
+@dataclass
+class WorkloadProfile:
+    """Shape of a synthetic release stream. Weights are relative frequencies."""
+
+    applications: int = 200
+    releases_per_week: int = 500
+    # Zipf exponent over applications: higher means a few apps dominate.
+    app_skew: float = 1.1
+    feature_risk: dict = field(default_factory=lambda: {"LOW": 60, "MEDIUM": 30, "HIGH": 10})
+    # Drawn once per application: its service criticality tier.
+    service_criticality: dict = field(
+        default_factory=lambda: {"LOW": 50, "MEDIUM": 35, "HIGH": 15}
+    )
+    day_of_week: dict = field(
+        default_factory=lambda: {
+            "MON": 18,
+            "TUE": 24,
+            "WED": 24,
+            "THU": 20,
+            "FRI": 10,
+            "SAT": 2,
+            "SUN": 2,
+        }
+    )
+    hour_of_day: dict = field(default_factory=_business_hours)
+    # Clash probability in an average slot, scaled by how busy the slot is.
+    clash_rate: float = 0.12
+    env: str = "prod"
+    start: str = "2024-01-01"  # a Monday
+
+
+def application_names(count: int) -> list:
+    """Return ``count`` distinct application names."""
+    names = []
+    for i in range(count):
+        domain = DOMAINS[i % len(DOMAINS)]
+        kind = KINDS[(i // len(DOMAINS)) % len(KINDS)]
+        cycle = i // (len(DOMAINS) * len(KINDS))
+        names.append(f"{domain}-{kind}" + (f"-{cycle + 1}" if cycle else ""))
+    return names
+
+
+def release_stream(profile: WorkloadProfile = None, seed: int = 0):
+    """Yield an endless, time-ordered stream of release scenarios."""
+    profile = profile if profile is not None else WorkloadProfile()
+    rng = random.Random(seed)
+
+    apps = application_names(profile.applications)
+    app_weights = list(accumulate(1 / rank**profile.app_skew for rank in range(1, len(apps) + 1)))
+    levels = list(profile.service_criticality)
+    tiers = {
+        app: rng.choices(levels, list(profile.service_criticality.values()))[0] for app in apps
+    }
+    risks = list(profile.feature_risk)
+    risk_weights = list(accumulate(profile.feature_risk.values()))
+    days = [day for day in DAYS if profile.day_of_week.get(day, 0) > 0]
+    day_weights = list(accumulate(profile.day_of_week[day] for day in days))
+    hours = [hour for hour, weight in profile.hour_of_day.items() if weight > 0]
+    hour_weights = list(accumulate(profile.hour_of_day[hour] for hour in hours))
+
+    # A slot's clash odds grow with its share of the traffic.
+    day_share = {day: profile.day_of_week[day] / day_weights[-1] for day in days}
+    hour_share = {hour: profile.hour_of_day[hour] / hour_weights[-1] for hour in hours}
+    mean_slot = sum((day_share[d] * hour_share[h]) ** 2 for d in days for h in hours)
+
+    versions = dict.fromkeys(apps, 0)
+    week_start = date.fromisoformat(profile.start)
+    week_start -= timedelta(days=week_start.weekday())
+    count = 0
+    while True:
+        week = []
+        for _ in range(profile.releases_per_week):
+            day = rng.choices(days, cum_weights=day_weights)[0]
+            hour = rng.choices(hours, cum_weights=hour_weights)[0]
+            week.append((DAYS.index(day), hour, rng.randrange(60), day))
+        week.sort()
+
+        for weekday, hour, minute, day in week:
+            app = rng.choices(apps, cum_weights=app_weights)[0]
+            versions[app] += 1
+            busy = day_share[day] * hour_share[hour] / mean_slot
+            clash = rng.random() < min(0.9, profile.clash_rate * busy)
+            other = ""
+            while clash and other in ("", app) and len(apps) > 1:
+                other = rng.choices(apps, cum_weights=app_weights)[0]
+            scheduled = datetime.combine(week_start + timedelta(days=weekday), time(hour, minute))
+            count += 1
+            yield {
+                "id": f"rel-{count:07d}",
+                "release_id": f"{app}-1.{versions[app]}.0",
+                "application": app,
+                "env": profile.env,
+                "scheduled_at": scheduled.isoformat(),
+                "feature_risk": rng.choices(risks, cum_weights=risk_weights)[0],
+                "service_criticality": tiers[app],
+                "day_of_week": day,
+                "hour_of_day": hour,
+                "clash_outcomes": [True, False] if clash else [False],
+                "conflicting_services": [other],
+            }
+        week_start += timedelta(weeks=1)
+
+
+def generate_workload(count: int, seed: int = 0, profile: WorkloadProfile = None) -> list:
+    """Return the first ``count`` releases of the seeded stream."""
+    return list(islice(release_stream(profile, seed), count))